@@ -0,0 +1,554 @@
+# app/auth/bulk_import.py
+"""
+대학 단위 사용자 일괄 등록 (CSV / JSON Lines)
+
+- 파일을 한 줄씩 읽어 AUTH_BULK_CHUNK_SIZE 행 단위로 처리합니다. (파일 전체를 메모리에 올리지 않도록
+  JSON 배열 파일은 받지 않으며, 한 줄에 사용자 1명인 JSON Lines 를 사용합니다) 청크마다
+  1) RegisterRequest 와 같은 규칙으로 검증하고, 대학 코드와 기존 아이디/이메일을 쿼리 1회로 확인
+  2) bcrypt 해시(프로세스 풀, AUTH_BULK_HASH_PROCESSES)
+  3) users / user_stats 에 임시 userKey(members.pending_user_key)로 multi-row INSERT 후 커밋
+  4) 저장된 행만 SSAFY 계정 생성(공유 클라이언트, 동시 AUTH_BULK_SSAFY_CONCURRENCY 건) 후 userKey 갱신
+     (SSAFY API에는 계정 삭제가 없으므로, 아이디/이메일 충돌로 저장되지 않은 행은 계정을 만들지 않음.
+     계정 생성이 거절된 행은 임시 사용자를 지우고 실패로 기록)
+- 진행 기록(JSON Lines)에 청크마다 다음 시작 행과 실패 행을 남기므로, 중단 후 같은 기록으로 다시 실행하면
+  이어서 처리합니다. 커밋 후 기록 전에 중단되어 청크를 다시 처리해도, 아이디와 이메일이 모두 같은 기존 사용자는
+  건너뛰고(임시 userKey 인 채 남은 사용자는 계정 생성부터 이어서 처리) SSAFY 계정은 조회로 이어 쓰므로 중복 생성되지 않습니다.
+- SSAFY 서버 오류(502)가 나면 해당 임시 사용자를 지우고 그 청크를 기록하지 않고 중단합니다. (서버가 복구된 뒤 이어서 실행)
+- 관리자 API(POST /auth/bulk-import)는 파일을 저장하고 이 CLI 를 별도 프로세스로 실행합니다. (API 서버의 이벤트 루프/CPU 미사용)
+  같은 진행 기록은 실행 잠금(<진행 기록>.lock)으로 한 프로세스만 처리합니다.
+- --rounds 로 기본보다 낮은 bcrypt 비용을 쓰면, 해당 사용자의 첫 로그인 때 AUTH_BCRYPT_ROUNDS 로 다시 저장됩니다.
+
+CSV 헤더 / JSONL 키: login_id, email, password, real_name, university_code
+                    (선택) gender, birth_year, department, grade, university_name, password_confirm
+
+실행:
+    python -m app.auth.bulk_import students.csv                       # 진행 기록: students.csv.progress.jsonl
+    python -m app.auth.bulk_import students.jsonl --rounds 10
+    python -m app.auth.bulk_import students.csv --restart             # 진행 기록 무시하고 처음부터
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import csv
+import fcntl
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.auth import members
+from app.auth.schemas import RegisterRequest
+from app.auth.utils import BCRYPT_ROUNDS, generate_user_id, pwd_context
+from app.models import TierNameEnum, UserRoleEnum
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = int(os.getenv("AUTH_BULK_CHUNK_SIZE", "500"))
+SSAFY_CONCURRENCY = int(os.getenv("AUTH_BULK_SSAFY_CONCURRENCY", "16"))
+# 서버와 같은 호스트에서 실행되므로 기본은 작게 (전용 배치 서버면 CPU 수로 올림)
+HASH_PROCESSES = int(os.getenv("AUTH_BULK_HASH_PROCESSES", "2"))
+# --rounds 하한 (이보다 낮은 비용은 허용하지 않음)
+MIN_ROUNDS = 10
+# 관리자 API로 올린 파일과 진행 기록 위치
+IMPORT_DIR = os.getenv("AUTH_BULK_IMPORT_DIR", "/tmp/bulk_imports")
+IMPORT_FORMATS = ("csv", "jsonl")
+# 관리자 API 업로드 최대 크기 (기본은 Nginx client_max_body_size 와 같은 10MB)
+MAX_UPLOAD_BYTES = int(os.getenv("AUTH_BULK_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+ALREADY_EXISTS = "이미 사용 중인 아이디 또는 이메일입니다."
+
+
+class ImportInterrupted(Exception):
+    """외부 서버 오류로 청크를 끝내지 못함 (진행 기록은 청크 시작 위치 유지)"""
+
+
+# ---- 입력 ----
+def _clean(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """(행 번호, 원본 dict) — 행 번호는 0부터, 헤더 제외"""
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row_no, row in enumerate(csv.DictReader(f)):
+                yield row_no, {key.strip(): _clean(value) for key, value in row.items() if key}
+    elif lower.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            row_no = 0
+            for line in f:
+                if line.strip():
+                    yield row_no, json.loads(line)
+                    row_no += 1
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {path} (.csv / .jsonl)")
+
+
+def parse_row(raw: Dict) -> RegisterRequest:
+    """회원가입 요청과 같은 검증 (비밀번호 확인/대학명은 생략 가능)"""
+    data = {key: _clean(value) for key, value in raw.items()}
+    data.setdefault("password_confirm", data.get("password"))
+    if not data.get("university_name"):
+        data["university_name"] = ""
+    return RegisterRequest.model_validate(data)
+
+
+def _validation_reason(e: ValidationError) -> str:
+    error = e.errors()[0]
+    field = ".".join(str(part) for part in error.get("loc", ()))
+    message = error.get("msg", "").removeprefix("Value error, ")
+    return f"{field}: {message}" if field else message
+
+
+# ---- 진행 기록 ----
+def read_progress(path: str) -> Dict:
+    """진행 기록 요약 (없으면 처음 상태)"""
+    summary = {"next_row": 0, "created": 0, "skipped": 0, "failed": 0, "status": "pending", "failures": []}
+    if not os.path.exists(path):
+        return summary
+    failures: Dict[int, Dict] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 기록 중 중단된 마지막 줄
+                continue
+            event = entry.get("event")
+            if event == "failed":
+                failures[entry["row"]] = entry
+            elif event == "chunk":
+                summary["next_row"] = entry["next_row"]
+                summary["created"] += entry["created"]
+                summary["skipped"] += entry["skipped"]
+                summary["status"] = "running"
+            elif event == "start":
+                summary["status"] = "running"
+                summary.pop("reason", None)
+            elif event == "done":
+                summary["status"] = "done"
+            elif event == "stopped":
+                summary["status"] = "stopped"
+                summary["reason"] = entry.get("reason")
+    # 재처리된 청크의 실패 행은 한 번만
+    summary["failures"] = [failures[row] for row in sorted(failures) if row < summary["next_row"]]
+    summary["failed"] = len(summary["failures"])
+    return summary
+
+
+def _append(path: str, entries: List[Dict]) -> None:
+    # 청크의 실패 행과 완료 기록을 한 번에 쓰고 디스크에 반영
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ---- 해시 (프로세스 풀) ----
+def _hash_many(passwords: List[str], rounds: int) -> List[str]:
+    handler = pwd_context.handler("bcrypt").using(rounds=rounds)
+    return [handler.hash(password) for password in passwords]
+
+
+async def _hash_all(pool: ProcessPoolExecutor, passwords: List[str], rounds: int) -> List[str]:
+    """프로세스 수만큼 나눠 제출 (피클링 왕복 최소화)"""
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    size = max(1, -(-len(passwords) // HASH_PROCESSES))
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(pool, _hash_many, passwords[start:start + size], rounds)
+        for start in range(0, len(passwords), size)
+    ])
+    return [hashed for part in parts for hashed in part]
+
+
+# ---- SSAFY ----
+async def _ensure_members(emails: List[str], concurrency: int) -> List:
+    """이메일별 userKey 또는 HTTPException"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ensure(email: str):
+        async with semaphore:
+            return await members.ensure_ssafy_member(email)
+
+    return await asyncio.gather(*[ensure(email) for email in emails], return_exceptions=True)
+
+
+# ---- DB ----
+def load_school_ids(db: Session) -> Dict[str, str]:
+    return {r.code: r.id for r in db.execute(text("SELECT id, code FROM schools")).fetchall()}
+
+
+def _existing_users(db: Session, login_ids: List[str], emails: List[str]) -> List[Tuple[str, str, str, str]]:
+    """(id, login_id, email, user_key)"""
+    if not login_ids:
+        return []
+    query = text("""
+        SELECT id, login_id, email, user_key FROM users
+        WHERE login_id IN :login_ids OR email IN :emails
+    """).bindparams(bindparam("login_ids", expanding=True), bindparam("emails", expanding=True))
+    rows = db.execute(query, {"login_ids": login_ids, "emails": emails}).fetchall()
+    db.rollback()
+    return [(r.id, r.login_id, r.email, r.user_key) for r in rows]
+
+
+_USER_COLUMNS = ("id", "login_id", "password", "email", "real_name", "gender", "birth_year",
+                 "school_id", "department", "grade", "role", "user_key")
+
+
+def _insert_sql(n_rows: int) -> Tuple[str, str]:
+    user_values = ", ".join(
+        "(" + ", ".join(f":{column}_{i}" for column in _USER_COLUMNS) + ", CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        for i in range(n_rows)
+    )
+    stat_values = ", ".join(f"(:id_{i}, 0, :tier, CURRENT_TIMESTAMP)" for i in range(n_rows))
+    users = f"""
+        INSERT INTO users ({", ".join(_USER_COLUMNS)}, created_at, updated_at)
+        VALUES {user_values}
+    """
+    stats = f"""
+        INSERT INTO user_stats (user_id, total_exp, current_tier, updated_at)
+        VALUES {stat_values}
+    """
+    return users, stats
+
+
+def _insert_rows(db: Session, rows: List[Dict]) -> None:
+    users_sql, stats_sql = _insert_sql(len(rows))
+    params = {"tier": TierNameEnum.BASIC.value}
+    for i, row in enumerate(rows):
+        for column in _USER_COLUMNS:
+            params[f"{column}_{i}"] = row[column]
+    db.execute(text(users_sql), params)
+    db.execute(text(stats_sql), params)
+
+
+def insert_users(db: Session, rows: List[Dict]) -> List[Dict]:
+    """
+    users / user_stats multi-row INSERT (청크 1회 커밋)
+    - 동시에 같은 아이디/이메일이 가입되어 충돌하면 행 단위로 다시 넣어 충돌 행만 반환
+    """
+    if not rows:
+        return []
+    try:
+        _insert_rows(db, rows)
+        db.commit()
+        return []
+    except IntegrityError:
+        db.rollback()
+
+    conflicts = []
+    for row in rows:
+        try:
+            _insert_rows(db, [row])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            conflicts.append(row)
+    return conflicts
+
+
+def finish_members(db: Session, user_keys: Dict[str, str], discard: List[str]) -> None:
+    """
+    SSAFY 계정이 생성된 사용자의 userKey 갱신, 계정을 만들지 못한 임시 사용자 삭제 (커밋 1회)
+    - 삭제는 임시 userKey 인 행만 (이미 userKey 가 채워진 사용자는 건드리지 않음)
+    """
+    try:
+        if user_keys:
+            db.execute(text("UPDATE users SET user_key = :user_key WHERE id = :id"),
+                       [{"id": user_id, "user_key": key} for user_id, key in user_keys.items()])
+        if discard:
+            params = {"ids": discard, "pending": f"{members.PENDING_KEY_PREFIX}%"}
+            db.execute(text("""
+                DELETE FROM user_stats
+                WHERE user_id IN (SELECT id FROM users WHERE id IN :ids AND user_key LIKE :pending)
+            """).bindparams(bindparam("ids", expanding=True)), params)
+            db.execute(text("""
+                DELETE FROM users WHERE id IN :ids AND user_key LIKE :pending
+            """).bindparams(bindparam("ids", expanding=True)), params)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+# ---- 청크 처리 ----
+async def _process_chunk(db: Session, chunk: List[Tuple[int, Dict]], school_ids: Dict[str, str],
+                         pool: ProcessPoolExecutor, rounds: int, concurrency: int) -> Tuple[int, int, List[Dict]]:
+    """(생성 수, 건너뛴 수, 실패 행)"""
+    failures: List[Dict] = []
+
+    def fail(row_no: int, login_id, reason: str) -> None:
+        failures.append({"event": "failed", "row": row_no, "login_id": login_id, "reason": reason})
+
+    # 1) 검증 + 청크 내 중복
+    candidates: List[Tuple[int, RegisterRequest]] = []
+    seen = set()
+    for row_no, raw in chunk:
+        try:
+            req = parse_row(raw)
+        except ValidationError as e:
+            fail(row_no, raw.get("login_id"), _validation_reason(e))
+            continue
+        if req.university_code not in school_ids:
+            fail(row_no, req.login_id, "등록되지 않은 대학입니다.")
+            continue
+        if req.login_id in seen or req.email in seen:
+            fail(row_no, req.login_id, "파일 안에서 중복된 아이디 또는 이메일입니다.")
+            continue
+        seen.update((req.login_id, req.email))
+        candidates.append((row_no, req))
+
+    # 2) 기존 사용자: 아이디와 이메일이 모두 같으면 이미 등록된 행(재실행)으로 보고 건너뜀
+    #    임시 userKey 인 채 남은 사용자(계정 생성 전 중단)는 계정 생성부터 이어서 처리
+    existing = await run_in_threadpool(
+        _existing_users, db, [req.login_id for _, req in candidates], [req.email for _, req in candidates]
+    )
+    registered = {(login_id, email): (user_id, user_key) for user_id, login_id, email, user_key in existing}
+    taken = {value for _, login_id, email, _ in existing for value in (login_id, email)}
+    skipped = 0
+    pending: List[Tuple[int, RegisterRequest]] = []
+    members_needed: List[Dict] = []
+    for row_no, req in candidates:
+        match = registered.get((req.login_id, req.email))
+        if match is not None:
+            if members.is_pending_user_key(match[1]):
+                members_needed.append({"row": row_no, "id": match[0], "login_id": req.login_id, "email": req.email})
+            else:
+                skipped += 1
+        elif req.login_id in taken or req.email in taken:
+            fail(row_no, req.login_id, ALREADY_EXISTS)
+        else:
+            pending.append((row_no, req))
+
+    # 3) 해시
+    hashes = await _hash_all(pool, [req.password for _, req in pending], rounds)
+
+    # 4) 임시 userKey 로 multi-row INSERT (충돌 행은 SSAFY 계정을 만들지 않고 실패 처리)
+    rows: List[Dict] = []
+    for (row_no, req), hashed in zip(pending, hashes):
+        user_id = generate_user_id()
+        rows.append({
+            "row": row_no,
+            "id": user_id,
+            "login_id": req.login_id,
+            "password": hashed,
+            "email": req.email,
+            "real_name": req.real_name,
+            "gender": req.gender.value if req.gender else None,
+            "birth_year": req.birth_year,
+            "school_id": school_ids[req.university_code],
+            "department": req.department,
+            "grade": req.grade,
+            "role": UserRoleEnum.GUEST.value,
+            "user_key": members.pending_user_key(user_id),
+        })
+    conflicts = await run_in_threadpool(insert_users, db, rows)
+    conflict_ids = {row["id"] for row in conflicts}
+    for row in conflicts:
+        fail(row["row"], row["login_id"], ALREADY_EXISTS)
+    members_needed.extend(row for row in rows if row["id"] not in conflict_ids)
+
+    # 5) 저장된 사용자만 SSAFY 계정 생성 후 userKey 갱신, 거절/서버 오류 행은 임시 사용자 삭제
+    results = await _ensure_members([row["email"] for row in members_needed], concurrency)
+    user_keys: Dict[str, str] = {}
+    discard: List[str] = []
+    interrupted: Optional[HTTPException] = None
+    unexpected: Optional[BaseException] = None
+    for row, user_key in zip(members_needed, results):
+        if isinstance(user_key, HTTPException):
+            if user_key.status_code >= 500:
+                interrupted = user_key
+            else:
+                fail(row["row"], row["login_id"], f"SSAFY: {user_key.detail}")
+            discard.append(row["id"])
+        elif isinstance(user_key, BaseException):
+            # 임시 사용자로 남겨 두면 다시 실행할 때 계정 생성부터 이어서 처리
+            unexpected = user_key
+        else:
+            user_keys[row["id"]] = user_key
+    await run_in_threadpool(finish_members, db, user_keys, discard)
+
+    if unexpected is not None:
+        raise unexpected
+    if interrupted is not None:
+        # 성공한 행은 저장됨 → 다시 실행하면 건너뛰고 실패한 행만 다시 시도
+        raise ImportInterrupted(interrupted.detail)
+
+    failures.sort(key=lambda entry: entry["row"])
+    return len(user_keys), skipped, failures
+
+
+async def import_users(source: str, progress_path: str, session_factory: Callable[[], Session],
+                       chunk_size: int = CHUNK_SIZE, rounds: int = BCRYPT_ROUNDS,
+                       concurrency: int = SSAFY_CONCURRENCY, restart: bool = False) -> Dict:
+    """
+    파일의 사용자를 일괄 등록하고 진행 기록 요약을 반환
+    - 진행 기록이 있으면 마지막으로 완료된 청크 다음 행부터 이어서 처리
+    """
+    if not MIN_ROUNDS <= rounds <= BCRYPT_ROUNDS:
+        raise ValueError(f"rounds는 {MIN_ROUNDS}~{BCRYPT_ROUNDS} 사이여야 합니다.")
+    if restart and os.path.exists(progress_path):
+        os.remove(progress_path)
+
+    start_row = read_progress(progress_path)["next_row"]
+    _append(progress_path, [{"event": "start", "source": os.path.basename(source),
+                             "from_row": start_row, "rounds": rounds, "at": int(time.time())}])
+    if start_row:
+        logger.info("resuming bulk import %s from row %d", source, start_row)
+
+    started = time.monotonic()
+    db = session_factory()
+    # fork 대신 spawn: 서버 프로세스의 스레드(Redis 구독 등)를 복제하지 않음
+    pool = ProcessPoolExecutor(max_workers=HASH_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        school_ids = await run_in_threadpool(load_school_ids, db)
+        chunk: List[Tuple[int, Dict]] = []
+        rows = iter(read_rows(source))
+        while True:
+            row = next(rows, None)
+            if row is not None:
+                if row[0] < start_row:
+                    continue
+                chunk.append(row)
+                if len(chunk) < chunk_size:
+                    continue
+            if not chunk:
+                break
+
+            created, skipped, failures = await _process_chunk(db, chunk, school_ids, pool, rounds, concurrency)
+            next_row = chunk[-1][0] + 1
+            _append(progress_path, failures + [{
+                "event": "chunk", "next_row": next_row,
+                "created": created, "skipped": skipped, "failed": len(failures),
+            }])
+            logger.info("bulk import %s: rows < %d done (+%d created, %d skipped, %d failed)",
+                        source, next_row, created, skipped, len(failures))
+            chunk = []
+
+        _append(progress_path, [{"event": "done", "elapsed_ms": int((time.monotonic() - started) * 1000)}])
+    except ImportInterrupted as e:
+        logger.warning("bulk import %s stopped: %s", source, e)
+        _append(progress_path, [{"event": "stopped", "reason": str(e)}])
+    except Exception as e:
+        _append(progress_path, [{"event": "stopped", "reason": str(e)}])
+        raise
+    finally:
+        pool.shutdown(cancel_futures=True)
+        db.close()
+
+    return read_progress(progress_path)
+
+
+# ---- 관리자 API용 별도 프로세스 실행 ----
+# API 서버 이벤트 루프/CPU 를 쓰지 않도록, 관리자 API는 파일을 저장한 뒤 이 모듈의 CLI 를 별도 프로세스로 실행만 함
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def source_path(import_id: str, fmt: str) -> str:
+    return os.path.join(IMPORT_DIR, f"{import_id}.{fmt}")
+
+
+def progress_path(import_id: str) -> str:
+    return os.path.join(IMPORT_DIR, f"{import_id}.progress.jsonl")
+
+
+def find_source(import_id: str) -> Optional[str]:
+    for fmt in IMPORT_FORMATS:
+        path = source_path(import_id, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _lock_path(progress: str) -> str:
+    return f"{progress}.lock"
+
+
+def acquire_lock(progress: str):
+    """진행 기록별 실행 잠금 (프로세스가 끝나면 자동 해제). 이미 실행 중이면 None"""
+    f = open(_lock_path(progress), "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+
+def is_running(import_id: str) -> bool:
+    """다른 프로세스가 실행 잠금을 잡고 있으면 실행 중 (API 워커와 무관하게 확인)"""
+    path = _lock_path(progress_path(import_id))
+    if not os.path.exists(path):
+        return False
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(f, fcntl.LOCK_UN)
+    return False
+
+
+def launch(import_id: str, rounds: int = BCRYPT_ROUNDS) -> None:
+    """CLI 를 서버와 분리된 프로세스로 실행 (서버 재시작과 무관하게 계속 실행, 출력은 <id>.log)"""
+    with open(os.path.join(IMPORT_DIR, f"{import_id}.log"), "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "app.auth.bulk_import", find_source(import_id),
+             "--progress", progress_path(import_id), "--rounds", str(rounds)],
+            cwd=BACKEND_DIR, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사용자 일괄 등록")
+    parser.add_argument("source", help="CSV / JSON Lines 파일")
+    parser.add_argument("--progress", default=None, help="진행 기록 파일 (기본: <source>.progress.jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS,
+                        help=f"bcrypt 비용 ({MIN_ROUNDS}~{BCRYPT_ROUNDS}, 낮추면 첫 로그인 때 다시 해시)")
+    parser.add_argument("--concurrency", type=int, default=SSAFY_CONCURRENCY, help="SSAFY 동시 호출 수")
+    parser.add_argument("--restart", action="store_true", help="진행 기록을 지우고 처음부터 실행")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.database import SessionLocal
+
+    progress = args.progress or f"{args.source}.progress.jsonl"
+    lock = acquire_lock(progress)
+    if lock is None:
+        parser.exit(1, f"이미 실행 중인 작업입니다: {progress}\n")
+
+    async def run() -> Dict:
+        try:
+            return await import_users(args.source, progress, SessionLocal, chunk_size=args.chunk_size,
+                                      rounds=args.rounds, concurrency=args.concurrency, restart=args.restart)
+        finally:
+            await members.close_client()
+
+    summary = asyncio.run(run())
+    summary.pop("failures")
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
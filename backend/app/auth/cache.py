@@ -0,0 +1,184 @@
+# app/auth/cache.py
+"""
+인증 사용자 캐시 (get_current_user)
+
+- 워커 내 LRU: 토큰 jti → 사용자 컬럼 값 (AUTH_USER_LOCAL_TTL_SECONDS, 기본 30초)
+  캐시가 유효한 동안에는 사용자 조회에 네트워크 왕복이 없습니다. (로그아웃 확인은 revocation.py)
+- Redis: auth:user:{user_id} → 사용자 컬럼 값(JSON, AUTH_USER_TTL_SECONDS)
+  LRU 미스 시 조회하고, 없으면 MySQL에서 읽어 채웁니다.
+- 비밀번호 해시, userKey 는 캐시에 저장하지 않습니다. (필요한 경우 접근 시 DB에서 지연 로딩)
+- 프로필 수정 시 invalidate_user, 로그아웃 시 forget_token 으로 지웁니다.
+- invalidate_user 는 사용자별 세대(auth:user:{user_id}:gen)를 올리고, cache_user 는 DB 조회 전에 읽어 둔 세대가
+  그대로일 때만 저장합니다. (WATCH/MULTI) 조회 도중 프로필이 수정되면 읽은 이전 값은 캐시하지 않습니다.
+  (로그아웃은 revocation 채널로 모든 워커에 전파되며, 프로필 수정은 다른 워커의 LRU가
+  최대 AUTH_USER_LOCAL_TTL_SECONDS 동안 이전 값을 사용할 수 있습니다)
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from datetime import date, datetime
+import enum
+import json
+import logging
+import os
+import threading
+import time
+
+import redis
+from sqlalchemy import Date, DateTime, Enum as SQLEnum
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.cache import rds
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+USER_TTL_SECONDS = int(os.getenv("AUTH_USER_TTL_SECONDS", "300"))
+USER_LOCAL_TTL_SECONDS = int(os.getenv("AUTH_USER_LOCAL_TTL_SECONDS", "30"))
+USER_LOCAL_MAX_TOKENS = int(os.getenv("AUTH_USER_LOCAL_MAX_TOKENS", "10000"))
+# 세대 키 유지 시간 (DB 조회~캐시 저장 사이 시간보다 충분히 길면 됨)
+GENERATION_TTL_SECONDS = 3600
+
+# 캐시에 저장하지 않는 민감 컬럼
+EXCLUDED_COLUMNS = {"password", "user_key"}
+
+_columns = [column for column in User.__table__.columns if column.key not in EXCLUDED_COLUMNS]
+
+# jti → (user_id, 컬럼 값, 저장 시각)
+_local: "OrderedDict[str, Tuple[str, Dict, float]]" = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def user_key(user_id: str) -> str:
+    return f"auth:user:{user_id}"
+
+
+def generation_key(user_id: str) -> str:
+    return f"auth:user:{user_id}:gen"
+
+
+def _dump(user: User) -> Dict:
+    data = {}
+    for column in _columns:
+        value = getattr(user, column.key)
+        if isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def _load(data: Dict) -> User:
+    """캐시 값 → 세션에 붙지 않은(detached) User (db.merge(user, load=False) 로 사용)"""
+    values = {}
+    for column in _columns:
+        value = data.get(column.key)
+        if value is not None:
+            if isinstance(column.type, SQLEnum) and column.type.enum_class is not None:
+                value = column.type.enum_class(value)
+            elif isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+        values[column.key] = value
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def _get_local(jti: str) -> Optional[Dict]:
+    with _local_lock:
+        entry = _local.get(jti)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[2] > USER_LOCAL_TTL_SECONDS:
+            del _local[jti]
+            return None
+        _local.move_to_end(jti)
+        return entry[1]
+
+
+def _set_local(jti: str, user_id: str, data: Dict) -> None:
+    with _local_lock:
+        _local[jti] = (user_id, data, time.monotonic())
+        _local.move_to_end(jti)
+        while len(_local) > USER_LOCAL_MAX_TOKENS:
+            _local.popitem(last=False)
+
+
+def lookup_user(jti: Optional[str], user_id: str) -> Optional[User]:
+    """캐시된 사용자 조회 (워커 LRU → Redis, 없으면 None)"""
+    if jti:
+        data = _get_local(jti)
+        if data is not None:
+            return _load(data)
+
+    try:
+        raw = rds.get(user_key(user_id))
+    except redis.RedisError:
+        return None
+    if not raw:
+        return None
+
+    data = json.loads(raw)
+    if jti:
+        _set_local(jti, user_id, data)
+    return _load(data)
+
+
+def user_generation(user_id: str) -> Optional[str]:
+    """DB 조회 전에 읽어 cache_user 에 넘길 세대 (Redis 장애 시 None → 캐시하지 않음)"""
+    try:
+        return rds.get(generation_key(user_id)) or "0"
+    except redis.RedisError:
+        return None
+
+
+def cache_user(jti: Optional[str], user: User, generation: Optional[str]) -> None:
+    """
+    DB에서 읽은 사용자를 Redis와 워커 LRU에 저장
+    - generation(DB 조회 전 user_generation 값)이 바뀌었으면 그 사이 수정된 것이므로 저장하지 않음
+    """
+    if generation is None:
+        return
+    data = _dump(user)
+    # LRU 를 먼저 채우고, Redis 저장이 거부되면 지움 (그 사이 invalidate_user 가 지운 경우 포함)
+    if jti:
+        _set_local(jti, user.id, data)
+    stored = False
+    try:
+        with rds.pipeline() as pipe:
+            pipe.watch(generation_key(user.id))
+            if (pipe.get(generation_key(user.id)) or "0") == generation:
+                pipe.multi()
+                pipe.setex(user_key(user.id), USER_TTL_SECONDS, json.dumps(data))
+                pipe.execute()
+                stored = True
+    except redis.WatchError:
+        pass
+    except redis.RedisError:
+        logger.warning("failed to cache user %s", user.id)
+    if not stored and jti:
+        forget_token(jti)
+
+
+def invalidate_user(user_id: str) -> None:
+    """프로필 변경 시 해당 사용자의 캐시 삭제 (세대 증가 → Redis 삭제 → 이 워커의 모든 토큰)"""
+    try:
+        pipe = rds.pipeline()
+        pipe.incr(generation_key(user_id))
+        pipe.expire(generation_key(user_id), GENERATION_TTL_SECONDS)
+        pipe.delete(user_key(user_id))
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("failed to invalidate cached user %s", user_id)
+    with _local_lock:
+        for jti in [jti for jti, entry in _local.items() if entry[0] == user_id]:
+            del _local[jti]
+
+
+def forget_token(jti: str) -> None:
+    """로그아웃한 토큰을 이 워커의 LRU에서 삭제"""
+    with _local_lock:
+        _local.pop(jti, None)
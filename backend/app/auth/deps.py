@@ -4,8 +4,9 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth.utils import decode_access_token
-from app.models import User
-from app.cache import rds
+from app.models import User, UserRoleEnum
+from app.auth.cache import lookup_user, cache_user, user_generation
+from app.auth.revocation import is_revoked
 
 bearer = HTTPBearer()
 
@@ -14,13 +15,29 @@ def get_current_user(credentials=Depends(bearer), db: Session = Depends(get_db))
         payload = decode_access_token(credentials.credentials)
         user_id = payload.get("sub")
         jti = payload.get("jti")
+        exp = payload.get("exp")
     except:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="유효하지 않은 토큰")
     
-    if jti and rds.sismember("jwt:blacklist", jti):
+    # 로그아웃 확인: 워커 Bloom 필터에 없으면 Redis 조회 생략
+    if jti and is_revoked(jti, exp):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="로그아웃된 토큰")
     
+    # 사용자: 워커 LRU → Redis → MySQL
+    cached = lookup_user(jti, user_id)
+    if cached is not None:
+        # SELECT 없이 요청 세션에 연결 (관계/제외 컬럼은 접근 시 지연 로딩)
+        return db.merge(cached, load=False)
+    
+    # 조회 도중 프로필이 수정되면 읽은 값을 캐시하지 않도록 세대를 먼저 읽음
+    generation = user_generation(user_id)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="사용자를 찾을 수 없음")
-    return user
\ No newline at end of file
+    cache_user(jti, user, generation)
+    return user
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != UserRoleEnum.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="관리자 권한이 필요합니다.")
+    return current_user
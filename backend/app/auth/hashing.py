@@ -0,0 +1,149 @@
+# app/auth/hashing.py
+"""
+비밀번호 해시 전용 실행기
+
+- bcrypt 해시/검증은 요청당 수십~수백 ms 의 CPU 작업이므로, 전용 스레드 풀
+  (AUTH_HASH_WORKERS, 기본 CPU 수)에서 실행해 다른 엔드포인트의 스레드 풀을 점유하지 않게 합니다.
+  (bcrypt 는 해시 계산 중 GIL 을 해제하므로 스레드 수만큼 병렬 실행됩니다)
+- 대기/실행 중인 작업이 AUTH_HASH_MAX_PENDING 개를 넘으면 바로 503을 반환하고,
+  AUTH_HASH_TIMEOUT_SECONDS 안에 끝나지 않으면 504를 반환합니다.
+- 로그인 검증은 verify_and_update 로, 현재 설정(AUTH_BCRYPT_ROUNDS)과 다른 비용으로 저장된 해시를
+  새 해시로 돌려줍니다. (호출한 쪽에서 저장)
+- GET /auth/metrics 가 대기 작업 수, 거절 수, 대기/실행 시간을 Prometheus 텍스트 형식으로 노출합니다. (워커별 값)
+"""
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+import asyncio
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.auth.utils import hash_password, verify_and_update
+
+T = TypeVar("T")
+
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(os.cpu_count() or 2)))
+MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", str(HASH_WORKERS * 8)))
+TIMEOUT_SECONDS = float(os.getenv("AUTH_HASH_TIMEOUT_SECONDS", "10"))
+
+_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+_pending = 0
+_stats: Dict[str, float] = {
+    "submitted": 0, "rejected": 0, "timed_out": 0, "rehashed": 0,
+    "wait_seconds": 0.0, "run_seconds": 0.0, "completed": 0,
+}
+_lock = threading.Lock()
+
+
+def pending_count() -> int:
+    """대기/실행 중인 해시 작업 수"""
+    return _pending
+
+
+def _timed(func: Callable[..., T], submitted_at: float, *args) -> T:
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        finished = time.perf_counter()
+        with _lock:
+            _stats["wait_seconds"] += started - submitted_at
+            _stats["run_seconds"] += finished - started
+            _stats["completed"] += 1
+
+
+def _release(_: Future) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _submit(func: Callable[..., T], *args) -> Future:
+    """슬롯이 있으면 풀에 제출, 없으면 503"""
+    global _pending
+    with _lock:
+        if _pending >= MAX_PENDING:
+            _stats["rejected"] += 1
+            raise HTTPException(status_code=503, detail="요청이 많아 잠시 후 다시 시도해주세요.")
+        _pending += 1
+        _stats["submitted"] += 1
+    future = _pool.submit(_timed, func, time.perf_counter(), *args)
+    future.add_done_callback(_release)
+    return future
+
+
+def _timeout() -> HTTPException:
+    with _lock:
+        _stats["timed_out"] += 1
+    return HTTPException(status_code=504, detail="비밀번호 처리 시간이 초과되었습니다.")
+
+
+async def _run(func: Callable[..., T], *args) -> T:
+    future = _submit(func, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise _timeout()
+
+
+def _run_blocking(func: Callable[..., T], *args) -> T:
+    future = _submit(func, *args)
+    try:
+        return future.result(timeout=TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        raise _timeout()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_and_update_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(일치 여부, 비용 설정이 바뀐 경우 새 해시)"""
+    verified, new_hash = await _run(verify_and_update, password, hashed)
+    if new_hash:
+        with _lock:
+            _stats["rehashed"] += 1
+    return verified, new_hash
+
+
+def hash_password_blocking(password: str) -> str:
+    """동기 핸들러용 (같은 풀과 대기 한도를 사용)"""
+    return _run_blocking(hash_password, password)
+
+
+def render_prometheus() -> str:
+    with _lock:
+        stats = dict(_stats)
+        pending = _pending
+    lines = [
+        "# HELP auth_hash_pending Password hashing jobs queued or running.",
+        "# TYPE auth_hash_pending gauge",
+        f"auth_hash_pending {pending}",
+        "# HELP auth_hash_workers Password hashing pool size.",
+        "# TYPE auth_hash_workers gauge",
+        f"auth_hash_workers {HASH_WORKERS}",
+        "# HELP auth_hash_jobs_total Password hashing jobs by outcome.",
+        "# TYPE auth_hash_jobs_total counter",
+        f'auth_hash_jobs_total{{outcome="submitted"}} {int(stats["submitted"])}',
+        f'auth_hash_jobs_total{{outcome="rejected"}} {int(stats["rejected"])}',
+        f'auth_hash_jobs_total{{outcome="timed_out"}} {int(stats["timed_out"])}',
+        f'auth_hash_jobs_total{{outcome="completed"}} {int(stats["completed"])}',
+        f'auth_hash_jobs_total{{outcome="rehashed"}} {int(stats["rehashed"])}',
+        "# HELP auth_hash_seconds Time spent queued and hashing.",
+        "# TYPE auth_hash_seconds summary",
+        f'auth_hash_seconds_sum{{phase="wait"}} {stats["wait_seconds"]:.6f}',
+        f'auth_hash_seconds_count{{phase="wait"}} {int(stats["completed"])}',
+        f'auth_hash_seconds_sum{{phase="run"}} {stats["run_seconds"]:.6f}',
+        f'auth_hash_seconds_count{{phase="run"}} {int(stats["completed"])}',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def shutdown() -> None:
+    """서버 종료 시 풀 정리"""
+    _pool.shutdown(wait=False, cancel_futures=True)
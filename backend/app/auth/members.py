@@ -0,0 +1,134 @@
+# app/auth/members.py
+"""
+SSAFY 금융망 사용자 계정(MEMBER) 연동
+
+- 워커 전체가 공유하는 httpx.AsyncClient(연결 풀, keep-alive)로 호출합니다.
+  (SSAFY_MAX_CONNECTIONS, 연결 3초 / 전체 SSAFY_TIMEOUT_SECONDS)
+- ensure_ssafy_member: 계정 생성(MEMBER_01)을 시도하고, 이미 존재하는 계정이면 조회(MEMBER_02)로 userKey 를 찾습니다.
+- SSAFY API에는 계정 삭제가 없으므로, 회원가입/일괄 등록은 users 행을 임시 userKey(pending:{user_id})로 먼저 저장해
+  아이디/이메일을 확보한 뒤에만 계정을 생성하고 userKey 를 갱신합니다. 저장이 충돌하면 계정을 만들지 않고,
+  계정 생성이 실패하면 임시 행을 지웁니다.
+"""
+from __future__ import annotations
+from typing import Optional
+import os
+
+import httpx
+from fastapi import HTTPException
+
+from app.ENV import API_KEY as apiKey
+
+MEMBER_URL = "https://finopenapi.ssafy.io/ssafy/api/v1/member/"
+MEMBER_SEARCH_URL = "https://finopenapi.ssafy.io/ssafy/api/v1/member/search"
+# 이미 존재하는 ID 응답 코드
+MEMBER_EXISTS_CODE = "E4002"
+
+MAX_CONNECTIONS = int(os.getenv("SSAFY_MAX_CONNECTIONS", "20"))
+TIMEOUT_SECONDS = float(os.getenv("SSAFY_TIMEOUT_SECONDS", "7"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+# 계정 생성 전 users.user_key(NOT NULL, UNIQUE) 자리 표시
+PENDING_KEY_PREFIX = "pending:"
+
+
+class MemberExistsError(Exception):
+    """SSAFY에 같은 userId 계정이 이미 있음"""
+
+
+def pending_user_key(user_id: str) -> str:
+    return f"{PENDING_KEY_PREFIX}{user_id}"
+
+
+def is_pending_user_key(user_key: Optional[str]) -> bool:
+    return bool(user_key) and user_key.startswith(PENDING_KEY_PREFIX)
+
+
+def get_client() -> httpx.AsyncClient:
+    """공유 클라이언트 (이벤트 루프 안에서 await 없이 만들므로 잠금 불필요)"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=3.0),
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=MAX_CONNECTIONS),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """서버 종료 시 연결 풀 정리"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _extract_user_key(data: dict) -> Optional[str]:
+    # 보편적으로 success/data/userKey 형태를 가정, 없으면 최상단 키 탐색
+    return (
+        (data.get("data") or {}).get("userKey")
+        or data.get("userKey")
+        or (data.get("result") or {}).get("userKey")
+    )
+
+
+async def _post(url: str, payload: dict, action: str) -> dict:
+    client = get_client()
+    try:
+        resp = await client.post(url, json=payload)
+    except httpx.RequestError as e:
+        # 네트워크/타임아웃 등
+        raise HTTPException(status_code=502, detail=f"SSAFY {action} 서버 연결 실패: {str(e)}")
+
+    # 상태 코드 체크
+    if resp.status_code >= 500:
+        raise HTTPException(status_code=502, detail=f"SSAFY {action} 서버 오류가 발생했습니다.")
+    try:
+        data = resp.json()
+    except Exception:
+        if resp.status_code >= 400:
+            raise HTTPException(status_code=400, detail=f"SSAFY {action} 요청이 거절되었습니다.")
+        raise HTTPException(status_code=502, detail=f"SSAFY {action} 응답 파싱 실패")
+
+    if resp.status_code >= 400:
+        if data.get("responseCode") == MEMBER_EXISTS_CODE:
+            raise MemberExistsError(payload.get("userId"))
+        # 4xx인 경우, 응답 메시지 전달
+        msg = data.get("responseMessage") or data.get("message") or data.get("detail") \
+            or f"SSAFY {action} 요청이 거절되었습니다."
+        raise HTTPException(status_code=400, detail=msg)
+    return data
+
+
+async def create_ssafy_member(user_email: str) -> str:
+    """
+    SSAFY MEMBER_01 (사용자 계정 생성)
+    요청: { "apiKey": "...", "userId": "<email>" }
+    성공 시 userKey 반환, 이미 있는 계정이면 MemberExistsError
+    """
+    data = await _post(MEMBER_URL, {"apiKey": apiKey, "userId": user_email}, "회원 생성")
+    user_key = _extract_user_key(data)
+    if not user_key:
+        # 응답에 userKey가 없다면 메시지 노출
+        msg = data.get("message") or "userKey가 포함되지 않은 응답입니다."
+        raise HTTPException(status_code=502, detail=f"SSAFY 회원 생성 실패: {msg}")
+    return user_key
+
+
+async def search_ssafy_member(user_email: str) -> str:
+    """SSAFY MEMBER_02 (사용자 계정 조회) → userKey"""
+    data = await _post(MEMBER_SEARCH_URL, {"apiKey": apiKey, "userId": user_email}, "회원 조회")
+    user_key = _extract_user_key(data)
+    if not user_key:
+        raise HTTPException(status_code=502, detail="SSAFY 회원 조회 응답에 userKey가 없습니다.")
+    return user_key
+
+
+async def ensure_ssafy_member(user_email: str) -> str:
+    """계정 생성, 이미 있으면(이전 가입 시도 등) 기존 계정의 userKey 조회"""
+    try:
+        return await create_ssafy_member(user_email)
+    except MemberExistsError:
+        return await search_ssafy_member(user_email)
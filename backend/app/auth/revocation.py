@@ -0,0 +1,311 @@
+# app/auth/revocation.py
+"""
+JWT 로그아웃(폐기) 저장소
+
+- 폐기된 토큰은 Redis jwt:revoked:{jti} 에 토큰의 남은 유효 시간만큼만 저장합니다. (값: 만료 시각)
+  만료된 토큰은 어차피 디코딩 단계에서 거부되므로, Redis 메모리는 유효한 폐기 토큰 수로 제한됩니다.
+- 워커마다 폐기된 jti 의 Bloom 필터를 두고, 만료 시각 구간(AUTH_REVOCATION_BUCKET_SECONDS)별 세대로 나눠
+  구간이 지나면 세대를 통째로 버립니다. (메모리 = 유효 기간 / 구간 × 세대 크기)
+- 백그라운드 스레드가 jwt:revocations 채널을 구독해 다른 워커의 로그아웃을 필터에 반영하고,
+  구독 직후(재연결 포함)와 AUTH_REVOCATION_RESYNC_SECONDS 마다 Redis의 폐기 목록 전체를 다시 읽어 누락을 메웁니다.
+- 구독 연결로 AUTH_REVOCATION_HEARTBEAT_SECONDS 마다 PING 을 보내, 응답(PONG/메시지)이 3회 주기 동안 없으면
+  연결이 끊긴 것으로(half-open 포함) 보고 다시 구독합니다.
+- 필터에 없으면 폐기되지 않은 토큰이므로 Redis를 조회하지 않습니다. 필터에 있거나(오탐 가능)
+  구독이 끊겼거나 응답이 늦어진 동안에는 Redis로 확인합니다.
+- 기존 jwt:blacklist(만료 없는 SET)는 서버 시작 시 migrate_legacy_blacklist 로 옮기고 만료시킵니다.
+"""
+from __future__ import annotations
+from typing import Dict, Optional
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+import redis
+
+from app.cache import rds
+from app.auth.utils import ACCESS_TOKEN_EXPIRE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = int(os.getenv("AUTH_REVOCATION_BUCKET_SECONDS", "3600"))
+# 세대(만료 시각 구간)별 예상 폐기 토큰 수와 허용 오탐률
+BUCKET_CAPACITY = int(os.getenv("AUTH_REVOCATION_BUCKET_CAPACITY", "50000"))
+FALSE_POSITIVE_RATE = float(os.getenv("AUTH_REVOCATION_FALSE_POSITIVE_RATE", "0.001"))
+RECONNECT_SECONDS = 1.0
+HEARTBEAT_SECONDS = float(os.getenv("AUTH_REVOCATION_HEARTBEAT_SECONDS", "5"))
+# 전체 다시 읽기 주기 (구독이 살아 있어도 필터가 이보다 오래 어긋나지 않음)
+RESYNC_SECONDS = float(os.getenv("AUTH_REVOCATION_RESYNC_SECONDS", "300"))
+
+CHANNEL = "jwt:revocations"
+# 만료 시각을 모르는 항목(기존 jwt:blacklist)의 저장 값
+LEGACY_EXP = 0
+LEGACY_BLACKLIST_KEY = "jwt:blacklist"
+SCAN_BATCH = 1000
+
+
+def revoked_key(jti: str) -> str:
+    return f"jwt:revoked:{jti}"
+
+
+class BloomFilter:
+    """고정 크기 Bloom 필터 (blake2b 128bit → double hashing)"""
+
+    def __init__(self, capacity: int = BUCKET_CAPACITY, false_positive_rate: float = FALSE_POSITIVE_RATE):
+        self.n_bits = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.n_bits for i in range(self.n_hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    """만료 시각 구간별 Bloom 필터 세대 + Redis pub/sub 동기화"""
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, heartbeat_seconds: float = HEARTBEAT_SECONDS,
+                 resync_seconds: float = RESYNC_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.resync_seconds = resync_seconds
+        # 구독 연결에서 마지막으로 응답을 받은 시각 (monotonic)
+        self._alive_at = 0.0
+        self._generations: Dict[int, BloomFilter] = {}
+        # 만료 시각을 모르는 기존 블랙리스트 항목 (모든 토큰에 대해 확인, 최대 유효 시간 뒤 삭제)
+        self._legacy: Optional[BloomFilter] = None
+        self._legacy_until = 0.0
+        self._lock = threading.Lock()
+        self._synced = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def synced(self) -> bool:
+        """구독 중이고 최근 heartbeat 주기 안에 연결 응답이 있었음"""
+        return self._synced.is_set() and time.monotonic() - self._alive_at < self.heartbeat_seconds * 3
+
+    def _bucket(self, exp: int) -> int:
+        return int(exp) // self.bucket_seconds
+
+    def add(self, jti: str, exp: int) -> None:
+        """exp 가 LEGACY_EXP(0)이면 기존 블랙리스트 항목"""
+        self.prune()
+        with self._lock:
+            if exp == LEGACY_EXP:
+                if self._legacy is None:
+                    self._legacy = BloomFilter()
+                self._legacy.add(jti)
+                self._legacy_until = time.time() + ACCESS_TOKEN_EXPIRE_SECONDS
+                return
+            bucket = self._bucket(exp)
+            generation = self._generations.get(bucket)
+            if generation is None:
+                generation = self._generations[bucket] = BloomFilter()
+            generation.add(jti)
+
+    def might_contain(self, jti: str, exp: int) -> bool:
+        with self._lock:
+            if self._legacy is not None and jti in self._legacy:
+                return True
+            generation = self._generations.get(self._bucket(exp))
+            return generation is not None and jti in generation
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """만료 시각 구간이 모두 지난 세대 삭제"""
+        now = now or time.time()
+        current = self._bucket(now)
+        with self._lock:
+            for bucket in [b for b in self._generations if b < current]:
+                del self._generations[bucket]
+            if self._legacy is not None and now > self._legacy_until:
+                self._legacy = None
+
+    @property
+    def generation_count(self) -> int:
+        return len(self._generations)
+
+    def ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jwt-revocations", daemon=True)
+                self._thread.start()
+
+    def _load_all(self) -> int:
+        """Redis의 폐기 목록 전체를 필터에 반영"""
+        loaded = 0
+        keys = []
+        for key in rds.scan_iter(match=revoked_key("*"), count=SCAN_BATCH):
+            keys.append(key)
+            if len(keys) >= SCAN_BATCH:
+                loaded += self._load_keys(keys)
+                keys = []
+        if keys:
+            loaded += self._load_keys(keys)
+        return loaded
+
+    def _load_keys(self, keys) -> int:
+        prefix = len(revoked_key(""))
+        loaded = 0
+        for key, exp in zip(keys, rds.mget(keys)):
+            if exp is not None:
+                self.add(key[prefix:], int(exp))
+                loaded += 1
+        return loaded
+
+    def stop(self) -> None:
+        """구독 스레드 종료 (다음 heartbeat 주기 안에 끝남)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_seconds + RECONNECT_SECONDS + 1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                # 구독을 먼저 시작한 뒤 전체를 읽어야 그 사이의 폐기를 놓치지 않음
+                pubsub = rds.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                loaded = self._load_all()
+                self._alive_at = time.monotonic()
+                self._synced.set()
+                logger.info("revocation filter synced (%d live revocations)", loaded)
+                self._listen(pubsub)
+            except (redis.RedisError, ValueError):
+                logger.warning("revocation subscription lost; checking Redis until resynced", exc_info=True)
+            finally:
+                self._synced.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except redis.RedisError:
+                        pass
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def _listen(self, pubsub) -> None:
+        """
+        구독 메시지 처리 (연결이 끊기거나 heartbeat 응답이 없으면 예외)
+        - listen() 은 half-open 연결에서 영원히 멈출 수 있으므로 timeout 을 둔 get_message 로 읽음
+        """
+        last_ping = last_resync = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now - self._alive_at >= self.heartbeat_seconds * 3:
+                raise redis.ConnectionError("no heartbeat on revocation subscription")
+            if now - last_ping >= self.heartbeat_seconds:
+                pubsub.ping()
+                last_ping = now
+            if now - last_resync >= self.resync_seconds:
+                self._load_all()
+                last_resync = now
+
+            message = pubsub.get_message(timeout=min(self.heartbeat_seconds, 1.0))
+            if message is None:
+                continue
+            self._alive_at = time.monotonic()
+            if message.get("type") != "message":
+                continue
+            jti, _, exp = message["data"].rpartition(":")
+            if jti:
+                self.add(jti, int(exp))
+                _forget_cached_token(jti)
+
+
+_filter = RevocationFilter()
+
+
+def _forget_cached_token(jti: str) -> None:
+    from app.auth.cache import forget_token
+
+    forget_token(jti)
+
+
+def _remaining_seconds(exp: Optional[int]) -> int:
+    if exp is None:
+        return ACCESS_TOKEN_EXPIRE_SECONDS
+    return int(exp - time.time())
+
+
+def revoke(jti: str, exp: Optional[int]) -> None:
+    """토큰 폐기 (남은 유효 시간만큼 저장 후 다른 워커에 전파)"""
+    ttl = _remaining_seconds(exp)
+    if ttl <= 0:
+        return
+    exp = int(time.time()) + ttl if exp is None else int(exp)
+
+    pipe = rds.pipeline()
+    pipe.setex(revoked_key(jti), ttl, exp)
+    pipe.publish(CHANNEL, f"{jti}:{exp}")
+    pipe.execute()
+
+    _filter.add(jti, exp)
+    _forget_cached_token(jti)
+
+
+def is_revoked(jti: str, exp: Optional[int]) -> bool:
+    """
+    폐기 여부 확인
+    - 동기화된 필터에 없으면 Redis 조회 없이 False
+    - 필터에 있거나 아직 동기화 전이면 Redis로 확인
+    """
+    _filter.ensure_started()
+    if exp is not None and _filter.synced and not _filter.might_contain(jti, exp):
+        return False
+    return bool(rds.exists(revoked_key(jti)))
+
+
+def migrate_legacy_blacklist() -> int:
+    """
+    만료 없는 jwt:blacklist SET 을 jwt:revoked:{jti} 로 복사
+    - 기존 항목은 만료 시각을 알 수 없으므로 토큰 최대 유효 시간 동안 유지
+    - 배포 중인 이전 버전 워커가 계속 읽을 수 있도록 SET 은 바로 지우지 않고 같은 시간 뒤 만료되게 함
+      (그 시점에는 SET 의 모든 토큰이 이미 만료됨)
+    - 여러 번(여러 워커에서 동시에) 실행해도 안전
+    """
+    migrated = 0
+    batch = []
+    for jti in rds.sscan_iter(LEGACY_BLACKLIST_KEY, count=SCAN_BATCH):
+        batch.append(jti)
+        if len(batch) >= SCAN_BATCH:
+            migrated += _migrate_batch(batch)
+            batch = []
+    if batch:
+        migrated += _migrate_batch(batch)
+    if migrated:
+        if rds.ttl(LEGACY_BLACKLIST_KEY) == -1:
+            rds.expire(LEGACY_BLACKLIST_KEY, ACCESS_TOKEN_EXPIRE_SECONDS)
+        logger.info("migrated %d legacy blacklist entries", migrated)
+    return migrated
+
+
+def _migrate_batch(jtis) -> int:
+    pipe = rds.pipeline()
+    for jti in jtis:
+        # 이미 옮겨진 항목(더 정확한 만료 시각)은 덮어쓰지 않음
+        pipe.set(revoked_key(jti), LEGACY_EXP, ex=ACCESS_TOKEN_EXPIRE_SECONDS, nx=True)
+        pipe.publish(CHANNEL, f"{jti}:{LEGACY_EXP}")
+    pipe.execute()
+    return len(jtis)
+
+
+def start() -> None:
+    """서버 시작 시 기존 블랙리스트 이전 + 동기화 스레드 시작"""
+    try:
+        migrate_legacy_blacklist()
+    except redis.RedisError:
+        logger.warning("legacy blacklist migration skipped (redis unavailable)")
+    _filter.ensure_started()
@@ -1,102 +1,57 @@
 # app/auth/router.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
-import time, random, string
-import httpx
+import asyncio
+import logging
+import os
+import re
+import uuid
 
 
 from app.auth.schemas import RegisterRequest, LoginRequest
-from app.auth.deps import get_current_user, bearer
-from app.auth.utils import hash_password, verify_password, create_access_token, decode_access_token
+from app.auth.deps import get_current_user, bearer, require_admin
+from app.auth import bulk_import
+from app.auth.revocation import revoke
+from app.auth.hashing import hash_password_async, verify_and_update_async, render_prometheus
+from app.auth.members import ensure_ssafy_member, pending_user_key
+from app.auth.utils import BCRYPT_ROUNDS, create_access_token, decode_access_token, generate_user_id
 from app.database import get_db
-from app.cache import rds
 from app.models import User, School, UserStats, UserRoleEnum, TierNameEnum
-from app.ENV import API_KEY as apiKey
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
-
-def generate_user_id() -> str:
-    timestamp = int(time.time())
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
-    return f"{timestamp:08X}{random_part}"
-
-# ---- SSAFY 회원 생성 헬퍼 ----
-def create_ssafy_member(user_email: str) -> str:
-    """
-    SSAFY MEMBER_01 (사용자 계정 생성)
-    요청: { "apiKey": "...", "userId": "<email>" }
-    성공 시 userKey(추정)를 반환. 실패 시 HTTPException 발생.
-    """
-    url = "https://finopenapi.ssafy.io/ssafy/api/v1/member/"
-    payload = {
-        "apiKey": apiKey,
-        "userId": user_email,
-    }
-    # 권장 타임아웃: 연결 3s / 전체 7s
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.post(url, json=payload)
-    except httpx.RequestError as e:
-        # 네트워크/타임아웃 등
-        raise HTTPException(status_code=502, detail=f"SSAFY 회원 생성 서버 연결 실패: {str(e)}")
-
-    # 상태 코드 체크
-    if resp.status_code >= 500:
-        raise HTTPException(status_code=502, detail="SSAFY 회원 생성 서버 오류가 발생했습니다.")
-    if resp.status_code >= 400:
-        # 4xx인 경우, 응답 메시지 전달
-        try:
-            j = resp.json()
-        except Exception:
-            j = {}
-        msg = j.get("message") or j.get("detail") or "SSAFY 회원 생성 요청이 거절되었습니다."
-        raise HTTPException(status_code=400, detail=msg)
-
-    # 응답 파싱 (명세 예시가 단순해서 방어적으로 처리)
-    try:
-        data = resp.json()
-    except Exception:
-        raise HTTPException(status_code=502, detail="SSAFY 회원 생성 응답 파싱 실패")
-
-    # 보편적으로 success/data/userKey 형태를 가정, 없으면 최상단 키 탐색
-    user_key = (
-        (data.get("data") or {}).get("userKey")
-        or data.get("userKey")
-        or (data.get("result") or {}).get("userKey")
-    )
-    if not user_key:
-        # 응답에 userKey가 없다면 메시지 노출
-        msg = data.get("message") or "userKey가 포함되지 않은 응답입니다."
-        raise HTTPException(status_code=502, detail=f"SSAFY 회원 생성 실패: {msg}")
-
-    return user_key
+logger = logging.getLogger(__name__)
 
+router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-@router.post("/register", summary="회원가입")
-def register(req: RegisterRequest, db: Session = Depends(get_db)):
+def _check_registration(db: Session, req: RegisterRequest) -> School:
     # 대학 확인
     school = db.query(School).filter(School.code == req.university_code).first()
     if not school:
         raise HTTPException(status_code=400, detail="등록되지 않은 대학입니다.")
-    
+
     # 중복 체크
     if db.query(User).filter((User.login_id == req.login_id) | (User.email == req.email)).first():
         raise HTTPException(status_code=400, detail="이미 사용 중인 아이디 또는 이메일입니다.")
-    
-
-    # 여기에 사용자 생성 api 호출해서 응답받고
-    # user 테이블의 userKey 칼럼에 저장
-    user_key = create_ssafy_member(req.email)  # userId는 이메일 형식
+    return school
 
-    
+def _create_user(db: Session, req: RegisterRequest, school: School, password: str) -> dict:
+    """
+    임시 userKey 로 사용자 저장 후 응답용 사용자 정보 반환
+    - 아이디/이메일을 먼저 확보해야 SSAFY 계정이 남지 않으므로 계정 생성 전에 저장합니다.
+    - 커밋하면 ORM 속성이 만료되므로, 이벤트 루프에서 다시 SELECT 하지 않도록 커밋 전에 값을 모아 둠
+    """
     # 사용자 생성
+    user_id = generate_user_id()
     user = User(
-        id=generate_user_id(),
+        id=user_id,
         login_id=req.login_id,
         email=req.email,
-        user_key=user_key,
-        password=hash_password(req.password),
+        user_key=pending_user_key(user_id),
+        password=password,
         real_name=req.real_name,
         gender=req.gender,
         birth_year=req.birth_year,
@@ -106,69 +61,205 @@ def register(req: RegisterRequest, db: Session = Depends(get_db)):
         role=UserRoleEnum.GUEST,
     )
     db.add(user)
-    
+
     # 초기 통계
     stat = UserStats(user_id=user.id, total_exp=0, current_tier=TierNameEnum.BASIC)
     db.add(stat)
-    
+
+    profile = {
+        "user_id": user.id,
+        "name": req.real_name,
+        "email": req.email,
+        "university_name": school.name,
+        "current_tier": TierNameEnum.BASIC,
+        "total_exp": 0,
+        "has_savings": False
+    }
+    try:
+        db.commit()
+    except IntegrityError:
+        # 확인 이후 같은 아이디/이메일로 먼저 가입된 경우 (SSAFY 계정은 아직 만들지 않음)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="이미 사용 중인 아이디 또는 이메일입니다.")
+    return profile
+
+def _set_user_key(db: Session, user_id: str, user_key: str) -> None:
+    db.execute(text("UPDATE users SET user_key = :user_key WHERE id = :id"),
+               {"id": user_id, "user_key": user_key})
     db.commit()
-    
-    token = create_access_token({"sub": user.id})
+
+def _discard_pending_user(db: Session, user_id: str) -> None:
+    """SSAFY 계정 생성에 실패한 임시 사용자 삭제 (같은 아이디/이메일로 다시 가입 가능)"""
+    db.rollback()
+    params = {"id": user_id, "user_key": pending_user_key(user_id)}
+    db.execute(text("""
+        DELETE FROM user_stats
+        WHERE user_id = (SELECT id FROM users WHERE id = :id AND user_key = :user_key)
+    """), params)
+    db.execute(text("DELETE FROM users WHERE id = :id AND user_key = :user_key"), params)
+    db.commit()
+
+async def _cancel(*tasks: asyncio.Task) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@router.post("/register", summary="회원가입")
+async def register(req: RegisterRequest, db: Session = Depends(get_db)):
+    # bcrypt 해시(전용 풀)는 DB 확인과 동시에 시작
+    hash_task = asyncio.create_task(hash_password_async(req.password))
+    try:
+        school = await run_in_threadpool(_check_registration, db, req)
+        password = await hash_task
+    except BaseException:
+        await _cancel(hash_task)
+        raise
+
+    # 임시 userKey 로 먼저 저장해 아이디/이메일을 확보 (충돌하면 SSAFY 계정을 만들지 않고 400)
+    profile = await run_in_threadpool(_create_user, db, req, school, password)
+
+    # SSAFY 사용자 계정(공유 연결 풀) 생성 후 userKey 갱신 (보낸 생성 요청은 되돌릴 수 없음)
+    # userId는 이메일 형식, 이미 있는 계정이면 조회해서 userKey 사용
+    try:
+        user_key = await ensure_ssafy_member(req.email)
+        await run_in_threadpool(_set_user_key, db, profile["user_id"], user_key)
+    except BaseException:
+        await run_in_threadpool(_discard_pending_user, db, profile["user_id"])
+        raise
+
+    token = create_access_token({"sub": profile["user_id"]})
     
     return {
         "success": True,
         "data": {
             "access_token": token,
-            "user": {
-                "user_id": user.id,
-                "name": user.real_name,
-                "email": user.email,
-                "university_name": school.name,
-                "current_tier": TierNameEnum.BASIC,
-                "total_exp": 0,
-                "has_savings": False
-            }
+            "user": profile
         },
         "message": "회원가입이 완료되었습니다."
     }
 
+def _find_login_user(db: Session, login_id: str):
+    return db.query(User).filter(User.login_id == login_id).first()
+
+def _load_login_profile(db: Session, user: User, new_hash: str | None) -> dict:
+    """응답용 사용자 정보 (커밋으로 만료된 속성을 이벤트 루프에서 다시 읽지 않도록 스레드 안에서 구성)"""
+    # 비용 설정이 바뀐 해시는 새 해시로 교체
+    if new_hash:
+        user.password = new_hash
+        db.commit()
+    stat = db.query(UserStats).filter(UserStats.user_id == user.id).first()
+    school = db.query(School).filter(School.id == user.school_id).first()
+    return {
+        "user_id": user.id,
+        "name": user.real_name,
+        "login_id": user.login_id,
+        "email": user.email,
+        "university_name": school.name if school else None,
+        "current_tier": stat.current_tier if stat else TierNameEnum.BRONZE,
+        "total_exp": stat.total_exp if stat else 0,
+        "has_savings": False
+    }
+
 @router.post("/login", summary="로그인")
-def login(req: LoginRequest, db: Session = Depends(get_db)):
+async def login(req: LoginRequest, db: Session = Depends(get_db)):
     # login_id 필드 확인
     login_id = getattr(req, 'login_id', None) or getattr(req, 'email', None)
     if not login_id:
         raise HTTPException(status_code=400, detail="로그인 ID가 필요합니다.")
     
-    user = db.query(User).filter(User.login_id == login_id).first()
-    if not user or not verify_password(req.password, user.password):
+    # DB 조회는 기본 스레드 풀, bcrypt 검증은 전용 풀(포화 시 503)에서 실행
+    user = await run_in_threadpool(_find_login_user, db, login_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="아이디 또는 비밀번호가 올바르지 않습니다.")
+    verified, new_hash = await verify_and_update_async(req.password, user.password)
+    if not verified:
         raise HTTPException(status_code=401, detail="아이디 또는 비밀번호가 올바르지 않습니다.")
     
-    stat = db.query(UserStats).filter(UserStats.user_id == user.id).first()
-    school = db.query(School).filter(School.id == user.school_id).first()
+    profile = await run_in_threadpool(_load_login_profile, db, user, new_hash)
     
-    token = create_access_token({"sub": user.id})
+    token = create_access_token({"sub": profile["user_id"]})
     
     return {
         "success": True,
         "data": {
             "access_token": token,
-            "user": {
-                "user_id": user.id,
-                "name": user.real_name,
-                "login_id": user.login_id,
-                "email": user.email,
-                "university_name": school.name if school else None,
-                "current_tier": stat.current_tier if stat else TierNameEnum.BRONZE,
-                "total_exp": stat.total_exp if stat else 0,
-                "has_savings": False
-            }
+            "user": profile
         }
     }
 
+@router.get("/metrics", summary="비밀번호 해시 풀 지표 (Prometheus)", response_class=PlainTextResponse)
+def password_hash_metrics():
+    return render_prometheus()
+
+# ---- 사용자 일괄 등록 (관리자) ----
+_IMPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+# 상태 조회 시 돌려주는 실패 행 수
+_FAILURE_PREVIEW = 100
+
+def _import_status(import_id: str):
+    if not _IMPORT_ID.match(import_id) or bulk_import.find_source(import_id) is None:
+        raise HTTPException(status_code=404, detail="일괄 등록 작업을 찾을 수 없습니다.")
+    summary = bulk_import.read_progress(bulk_import.progress_path(import_id))
+    summary["failures"] = summary["failures"][:_FAILURE_PREVIEW]
+    summary["running"] = bulk_import.is_running(import_id)
+    return {"success": True, "data": {"import_id": import_id, **summary}}
+
+@router.post("/bulk-import", summary="사용자 일괄 등록 시작 (관리자)")
+async def start_bulk_import(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    rounds: int = Query(BCRYPT_ROUNDS, ge=bulk_import.MIN_ROUNDS, le=BCRYPT_ROUNDS),
+    admin: User = Depends(require_admin),
+):
+    # 요청 본문(파일 내용)을 디스크로 스트리밍한 뒤 별도 프로세스에서 처리 (파일 쓰기는 스레드 풀)
+    # 크기 제한(AUTH_BULK_MAX_UPLOAD_BYTES)은 Content-Length 로 먼저 확인하고, 스트리밍 중에도 넘으면 중단
+    too_large = HTTPException(status_code=413, detail="업로드 파일이 너무 큽니다.")
+    if int(request.headers.get("content-length") or 0) > bulk_import.MAX_UPLOAD_BYTES:
+        raise too_large
+    import_id = uuid.uuid4().hex
+    path = bulk_import.source_path(import_id, format)
+    await run_in_threadpool(os.makedirs, bulk_import.IMPORT_DIR, exist_ok=True)
+    f = await run_in_threadpool(open, path, "wb")
+    written = 0
+    try:
+        async for part in request.stream():
+            written += len(part)
+            if written > bulk_import.MAX_UPLOAD_BYTES:
+                raise too_large
+            await run_in_threadpool(f.write, part)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(os.remove, path)
+        raise
+    await run_in_threadpool(f.close)
+    await run_in_threadpool(bulk_import.launch, import_id, rounds)
+    return await run_in_threadpool(_import_status, import_id)
+
+@router.get("/bulk-import/{import_id}", summary="사용자 일괄 등록 진행 상황 (관리자)")
+def get_bulk_import(import_id: str, admin: User = Depends(require_admin)):
+    return _import_status(import_id)
+
+@router.post("/bulk-import/{import_id}/resume", summary="중단된 사용자 일괄 등록 이어서 실행 (관리자)")
+def resume_bulk_import(
+    import_id: str,
+    rounds: int = Query(BCRYPT_ROUNDS, ge=bulk_import.MIN_ROUNDS, le=BCRYPT_ROUNDS),
+    admin: User = Depends(require_admin),
+):
+    status = _import_status(import_id)
+    if status["data"]["status"] == "done":
+        raise HTTPException(status_code=400, detail="이미 완료된 작업입니다.")
+    if status["data"]["running"]:
+        raise HTTPException(status_code=409, detail="이미 실행 중인 작업입니다.")
+    # 동시에 두 번 요청되어도 나중 프로세스는 실행 잠금을 얻지 못하고 종료
+    bulk_import.launch(import_id, rounds)
+    return _import_status(import_id)
+
 @router.post("/logout", summary="로그아웃")
 def logout(creds=Depends(bearer), current_user=Depends(get_current_user)):
     payload = decode_access_token(creds.credentials)
     jti = payload.get("jti")
     if jti:
-        rds.sadd("jwt:blacklist", jti)
+        # 토큰 남은 유효 시간 동안만 저장하고 모든 워커에 전파
+        revoke(jti, payload.get("exp"))
     return {"success": True, "message": "로그아웃되었습니다."}
\ No newline at end of file
@@ -3,8 +3,17 @@ from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 import uuid, os
+import time, random, string
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt 비용. 바꾸면 기존 해시는 다음 로그인 때 새 비용으로 다시 저장됨 (verify_and_update)
+BCRYPT_ROUNDS = int(os.getenv("AUTH_BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,11 +21,21 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
+def verify_and_update(password: str, hashed: str):
+    """(일치 여부, 현재 비용 설정과 다르면 새 해시 / 아니면 None)"""
+    return pwd_context.verify_and_update(password, hashed)
+
+def generate_user_id() -> str:
+    timestamp = int(time.time())
+    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
+    return f"{timestamp:08X}{random_part}"
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_SECONDS = 60 * 60 * 24
 
 def create_access_token(data: dict):
-    expire = datetime.now(timezone.utc) + timedelta(hours=24)
+    expire = datetime.now(timezone.utc) + timedelta(seconds=ACCESS_TOKEN_EXPIRE_SECONDS)
     data.update({"exp": expire, "jti": str(uuid.uuid4())})
     return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
 
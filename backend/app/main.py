@@ -9,6 +9,11 @@ from .accounts.router import router as accounts_router
 from .attendance.router import router as attendance_router
 from .recommend.router import recommendation_router
 from .surveys.router import router as survey_router
+from .recommend.persistence import flush_pending
+from .recommend import executor as recommend_executor
+from .auth import revocation
+from .auth import hashing as password_hashing
+from .auth import members as ssafy_members
 
 app = FastAPI(
     title="쏠쏠한 퀘스트 API",
@@ -32,6 +37,25 @@ app.include_router(attendance_router, prefix="/api/v1")
 app.include_router(recommendation_router, prefix="/api/v1")
 app.include_router(survey_router, prefix="/api/v1")
 
+@app.on_event("startup")
+def start_token_revocation_sync():
+    # 기존 jwt:blacklist 이전 + 로그아웃 토큰 필터 동기화 시작
+    revocation.start()
+
+@app.on_event("shutdown")
+def flush_recommendation_writes():
+    # write-behind 모드에서 아직 저장되지 않은 추천 기록 저장
+    flush_pending()
+    recommend_executor.shutdown()
+
+@app.on_event("shutdown")
+def stop_password_hashing():
+    password_hashing.shutdown()
+
+@app.on_event("shutdown")
+async def close_ssafy_client():
+    await ssafy_members.close_client()
+
 @app.get("/api/v1/health")
 def health_check():
     return {"success": True, "message": "API is running"}
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, String, Integer, SmallInteger, Boolean, UniqueConstraint,
-    DateTime, Date, DECIMAL, Text, ForeignKey, Enum as SQLEnum
+    DateTime, Date, DECIMAL, Float, Text, ForeignKey, Enum as SQLEnum
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -219,10 +219,32 @@ class QuestRecommendation(Base):
     is_click = Column(Boolean, nullable=False)
     is_cleared = Column(Boolean, nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "quest_id", "recommendation_date", name="uniq_user_quest_date"),
+    )
+
     user = relationship("User", back_populates="quest_recos")
     quest = relationship("Quest", back_populates="recos")
 
 
+# 협업 필터링용 유사 사용자 인덱스 (app/recommend/neighbors.py 배치가 갱신)
+class UserNeighbor(Base):
+    __tablename__ = "user_neighbors"
+    user_id = Column(String(26), ForeignKey("users.id"), primary_key=True)
+    neighbor_id = Column(String(26), ForeignKey("users.id"), primary_key=True)
+    rank = Column(SmallInteger, nullable=False)
+    similarity = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+# 사용자별 마지막 인덱싱 시점의 상호작용 요약 (변경 감지용)
+class UserNeighborState(Base):
+    __tablename__ = "user_neighbor_state"
+    user_id = Column(String(26), ForeignKey("users.id"), primary_key=True)
+    fingerprint = Column(String(128), nullable=False)
+    refreshed_at = Column(DateTime, nullable=False)
+
+
 class QuestRecoInteraction(Base):
     __tablename__ = "quest_reco_interactions"
     id = Column(String(26), primary_key=True)
@@ -12,6 +12,8 @@ from app.models import (
     Quest, QuestAttempt, QuestAttemptStatusEnum, 
     SchoolLeaderboard, TierNameEnum, PeriodScopeEnum
 )
+from app.recommend.stats import record_interaction
+from app.recommend.cache import invalidate_daily
 
 def _now_kst() -> datetime:
     return datetime.now(ZoneInfo("Asia/Seoul"))
@@ -107,6 +109,13 @@ def complete_quest(db: Session, user_id: str, quest_id: str):
         db.commit()
         db.refresh(user_stat)
 
+        # 7) 추천 이력에 완료 반영 (추천 통계 갱신, 실패해도 완료 처리는 유지) 후 오늘의 추천 캐시 삭제
+        try:
+            record_interaction(db, user_id=user_id, quest_id=quest_id, cleared=True)
+        except SQLAlchemyError:
+            db.rollback()
+        invalidate_daily(user_id)
+
         return {
             "success": True,
             "data": {
@@ -0,0 +1,168 @@
+# app/recommend/als.py
+"""
+암시적 피드백 행렬 분해 (Implicit ALS) 추천 모델
+
+- quest_recommendations의 상호작용 점수(is_click 0.3 / is_cleared 0.7)를 신뢰도로 사용합니다.
+  선호 p = 1 (상호작용 있음), 신뢰도 c = 1 + alpha * score  (Hu, Koren, Volinsky 2008)
+- 오프라인으로 학습해 사용자/퀘스트 잠재 벡터를 스냅샷("als", snapshot.py)으로 저장하고,
+  워커는 mmap 으로 공유해 요청 시에는 사용자 벡터 · 퀘스트 벡터 내적 1회로 모든 퀘스트 점수를 계산합니다.
+
+학습:
+    python -m app.recommend.als --factors 32 --iterations 10
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+
+from .matrix import InteractionMatrix
+from .snapshot import MODEL_DIR, Snapshot, get_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_NAME = "als"
+
+_loaded: dict = {"key": None, "model": None}
+_load_lock = threading.Lock()
+
+
+def _solve_side(fixed: np.ndarray, indptr: np.ndarray, indices: np.ndarray, values: np.ndarray,
+                regularization: float, alpha: float) -> np.ndarray:
+    """한쪽(사용자 또는 퀘스트) 잠재 벡터를 고정된 반대편 벡터로부터 계산"""
+    n_rows = len(indptr) - 1
+    n_factors = fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(n_factors)
+    solved = np.zeros((n_rows, n_factors), dtype=np.float64)
+
+    for i in range(n_rows):
+        start, end = indptr[i], indptr[i + 1]
+        if start == end:
+            continue
+        y = fixed[indices[start:end]]
+        confidence = alpha * values[start:end]
+        # (YᵀY + Yᵀ(Cᵤ - I)Y + λI) xᵤ = YᵀCᵤp
+        a = gram + (y.T * confidence) @ y
+        b = y.T @ (1.0 + confidence)
+        solved[i] = np.linalg.solve(a, b)
+
+    return solved
+
+
+def train_als(matrix: InteractionMatrix, factors: int = 32, regularization: float = 0.1,
+              alpha: float = 40.0, iterations: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """상호작용 행렬로부터 (사용자 벡터, 퀘스트 벡터) 학습"""
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.01, size=(matrix.n_users, factors))
+    item_factors = rng.normal(scale=0.01, size=(matrix.n_quests, factors))
+
+    # 퀘스트(열) 기준 원본 값 (정규화 전 상호작용 점수)
+    order = np.argsort(matrix.indices, kind="stable")
+    col_values = matrix.data[order].astype(np.float64)
+    row_values = matrix.data.astype(np.float64)
+
+    for iteration in range(iterations):
+        started = time.monotonic()
+        user_factors = _solve_side(item_factors, matrix.indptr, matrix.indices, row_values,
+                                   regularization, alpha)
+        item_factors = _solve_side(user_factors, matrix.col_indptr, matrix.col_rows, col_values,
+                                   regularization, alpha)
+        logger.info("als iteration %d/%d (%.1fs)", iteration + 1, iterations, time.monotonic() - started)
+
+    return user_factors.astype(np.float32), item_factors.astype(np.float32)
+
+
+def save_model(user_ids: List[str], quest_ids: List[str],
+               user_factors: np.ndarray, item_factors: np.ndarray, meta: Optional[Dict] = None,
+               root: str = MODEL_DIR) -> str:
+    """모델을 새 스냅샷 버전으로 저장"""
+    return write_snapshot(SNAPSHOT_NAME, {
+        "user_ids": np.asarray(user_ids, dtype=str),
+        "quest_ids": np.asarray(quest_ids, dtype=str),
+        "user_factors": user_factors,
+        "item_factors": item_factors,
+    }, meta=meta, root=root)
+
+
+class ALSModel:
+    """학습된 ALS 잠재 벡터 (서빙용)"""
+
+    def __init__(self, user_ids: List[str], quest_ids: List[str],
+                 user_factors: np.ndarray, item_factors: np.ndarray):
+        self.user_index: Dict[str, int] = {uid: i for i, uid in enumerate(user_ids)}
+        self.quest_ids = quest_ids
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "ALSModel":
+        """스냅샷 배열로 모델 구성 (잠재 벡터는 mmap 그대로 사용)"""
+        return cls(snapshot["user_ids"].tolist(), snapshot["quest_ids"].tolist(),
+                   snapshot["user_factors"], snapshot["item_factors"])
+
+    def score(self, user_id: str) -> Optional[np.ndarray]:
+        """사용자 벡터 · 퀘스트 벡터 (학습에 없던 사용자는 None)"""
+        u = self.user_index.get(user_id)
+        if u is None:
+            return None
+        return self.item_factors @ self.user_factors[u]
+
+
+def get_model(root: str = MODEL_DIR) -> Optional[ALSModel]:
+    """워커에 상주하는 ALS 모델 (새 스냅샷이 생기면 자동 교체)"""
+    snapshot = get_snapshot(SNAPSHOT_NAME, root)
+    if snapshot is None:
+        return None
+    with _load_lock:
+        if _loaded["key"] != (root, snapshot.version):
+            _loaded["model"] = ALSModel.from_snapshot(snapshot)
+            _loaded["key"] = (root, snapshot.version)
+        return _loaded["model"]
+
+
+def reset() -> None:
+    """워커에 상주하는 ALS 모델 비우기 (다음 get_model 에서 스냅샷을 다시 읽음)"""
+    with _load_lock:
+        _loaded["key"] = None
+        _loaded["model"] = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Implicit ALS 추천 모델 학습")
+    parser.add_argument("--factors", type=int, default=32)
+    parser.add_argument("--regularization", type=float, default=0.1)
+    parser.add_argument("--alpha", type=float, default=40.0)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.database import SessionLocal
+    from .system import get_recommender
+
+    db = SessionLocal()
+    try:
+        matrix = get_recommender()._build_interaction_matrix(db)
+    finally:
+        db.close()
+
+    logger.info("training als on %d users x %d quests (%d interactions)",
+                matrix.n_users, matrix.n_quests, matrix.nnz)
+    user_factors, item_factors = train_als(matrix, factors=args.factors,
+                                           regularization=args.regularization,
+                                           alpha=args.alpha, iterations=args.iterations)
+    version = save_model(matrix.user_ids, matrix.quest_ids, user_factors, item_factors, meta={
+        "factors": args.factors,
+        "regularization": args.regularization,
+        "alpha": args.alpha,
+        "iterations": args.iterations,
+        "interactions": matrix.nnz,
+    })
+    logger.info("saved als snapshot %s", version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+# app/recommend/bench.py
+"""
+추천 시스템 합성 데이터 벤치마크
+
+- 사용자/설문 답변/퀘스트/quest_recommendations 상호작용을 지정한 규모로 생성해
+  SQLite(기본 메모리)에 적재한 뒤, 아래 경로를 반복 호출합니다.
+    recommend_quests        : 요청 경로 전체 (충분성 체크 → 하이브리드/Cold Start → 저장)
+    hybrid                  : _hybrid_recommendation
+    cold_start              : compute_recommendations(is_data_sufficient=False)
+- 경로별 p50/p95/p99 지연(ms), 처리량(req/s), 최대 RSS(MB)를 JSON으로 출력합니다.
+  버전 간 결과 파일을 비교해 성능 회귀를 확인합니다.
+- 기본적으로 Redis 는 연결 불가 상태로 두어 캐시 없이 매번 계산하는 경로를 측정합니다.
+  (--redis 를 주면 REDIS_URL 의 실제 Redis 사용)
+
+실행:
+    python -m app.recommend.bench --scale 10k
+    python -m app.recommend.bench --users 5000 --requests 1000 --cf-mode item --output bench.json
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List
+from datetime import date, datetime, timedelta
+import argparse
+import json
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+
+import numpy as np
+import redis
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+SCALES = {"1k": 1000, "10k": 10000, "100k": 100000}
+
+# MySQL 전용 타입(TINYINT 등) 없이 추천 경로가 사용하는 테이블만 생성
+SCHEMA = [
+    """CREATE TABLE users (
+        id VARCHAR(26) PRIMARY KEY, gender VARCHAR(10), birth_year INTEGER,
+        school_id VARCHAR(26), department VARCHAR(255), grade INTEGER)""",
+    """CREATE TABLE quests (
+        id VARCHAR(26) PRIMARY KEY, type VARCHAR(16) NOT NULL, title VARCHAR(255) NOT NULL,
+        category VARCHAR(16) NOT NULL, verify_method VARCHAR(16) NOT NULL, verify_params TEXT,
+        reward_exp INTEGER NOT NULL, target_count INTEGER NOT NULL, period_scope VARCHAR(16) NOT NULL,
+        active BOOLEAN NOT NULL, lat REAL, lng REAL, quest_link_url VARCHAR(2048),
+        created_at TIMESTAMP NOT NULL)""",
+    """CREATE TABLE survey_answers (
+        id VARCHAR(26) PRIMARY KEY, user_id VARCHAR(26) NOT NULL, question_id VARCHAR(26) NOT NULL,
+        question_type INTEGER NOT NULL, option_order_no INTEGER NOT NULL)""",
+    "CREATE INDEX idx_survey_user ON survey_answers(user_id)",
+    """CREATE TABLE quest_recommendations (
+        id VARCHAR(26) PRIMARY KEY, user_id VARCHAR(26) NOT NULL, quest_id VARCHAR(26) NOT NULL,
+        recommendation_date DATE NOT NULL, is_click BOOLEAN NOT NULL, is_cleared BOOLEAN NOT NULL,
+        UNIQUE (user_id, quest_id, recommendation_date))""",
+    "CREATE INDEX idx_user_date ON quest_recommendations(user_id, recommendation_date)",
+    "CREATE INDEX idx_date ON quest_recommendations(recommendation_date)",
+    """CREATE TABLE user_neighbors (
+        user_id VARCHAR(26) NOT NULL, neighbor_id VARCHAR(26) NOT NULL, rank INTEGER NOT NULL,
+        similarity REAL NOT NULL, updated_at TIMESTAMP NOT NULL, PRIMARY KEY (user_id, neighbor_id))""",
+    """CREATE TABLE user_neighbor_state (
+        user_id VARCHAR(26) PRIMARY KEY, fingerprint VARCHAR(128) NOT NULL,
+        refreshed_at TIMESTAMP NOT NULL)""",
+]
+
+CATEGORIES = ["STUDY", "SAVING", "ECON", "LIFE", "HEALTH", "ENT"]
+VERIFY_METHODS = ["GPS", "STEPS", "LINK", "PAYMENT", "ATTENDANCE"]
+PERIOD_SCOPES = ["DAILY", "WEEKLY", "MONTHLY", "ANY"]
+SURVEY_OPTION_COUNTS = [4, 6, 5, 4, 3, 4, 4, 4, 4, 4, 4, 4]
+
+
+class OfflineRedis:
+    """연결 불가 Redis (모든 호출이 ConnectionError → 캐시/카운터 폴백 경로 측정)"""
+
+    def __getattr__(self, name):
+        def unavailable(*args, **kwargs):
+            raise redis.ConnectionError("redis disabled for benchmark")
+        return unavailable
+
+    def pipeline(self, *args, **kwargs):
+        return self
+
+
+def disable_redis() -> None:
+    """추천 모듈의 Redis 클라이언트를 연결 불가 상태로 교체"""
+    from . import cache, precompute, segments, stats
+
+    offline = OfflineRedis()
+    for module in (cache, precompute, segments, stats):
+        module.rds = offline
+
+
+def build_database(n_users: int, n_quests: int, interactions_per_user: float,
+                   survey_rate: float, seed: int, path: str = ":memory:") -> Session:
+    """합성 데이터가 적재된 SQLite 세션 생성"""
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "detect_types": sqlite3.PARSE_DECLTYPES},
+        poolclass=StaticPool,
+    )
+    rng = random.Random(seed)
+    today = date.today()
+
+    with engine.begin() as conn:
+        for ddl in SCHEMA:
+            conn.execute(text(ddl))
+
+        quest_ids = []
+        quest_rows = []
+        for j in range(n_quests):
+            # 기본 추천 ID(quest_growth_008 등)가 실제로 존재하도록 같은 명명 규칙 사용
+            quest_id = f"quest_growth_{j // 2:03d}" if j % 2 else f"quest_daily_{j // 2:03d}"
+            quest_ids.append(quest_id)
+            quest_rows.append({
+                "id": quest_id,
+                "type": "GROWTH" if j % 2 else "LIFE",
+                "title": f"퀘스트 {j}",
+                "category": CATEGORIES[j % len(CATEGORIES)],
+                "verify_method": rng.choice(VERIFY_METHODS),
+                "reward_exp": rng.choice([10, 30, 50, 100, 150]),
+                "target_count": rng.choice([1, 3, 5, 10, 30]),
+                "period_scope": rng.choice(PERIOD_SCOPES),
+                "created_at": datetime(2025, 1, 1),
+            })
+        conn.execute(text("""
+            INSERT INTO quests (id, type, title, category, verify_method, reward_exp,
+                                target_count, period_scope, active, created_at)
+            VALUES (:id, :type, :title, :category, :verify_method, :reward_exp,
+                    :target_count, :period_scope, 1, :created_at)
+        """), quest_rows)
+
+        # 퀘스트 인기도는 Zipf 형태로 치우치게 생성
+        popularity = 1.0 / np.arange(1, n_quests + 1)
+        popularity /= popularity.sum()
+        np_rng = np.random.default_rng(seed)
+
+        user_rows, answer_rows, reco_rows = [], [], []
+        for i in range(n_users):
+            user_id = f"U{i:025d}"
+            user_rows.append({
+                "id": user_id,
+                "gender": rng.choice(["M", "F", None]),
+                "birth_year": rng.choice([None, 1995, 2000, 2002, 2004, 2006]),
+                "grade": rng.choice([None, 1, 2, 3, 4]),
+            })
+            if rng.random() < survey_rate:
+                for question_type, n_options in enumerate(SURVEY_OPTION_COUNTS, start=1):
+                    answer_rows.append({
+                        "id": f"A{i:021d}{question_type:04d}",
+                        "user_id": user_id,
+                        "question_id": f"SQ{question_type:024d}",
+                        "question_type": question_type,
+                        "option_order_no": rng.randint(1, n_options),
+                    })
+            n_interactions = np_rng.poisson(interactions_per_user)
+            for k, j in enumerate(np_rng.choice(n_quests, size=n_interactions, p=popularity)):
+                cleared = rng.random() < 0.4
+                reco_rows.append({
+                    "id": f"R{i:019d}{k:06d}",
+                    "user_id": user_id,
+                    "quest_id": quest_ids[j],
+                    "recommendation_date": today - timedelta(days=rng.randint(1, 60)),
+                    "is_click": cleared or rng.random() < 0.7,
+                    "is_cleared": cleared,
+                })
+
+            if len(reco_rows) >= 50000 or i == n_users - 1:
+                conn.execute(text("""
+                    INSERT INTO users (id, gender, birth_year, grade)
+                    VALUES (:id, :gender, :birth_year, :grade)
+                """), user_rows)
+                if answer_rows:
+                    conn.execute(text("""
+                        INSERT INTO survey_answers (id, user_id, question_id, question_type, option_order_no)
+                        VALUES (:id, :user_id, :question_id, :question_type, :option_order_no)
+                    """), answer_rows)
+                if reco_rows:
+                    conn.execute(text("""
+                        INSERT OR IGNORE INTO quest_recommendations
+                        (id, user_id, quest_id, recommendation_date, is_click, is_cleared)
+                        VALUES (:id, :user_id, :quest_id, :recommendation_date, :is_click, :is_cleared)
+                    """), reco_rows)
+                user_rows, answer_rows, reco_rows = [], [], []
+
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name: str, call: Callable[[str], object], user_ids: List[str],
+                 n_requests: int, warmup: int, rng: random.Random) -> Dict:
+    """사용자를 무작위로 골라 call(user_id) 반복 호출 후 지연 분포 계산"""
+    for user_id in rng.sample(user_ids, min(warmup, len(user_ids))):
+        call(user_id)
+
+    latencies = np.empty(n_requests, dtype=np.float64)
+    started = time.perf_counter()
+    for i in range(n_requests):
+        user_id = rng.choice(user_ids)
+        t0 = time.perf_counter()
+        call(user_id)
+        latencies[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        "requests": n_requests,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(latencies.mean() * 1000), 3),
+        "throughput_rps": round(n_requests / elapsed, 1) if elapsed > 0 else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def run_benchmark(n_users: int, n_quests: int = 60, interactions_per_user: float = 15.0,
+                  survey_rate: float = 0.8, n_requests: int = 500, warmup: int = 20,
+                  cf_mode: str = "user", neighbor_index: bool = False, use_redis: bool = False,
+                  scenarios: List[str] = None, seed: int = 0, db_path: str = ":memory:") -> Dict:
+    from .system import get_recommender
+
+    if not use_redis:
+        disable_redis()
+
+    setup_started = time.perf_counter()
+    db = build_database(n_users, n_quests, interactions_per_user, survey_rate, seed, db_path)
+    setup_seconds = time.perf_counter() - setup_started
+
+    system = get_recommender()
+    system.cf_mode = cf_mode
+
+    if neighbor_index:
+        from .neighbors import refresh_neighbor_index
+        refresh_neighbor_index(db, full=True)
+
+    is_sufficient, sufficiency = system._check_data_sufficiency(db)
+    user_ids = [r.id for r in db.execute(text("SELECT id FROM users")).fetchall()]
+    interacted_ids = [r.user_id for r in db.execute(text(
+        "SELECT DISTINCT user_id FROM quest_recommendations WHERE is_click = 1 OR is_cleared = 1"
+    )).fetchall()]
+
+    calls = {
+        "recommend_quests": (lambda uid: system.recommend_quests(db, uid), user_ids),
+        "hybrid": (lambda uid: system._hybrid_recommendation(db, uid), interacted_ids or user_ids),
+        "cold_start": (lambda uid: system.compute_recommendations(db, uid, is_data_sufficient=False),
+                       user_ids),
+    }
+
+    rng = random.Random(seed)
+    results = {}
+    for name in scenarios or list(calls):
+        call, population = calls[name]
+        results[name] = run_scenario(name, call, population, n_requests, warmup, rng)
+
+    db.close()
+    return {
+        "revision": _git_revision(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "params": {
+            "users": n_users,
+            "quests": n_quests,
+            "interactions_per_user": interactions_per_user,
+            "survey_rate": survey_rate,
+            "requests": n_requests,
+            "cf_mode": cf_mode,
+            "neighbor_index": neighbor_index,
+            "redis": use_redis,
+            "seed": seed,
+        },
+        "data": {
+            "setup_seconds": round(setup_seconds, 2),
+            "hybrid_enabled": is_sufficient,
+            "total_interactions": sufficiency["total_interactions"],
+            "active_users": sufficiency["active_users"],
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 시스템 합성 데이터 벤치마크")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k", help="사용자 수 프리셋")
+    parser.add_argument("--users", type=int, default=None, help="사용자 수 (--scale 대신)")
+    parser.add_argument("--quests", type=int, default=60)
+    parser.add_argument("--interactions-per-user", type=float, default=15.0)
+    parser.add_argument("--survey-rate", type=float, default=0.8, help="설문 응답 사용자 비율")
+    parser.add_argument("--requests", type=int, default=500, help="경로별 측정 호출 수")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--cf-mode", choices=["user", "item"], default="user")
+    parser.add_argument("--neighbor-index", action="store_true", help="측정 전 유사 사용자 인덱스 구축")
+    parser.add_argument("--scenario", action="append", choices=["recommend_quests", "hybrid", "cold_start"],
+                        help="측정할 경로 (여러 번 지정 가능, 기본 전체)")
+    parser.add_argument("--redis", action="store_true", help="REDIS_URL 의 실제 Redis 사용")
+    parser.add_argument("--db", default=":memory:", help="SQLite 파일 경로 (기본 메모리)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 경로 (기본 stdout)")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        n_users=args.users or SCALES[args.scale],
+        n_quests=args.quests,
+        interactions_per_user=args.interactions_per_user,
+        survey_rate=args.survey_rate,
+        n_requests=args.requests,
+        warmup=args.warmup,
+        cf_mode=args.cf_mode,
+        neighbor_index=args.neighbor_index,
+        use_redis=args.redis,
+        scenarios=args.scenario,
+        seed=args.seed,
+        db_path=args.db,
+    )
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# app/recommend/cache.py
+"""
+일자별 추천 결과 캐시
+
+- reco:daily:{YYYY-MM-DD}:{user_id}         → 추천 퀘스트 ID 목록(JSON)
+  precompute 배치가 다음 날 추천을 미리 채워 두고, 요청 경로는 캐시를 먼저 읽습니다.
+- reco:daily:{YYYY-MM-DD}:{user_id}:details → 최종 추천 퀘스트 상세 목록(JSON)
+  같은 날 재요청(홈 화면 새로고침)은 워커 내 LRU → Redis 순으로 조회해 MySQL을 거치지 않습니다.
+- 설문 제출, 퀘스트 완료 시 invalidate_daily 로 해당 사용자의 오늘 캐시를 지웁니다.
+  precompute --restart 로 추천을 교체하면 invalidate_daily_many 로 청크 단위로 지웁니다.
+  (다른 워커의 LRU는 DAILY_LOCAL_TTL_SECONDS 안에 만료)
+- Redis 장애 시에는 캐시 미스로 취급해 실시간 계산으로 폴백합니다.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import date
+import json
+import os
+import threading
+import time
+
+import redis
+
+from app.cache import rds
+
+DAILY_TTL_SECONDS = 60 * 60 * 48
+DAILY_LOCAL_TTL_SECONDS = int(os.getenv("RECO_DAILY_LOCAL_TTL_SECONDS", "30"))
+DAILY_LOCAL_MAX_USERS = int(os.getenv("RECO_DAILY_LOCAL_MAX_USERS", "10000"))
+
+_local: "OrderedDict[Tuple[str, date], tuple]" = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def daily_key(user_id: str, day: date) -> str:
+    return f"reco:daily:{day.isoformat()}:{user_id}"
+
+
+def get_daily_ids(user_id: str, day: date) -> Optional[List[str]]:
+    """해당 날짜의 추천 퀘스트 ID 조회 (없으면 None)"""
+    try:
+        raw = rds.get(daily_key(user_id, day))
+    except redis.RedisError:
+        return None
+    return json.loads(raw) if raw else None
+
+
+def set_daily_ids_many(recommendations: Dict[str, List[str]], day: date) -> None:
+    """여러 사용자의 추천 결과를 파이프라인 1회로 저장"""
+    if not recommendations:
+        return
+    pipe = rds.pipeline(transaction=False)
+    for user_id, quest_ids in recommendations.items():
+        pipe.setex(daily_key(user_id, day), DAILY_TTL_SECONDS, json.dumps(quest_ids))
+    pipe.execute()
+
+
+def details_key(user_id: str, day: date) -> str:
+    return f"{daily_key(user_id, day)}:details"
+
+
+def _local_get(user_id: str, day: date) -> Optional[List[Dict]]:
+    with _local_lock:
+        entry = _local.get((user_id, day))
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > DAILY_LOCAL_TTL_SECONDS:
+            del _local[(user_id, day)]
+            return None
+        _local.move_to_end((user_id, day))
+        return entry[0]
+
+
+def _local_set(user_id: str, day: date, quests: List[Dict]) -> None:
+    with _local_lock:
+        _local[(user_id, day)] = (quests, time.monotonic())
+        _local.move_to_end((user_id, day))
+        while len(_local) > DAILY_LOCAL_MAX_USERS:
+            _local.popitem(last=False)
+
+
+def get_daily_details(user_id: str, day: date) -> Optional[List[Dict]]:
+    """해당 날짜의 최종 추천 퀘스트 상세 조회 (워커 LRU → Redis, 없으면 None)"""
+    quests = _local_get(user_id, day)
+    if quests is not None:
+        return quests
+    try:
+        raw = rds.get(details_key(user_id, day))
+    except redis.RedisError:
+        return None
+    if not raw:
+        return None
+    quests = json.loads(raw)
+    _local_set(user_id, day, quests)
+    return quests
+
+
+def set_daily_details(user_id: str, day: date, quests: List[Dict]) -> None:
+    """최종 추천 퀘스트 ID와 상세를 함께 저장"""
+    _local_set(user_id, day, quests)
+    try:
+        pipe = rds.pipeline(transaction=False)
+        pipe.setex(daily_key(user_id, day), DAILY_TTL_SECONDS, json.dumps([q["id"] for q in quests]))
+        pipe.setex(details_key(user_id, day), DAILY_TTL_SECONDS,
+                   json.dumps(quests, ensure_ascii=False, default=str))
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def invalidate_daily(user_id: str, day: Optional[date] = None) -> None:
+    """사용자의 일자별 추천 캐시 삭제 (설문 제출, 퀘스트 완료 시)"""
+    day = day or date.today()
+    with _local_lock:
+        _local.pop((user_id, day), None)
+    try:
+        rds.delete(daily_key(user_id, day), details_key(user_id, day))
+    except redis.RedisError:
+        pass
+
+
+def invalidate_daily_many(user_ids: List[str], day: date) -> None:
+    """여러 사용자의 일자별 추천 캐시를 파이프라인 1회로 삭제 (precompute --restart)"""
+    if not user_ids:
+        return
+    with _local_lock:
+        for user_id in user_ids:
+            _local.pop((user_id, day), None)
+    try:
+        pipe = rds.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.delete(daily_key(user_id, day), details_key(user_id, day))
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def reset() -> None:
+    """워커 내 오늘의 추천 LRU 비우기 (Redis 캐시는 그대로 유지)"""
+    with _local_lock:
+        _local.clear()
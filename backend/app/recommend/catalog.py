@@ -0,0 +1,185 @@
+# app/recommend/catalog.py
+"""
+추천 대상 퀘스트 카탈로그와 퀘스트 특성 행렬
+
+- 특성 열: category_* / type_* / verify_* / period_* one-hot + reward_exp, difficulty (0-1 정규화)
+- 카탈로그 내용으로 버전 해시를 만들어, 퀘스트가 바뀐 경우에만 특성 행렬을 다시 만듭니다.
+- 사용자 선호 프로필(_analyze_user_quest_history)을 같은 특성 공간의 벡터로 옮기면
+  전체 퀘스트의 콘텐츠 기반 점수가 행렬 × 벡터 1회로 계산됩니다.
+- 다양성 재정렬(mmr)은 카테고리/타입 one-hot 으로 만든 정규화 벡터의 내적을 퀘스트 간 유사도로 사용합니다.
+  (같은 카테고리·타입 1.0, 같은 카테고리 0.8, 같은 타입 0.2, 그 외 0)
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+CATALOG_TTL_SECONDS = int(os.getenv("RECO_CATALOG_TTL_SECONDS", "60"))
+
+# (특성 접두사, 퀘스트 필드, 사용자 선호 프로필 키)
+ONE_HOT_GROUPS = [
+    ("category", "category", "category_scores"),
+    ("type", "type", "type_scores"),
+    ("verify", "verify_method", "verify_method_scores"),
+    ("period", "period_scope", None),
+]
+
+# 다양성 유사도에 쓰는 특성 그룹과 가중치
+DIVERSITY_GROUPS = {"category": 1.0, "type": 0.5}
+
+_cache: dict = {"catalog": None, "at": 0.0}
+_cache_lock = threading.Lock()
+
+
+def _value(value) -> str:
+    """Enum / 문자열 모두 같은 키로"""
+    return str(getattr(value, "value", value))
+
+
+def catalog_version(quests: List[Dict]) -> str:
+    """퀘스트 목록 내용 기반 버전 해시"""
+    payload = json.dumps(
+        sorted([[_value(v) for v in quest.values()] for quest in quests]),
+        ensure_ascii=False, default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class QuestCatalog:
+    """추천 대상 퀘스트 목록 + 퀘스트 × 특성 행렬"""
+
+    def __init__(self, quests: List[Dict], version: Optional[str] = None):
+        self.quests = quests
+        self.version = version or catalog_version(quests)
+        self.quest_ids = [quest["id"] for quest in quests]
+        self.quest_index: Dict[str, int] = {qid: j for j, qid in enumerate(self.quest_ids)}
+
+        columns = []
+        for prefix, field, _ in ONE_HOT_GROUPS:
+            values = sorted({_value(quest[field]) for quest in quests})
+            columns.extend(f"{prefix}_{value}" for value in values)
+        columns.extend(["reward_exp", "difficulty"])
+        self.columns = columns
+        self.column_index: Dict[str, int] = {name: i for i, name in enumerate(columns)}
+
+        features = np.zeros((len(quests), len(columns)), dtype=np.float64)
+        for j, quest in enumerate(quests):
+            for prefix, field, _ in ONE_HOT_GROUPS:
+                features[j, self.column_index[f"{prefix}_{_value(quest[field])}"]] = 1.0
+            features[j, self.column_index["reward_exp"]] = min(quest["reward_exp"] / 100.0, 1.0)
+            # target_count가 있는 경우 난이도 지표로 활용
+            if quest.get("target_count"):
+                features[j, self.column_index["difficulty"]] = min(quest["target_count"] / 30.0, 1.0)
+        self.features = features
+
+        # 다양성 유사도용 정규화 벡터 (행끼리 내적 = 코사인 유사도)
+        diversity = np.zeros_like(features)
+        for name, i in self.column_index.items():
+            weight = DIVERSITY_GROUPS.get(name.split("_", 1)[0])
+            if weight:
+                diversity[:, i] = features[:, i] * weight
+        norms = np.linalg.norm(diversity, axis=1, keepdims=True)
+        self.diversity_features = diversity / np.where(norms > 0, norms, 1.0)
+
+    @property
+    def n_quests(self) -> int:
+        return len(self.quest_ids)
+
+    def get(self, quest_id: str) -> Optional[Dict]:
+        j = self.quest_index.get(quest_id)
+        return self.quests[j] if j is not None else None
+
+    def profile_vector(self, user_prefs: Dict) -> np.ndarray:
+        """
+        사용자 선호 프로필 → 특성 공간 벡터
+        - 카테고리/타입/검증 방법 선호도만 가중치를 가지며(보상, 난이도는 0),
+          전체 선호도 합으로 나눠 0-1 범위로 정규화합니다.
+        """
+        vector = np.zeros(len(self.columns), dtype=np.float64)
+        total = 0.0
+        for prefix, _, profile_key in ONE_HOT_GROUPS:
+            if profile_key is None:
+                continue
+            for value, pref_score in user_prefs.get(profile_key, {}).items():
+                total += pref_score
+                i = self.column_index.get(f"{prefix}_{_value(value)}")
+                if i is not None:
+                    vector[i] = pref_score
+        if total > 0:
+            vector /= total
+        return vector
+
+    def content_scores(self, user_prefs: Dict) -> np.ndarray:
+        """전체 퀘스트의 콘텐츠 기반 점수 (최대 1.0)"""
+        return np.minimum(self.features @ self.profile_vector(user_prefs), 1.0)
+
+    def mmr(self, candidates: List[Tuple[str, float]], count: int, diversity_lambda: float = 0.5) -> List[str]:
+        """
+        MMR(Maximal Marginal Relevance) 탐욕 재정렬
+        - (퀘스트 ID, 점수) 후보에서 λ·정규화 점수 − (1−λ)·이미 고른 퀘스트와의 최대 유사도가
+          가장 큰 퀘스트를 count 개까지 차례로 선택합니다.
+        - 카탈로그에 없는(비활성/추천 제외) 퀘스트는 후보에서 제외합니다.
+        """
+        rows, scores, ids = [], [], []
+        for quest_id, score in candidates:
+            j = self.quest_index.get(quest_id)
+            if j is not None:
+                rows.append(j)
+                scores.append(score)
+                ids.append(quest_id)
+        if len(ids) <= count:
+            return ids
+
+        relevance = np.asarray(scores, dtype=np.float64)
+        relevance -= relevance.min()
+        if relevance.max() > 0:
+            relevance /= relevance.max()
+
+        vectors = self.diversity_features[rows]
+        similarity = vectors @ vectors.T
+        max_similarity = np.zeros(len(ids))
+        available = np.ones(len(ids), dtype=bool)
+        selected: List[int] = []
+
+        for _ in range(count):
+            marginal = diversity_lambda * relevance - (1 - diversity_lambda) * max_similarity
+            marginal[~available] = -np.inf
+            # 동점이면 앞선(점수가 높은) 후보 선택
+            best = int(np.argmax(marginal))
+            selected.append(best)
+            available[best] = False
+            np.maximum(max_similarity, similarity[best], out=max_similarity)
+
+        return [ids[i] for i in selected]
+
+
+def get_catalog(load_quests: Callable[[], List[Dict]]) -> QuestCatalog:
+    """
+    워커에 상주하는 카탈로그 조회
+    - TTL 경과 시 퀘스트 목록을 다시 읽고, 버전이 같으면 기존 특성 행렬을 그대로 사용
+    """
+    with _cache_lock:
+        catalog = _cache["catalog"]
+        if catalog is not None and time.monotonic() - _cache["at"] < CATALOG_TTL_SECONDS:
+            return catalog
+
+        quests = load_quests()
+        version = catalog_version(quests)
+        if catalog is None or catalog.version != version:
+            catalog = QuestCatalog(quests, version)
+        _cache["catalog"] = catalog
+        _cache["at"] = time.monotonic()
+        return catalog
+
+
+def reset() -> None:
+    """워커에 상주하는 카탈로그 비우기 (다음 조회 시 퀘스트 목록을 다시 읽음)"""
+    with _cache_lock:
+        _cache["catalog"] = None
+        _cache["at"] = 0.0
+
@@ -0,0 +1,319 @@
+# app/recommend/evaluate.py
+"""
+추천 품질/지연 오프라인 평가 (날짜 기준 리플레이)
+
+- quest_recommendations 를 기준일(--split-date)로 나눠, 이전 기록만으로 메모리 SQLite 사본을
+  만들고(기준일이 "오늘"이 되도록 날짜 이동), 기준일부터 --horizon 일 동안 클릭/완료한
+  퀘스트를 정답으로 각 추천 모드를 평가합니다.
+- 모드: cold_start / user_cf / item_cf / als / auto(운영과 같은 충분성 판단)
+- 지표: precision@3, recall@3, hit_rate, coverage(추천된 고유 퀘스트 / 활성 퀘스트),
+        요청별 지연 p50/p95/p99(ms), 최대 RSS, (--trace-memory 시) 요청별 최대 Python 할당량
+- 정답은 당시 추천된 퀘스트에 대한 반응만 기록되어 있으므로(로그 정책 편향)
+  모드 간 상대 비교와 가중치/임계값 조정에 사용합니다.
+
+실행:
+    python -m app.recommend.evaluate --split-date 2025-09-01
+    python -m app.recommend.evaluate --synthetic 5000 --weights cf=0.5,cbf=0.5 --min-similarity 0.2
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Set
+from collections import defaultdict
+from datetime import date, timedelta
+import argparse
+import json
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .bench import SCHEMA, build_database, disable_redis
+
+MODES = ["cold_start", "user_cf", "item_cf", "als", "auto"]
+TOP_K = 3
+WINDOW_DAYS = 90
+
+
+def _copy_rows(source: Session, target: Session, select_sql: str, insert_sql: str,
+               params: Optional[Dict] = None, transform=None, chunk_size: int = 5000) -> int:
+    result = source.execute(text(select_sql), params or {})
+    copied = 0
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            break
+        batch = [dict(row._mapping) for row in rows]
+        if transform:
+            batch = [transform(row) for row in batch]
+        target.execute(text(insert_sql), batch)
+        copied += len(batch)
+    target.commit()
+    return copied
+
+
+def build_replay_database(source: Session, split_date: date) -> Session:
+    """기준일 이전 기록만 담은 메모리 SQLite 사본 (날짜를 기준일 = 오늘로 이동)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False, "detect_types": sqlite3.PARSE_DECLTYPES},
+        poolclass=StaticPool,
+    )
+    target = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    for ddl in SCHEMA:
+        target.execute(text(ddl))
+    target.commit()
+
+    shift = date.today() - split_date
+
+    def shift_date(row: Dict) -> Dict:
+        row["recommendation_date"] = row["recommendation_date"] + shift
+        return row
+
+    _copy_rows(source, target,
+               "SELECT id, gender, birth_year, school_id, department, grade FROM users",
+               """INSERT INTO users (id, gender, birth_year, school_id, department, grade)
+                  VALUES (:id, :gender, :birth_year, :school_id, :department, :grade)""")
+    _copy_rows(source, target,
+               """SELECT id, type, title, category, verify_method, verify_params, reward_exp,
+                         target_count, period_scope, active, lat, lng, quest_link_url, created_at
+                  FROM quests""",
+               """INSERT INTO quests (id, type, title, category, verify_method, verify_params, reward_exp,
+                                      target_count, period_scope, active, lat, lng, quest_link_url, created_at)
+                  VALUES (:id, :type, :title, :category, :verify_method, :verify_params, :reward_exp,
+                          :target_count, :period_scope, :active, :lat, :lng, :quest_link_url, :created_at)""")
+    _copy_rows(source, target,
+               "SELECT id, user_id, question_id, question_type, option_order_no FROM survey_answers",
+               """INSERT INTO survey_answers (id, user_id, question_id, question_type, option_order_no)
+                  VALUES (:id, :user_id, :question_id, :question_type, :option_order_no)""")
+    _copy_rows(source, target,
+               """SELECT id, user_id, quest_id, recommendation_date, is_click, is_cleared
+                  FROM quest_recommendations
+                  WHERE recommendation_date < :split_date
+                  AND recommendation_date >= :window_start""",
+               """INSERT OR IGNORE INTO quest_recommendations
+                  (id, user_id, quest_id, recommendation_date, is_click, is_cleared)
+                  VALUES (:id, :user_id, :quest_id, :recommendation_date, :is_click, :is_cleared)""",
+               params={"split_date": split_date,
+                       "window_start": split_date - timedelta(days=WINDOW_DAYS)},
+               transform=shift_date)
+    return target
+
+
+def load_ground_truth(source: Session, split_date: date, horizon: int,
+                      cleared_only: bool = False) -> Dict[str, Set[str]]:
+    """기준일부터 horizon 일 동안 사용자별로 클릭(또는 완료)한 퀘스트"""
+    condition = "is_cleared = 1" if cleared_only else "(is_click = 1 OR is_cleared = 1)"
+    rows = source.execute(text(f"""
+        SELECT DISTINCT user_id, quest_id
+        FROM quest_recommendations
+        WHERE recommendation_date >= :split_date
+        AND recommendation_date < :end_date
+        AND {condition}
+    """), {"split_date": split_date, "end_date": split_date + timedelta(days=horizon)}).fetchall()
+    truth: Dict[str, Set[str]] = defaultdict(set)
+    for row in rows:
+        truth[row.user_id].add(row.quest_id)
+    return truth
+
+
+def _reset_resident_state() -> None:
+    """이전 DB로 만든 워커 상주 캐시 비우기 (캐시를 가진 모듈마다 reset)"""
+    from . import als, cache, catalog, segments, snapshot, stats, system
+
+    for module in (system, catalog, stats, cache, segments, snapshot, als):
+        module.reset()
+
+
+def _parse_weights(value: Optional[str]) -> Optional[Dict[str, float]]:
+    if not value:
+        return None
+    return {k.strip(): float(v) for k, v in (part.split("=") for part in value.split(","))}
+
+
+def evaluate_mode(system, db: Session, mode: str, truth: Dict[str, Set[str]],
+                  user_ids: List[str], n_catalog: int, trace_memory: bool = False) -> Dict:
+    """한 모드의 품질/지연 지표 계산"""
+    is_data_sufficient = {"cold_start": False, "auto": None}.get(mode, True)
+    system.cf_mode = "item" if mode == "item_cf" else "user"
+
+    # 상주 캐시(매트릭스/유사도 모델) 구축 시간은 지연 지표에서 제외
+    if user_ids:
+        system.compute_recommendations(db, user_ids[0], is_data_sufficient=is_data_sufficient)
+
+    latencies, peaks = [], []
+    hits = precision = recall = 0.0
+    recommended_quests: Set[str] = set()
+
+    for user_id in user_ids:
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        quest_ids = system.compute_recommendations(db, user_id, is_data_sufficient=is_data_sufficient)[:TOP_K]
+        latencies.append(time.perf_counter() - started)
+        if trace_memory:
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        positives = truth[user_id]
+        n_hit = len(set(quest_ids) & positives)
+        hits += n_hit > 0
+        precision += n_hit / TOP_K
+        recall += n_hit / len(positives)
+        recommended_quests.update(quest_ids)
+
+    n_users = max(len(user_ids), 1)
+    p50, p95, p99 = np.percentile(np.asarray(latencies or [0.0]) * 1000, [50, 95, 99])
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {
+        "users": len(user_ids),
+        "precision_at_3": round(precision / n_users, 4),
+        "recall_at_3": round(recall / n_users, 4),
+        "hit_rate": round(hits / n_users, 4),
+        "coverage": round(len(recommended_quests) / max(n_catalog, 1), 4),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "peak_rss_mb": round(peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024, 1),
+    }
+    if trace_memory:
+        result["p95_alloc_kb"] = round(float(np.percentile(peaks, 95)) / 1024, 1)
+    return result
+
+
+def run_evaluation(source: Session, split_date: date, horizon: int = 7, modes: List[str] = None,
+                   max_users: int = 1000, cleared_only: bool = False,
+                   weights: Optional[Dict[str, float]] = None,
+                   als_weights: Optional[Dict[str, float]] = None,
+                   min_similarity: Optional[float] = None, neighbor_k: Optional[int] = None,
+                   mmr_lambda: Optional[float] = None, diversity_pool: Optional[int] = None,
+                   als_factors: int = 32, als_iterations: int = 10,
+                   trace_memory: bool = False, seed: int = 0) -> Dict:
+    from .als import save_model, train_als
+    from .system import QuestRecommendationSystem
+
+    disable_redis()
+    truth = load_ground_truth(source, split_date, horizon, cleared_only)
+    db = build_replay_database(source, split_date)
+    _reset_resident_state()
+
+    # 기준일 이전에 존재한 사용자 중 정답이 있는 사용자만 평가
+    known = {r.id for r in db.execute(text("SELECT id FROM users")).fetchall()}
+    user_ids = sorted(uid for uid in truth if uid in known)
+    if len(user_ids) > max_users:
+        user_ids = sorted(random.Random(seed).sample(user_ids, max_users))
+
+    system = QuestRecommendationSystem()
+    if weights:
+        system.hybrid_weights = weights
+    if als_weights:
+        system.hybrid_weights_with_als = als_weights
+    if min_similarity is not None:
+        system.min_similarity = min_similarity
+    if neighbor_k is not None:
+        system.neighbor_k = neighbor_k
+    if mmr_lambda is not None:
+        system.mmr_lambda = mmr_lambda
+    if diversity_pool is not None:
+        system.diversity_pool = diversity_pool
+
+    n_catalog = db.execute(text("SELECT COUNT(*) FROM quests WHERE active = TRUE")).scalar() or 0
+    is_sufficient, sufficiency = system._check_data_sufficiency(db)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as empty_dir, tempfile.TemporaryDirectory() as als_dir:
+        for mode in modes or MODES:
+            if mode == "als":
+                # 기준일 이전 기록으로 학습한 모델을 임시 스냅샷으로 사용
+                matrix = system._build_interaction_matrix(db)
+                user_factors, item_factors = train_als(matrix, factors=als_factors,
+                                                       iterations=als_iterations, seed=seed)
+                save_model(matrix.user_ids, matrix.quest_ids, user_factors, item_factors, root=als_dir)
+                system.model_dir = als_dir
+            else:
+                system.model_dir = empty_dir
+            results[mode] = evaluate_mode(system, db, mode, truth, user_ids, n_catalog, trace_memory)
+
+    db.close()
+    return {
+        "params": {
+            "split_date": split_date.isoformat(),
+            "horizon_days": horizon,
+            "cleared_only": cleared_only,
+            "weights": system.hybrid_weights,
+            "als_weights": system.hybrid_weights_with_als,
+            "min_similarity": system.min_similarity,
+            "neighbor_k": system.neighbor_k,
+            "mmr_lambda": system.mmr_lambda,
+            "diversity_pool": system.diversity_pool,
+            "seed": seed,
+        },
+        "data": {
+            "evaluated_users": len(user_ids),
+            "users_with_truth": len(truth),
+            "catalog_size": n_catalog,
+            "train_interactions": sufficiency["total_interactions"],
+            "hybrid_enabled": is_sufficient,
+        },
+        "modes": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 품질/지연 오프라인 평가")
+    parser.add_argument("--split-date", type=date.fromisoformat, default=None,
+                        help="평가 기준일 (기본: 오늘 - horizon)")
+    parser.add_argument("--horizon", type=int, default=7, help="정답 기간(일)")
+    parser.add_argument("--mode", action="append", choices=MODES, help="평가할 모드 (기본 전체)")
+    parser.add_argument("--max-users", type=int, default=1000)
+    parser.add_argument("--cleared-only", action="store_true", help="완료한 퀘스트만 정답으로 사용")
+    parser.add_argument("--weights", default=None, help="하이브리드 가중치 (예: cf=0.6,cbf=0.4)")
+    parser.add_argument("--als-weights", default=None, help="ALS 포함 가중치 (예: cf=0.45,cbf=0.3,als=0.25)")
+    parser.add_argument("--min-similarity", type=float, default=None)
+    parser.add_argument("--neighbors", type=int, default=None, help="유사 사용자 수")
+    parser.add_argument("--mmr-lambda", type=float, default=None, help="다양성 재정렬 λ (1이면 점수 순)")
+    parser.add_argument("--diversity-pool", type=int, default=None, help="다양성 재정렬 후보 수")
+    parser.add_argument("--als-factors", type=int, default=32)
+    parser.add_argument("--als-iterations", type=int, default=10)
+    parser.add_argument("--trace-memory", action="store_true", help="요청별 Python 메모리 할당 측정 (느림)")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="운영 DB 대신 bench.py 합성 데이터(사용자 수)로 평가")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 경로 (기본 stdout)")
+    args = parser.parse_args()
+
+    split_date = args.split_date or date.today() - timedelta(days=args.horizon)
+
+    if args.synthetic:
+        source = build_database(args.synthetic, 60, 15.0, 0.8, args.seed)
+    else:
+        from app.database import SessionLocal
+        source = SessionLocal()
+
+    try:
+        result = run_evaluation(
+            source, split_date, horizon=args.horizon, modes=args.mode, max_users=args.max_users,
+            cleared_only=args.cleared_only, weights=_parse_weights(args.weights),
+            als_weights=_parse_weights(args.als_weights), min_similarity=args.min_similarity,
+            neighbor_k=args.neighbors, mmr_lambda=args.mmr_lambda,
+            diversity_pool=args.diversity_pool, als_factors=args.als_factors,
+            als_iterations=args.als_iterations, trace_memory=args.trace_memory, seed=args.seed,
+        )
+    finally:
+        source.close()
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
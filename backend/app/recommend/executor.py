@@ -0,0 +1,159 @@
+# app/recommend/executor.py
+"""
+추천 파이프라인 실행기
+
+- async 엔드포인트에서 동기 SQLAlchemy 세션과 NumPy 계산을 이벤트 루프 밖(스레드 풀)에서 실행합니다.
+  작업마다 스레드 안에서 세션을 새로 열고 닫으므로, 요청이 타임아웃으로 먼저 끝나도
+  아직 실행 중인 작업과 세션을 공유하지 않습니다.
+- 동시에 대기/실행 중인 작업은 RECO_MAX_PENDING 개로 제한하며, 초과하면 바로 503을 반환합니다.
+- 요청별 대기 시간은 RECO_REQUEST_TIMEOUT_SECONDS 이며, 초과하면 504를 반환합니다.
+  (이미 시작된 작업은 끝까지 실행되며, 끝날 때까지 슬롯을 차지합니다)
+- DB 접근이 없는 순수 계산(예: 퀘스트 유사도 행렬 재구축)은 RECO_PROCESS_WORKERS > 0 이면
+  프로세스 풀에서 실행합니다. 0이면 호출한 스레드에서 바로 실행합니다.
+  (여러 스레드가 도는 서버에서 fork 하면 자식이 잠긴 락을 물려받아 멈출 수 있으므로 spawn 으로 시작하며,
+  RECO_REQUEST_TIMEOUT_SECONDS 안에 끝나지 않으면 504를 반환합니다. 이때 풀의 작업 프로세스를 종료해
+  멈춘 작업이 메모리를 계속 차지하지 않게 하고, 다음 호출에서 풀을 새로 만듭니다.
+  같은 풀에서 실행 중이던 다른 작업은 503으로 끝납니다)
+"""
+from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THREAD_WORKERS = int(os.getenv("RECO_THREAD_WORKERS", "8"))
+PROCESS_WORKERS = int(os.getenv("RECO_PROCESS_WORKERS", "0"))
+MAX_PENDING = int(os.getenv("RECO_MAX_PENDING", "32"))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("RECO_REQUEST_TIMEOUT_SECONDS", "10"))
+
+_thread_pool = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="reco")
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_lock = threading.Lock()
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def pending_count() -> int:
+    """대기/실행 중인 추천 작업 수"""
+    return _pending
+
+
+def _acquire_slot() -> bool:
+    global _pending
+    with _pending_lock:
+        if _pending >= MAX_PENDING:
+            return False
+        _pending += 1
+        return True
+
+
+def _release_slot(_: Future) -> None:
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def _with_session(func: Callable[..., T], *args, **kwargs) -> T:
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_with_session(func: Callable[..., T], *args,
+                           timeout: Optional[float] = None, **kwargs) -> T:
+    """
+    func(db, *args, **kwargs) 를 스레드 풀에서 실행하고 결과를 기다림
+    - 슬롯이 없으면 503, timeout 초과 시 504
+    """
+    if not _acquire_slot():
+        raise HTTPException(status_code=503, detail="추천 요청이 많아 잠시 후 다시 시도해주세요.")
+
+    # contextvars(요청별 측정값 등)를 작업 스레드로 전달
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, _with_session, func, *args, **kwargs)
+    future = _thread_pool.submit(call)
+    future.add_done_callback(_release_slot)
+
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future),
+                                      timeout=timeout or REQUEST_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="추천 계산 시간이 초과되었습니다.")
+
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    global _process_pool
+    if PROCESS_WORKERS <= 0:
+        return None
+    with _process_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    응답 없는 풀을 버리고 다음 호출에서 새로 생성
+    - shutdown 만으로는 실행 중인 작업 프로세스가 멈추지 않으므로 직접 종료합니다.
+    """
+    global _process_pool
+    with _process_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join(timeout=1)
+
+
+def run_cpu_bound(func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+    """
+    DB 접근이 없는 순수 계산 실행 (func 와 인자는 pickle 가능해야 함)
+    - 스레드 풀 작업 안에서 호출하며, 프로세스 풀이 없으면 현재 스레드에서 실행
+    - timeout(기본 RECO_REQUEST_TIMEOUT_SECONDS) 안에 끝나지 않으면 504
+    """
+    pool = _get_process_pool()
+    if pool is None:
+        return func(*args, **kwargs)
+    future = pool.submit(func, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout or REQUEST_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        logger.warning("process pool task %s timed out; recreating pool", getattr(func, "__qualname__", func))
+        _discard_process_pool(pool)
+        raise HTTPException(status_code=504, detail="추천 계산 시간이 초과되었습니다.")
+    except BrokenProcessPool:
+        # 다른 작업의 타임아웃으로 풀이 종료된 경우 (다음 호출은 새 풀 사용)
+        _discard_process_pool(pool)
+        raise HTTPException(status_code=503, detail="추천 요청이 많아 잠시 후 다시 시도해주세요.")
+
+
+def shutdown() -> None:
+    """서버 종료 시 풀 정리"""
+    _thread_pool.shutdown(wait=False, cancel_futures=True)
+    with _process_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
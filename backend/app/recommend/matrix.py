@@ -0,0 +1,204 @@
+# app/recommend/matrix.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+
+class InteractionMatrix:
+    """
+    사용자×퀘스트 상호작용 희소 행렬 (CSR)
+
+    - 행: 사용자, 열: 퀘스트, 값: is_click * 0.3 + is_cleared * 0.7
+    - 행 단위 L2 정규화 값을 함께 보관해 한 사용자와 전체 사용자 간
+      코사인 유사도를 한 번의 희소 mat-vec로 계산합니다.
+    - mat-vec는 퀘스트(열) 기준 사본(CSC)으로 수행해 대상 사용자와
+      같은 퀘스트에 반응한 사용자만 순회합니다.
+    """
+
+    def __init__(self, user_ids: List[str], quest_ids: List[str],
+                 indptr: np.ndarray, indices: np.ndarray, data: np.ndarray):
+        self.user_ids = user_ids
+        self.quest_ids = quest_ids
+        self.user_index: Dict[str, int] = {uid: i for i, uid in enumerate(user_ids)}
+        self.quest_index: Dict[str, int] = {qid: j for j, qid in enumerate(quest_ids)}
+
+        # CSR 구성 요소
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+        # 각 nnz가 속한 행 번호 (bincount 기반 mat-vec 용)
+        self.rows = np.repeat(np.arange(len(user_ids), dtype=np.int32), np.diff(indptr))
+
+        # 행 정규화 값 (norm이 0인 행은 0으로 유지)
+        norms = np.sqrt(np.bincount(self.rows, weights=data * data, minlength=len(user_ids)))
+        safe = np.where(norms > 0, norms, 1.0)
+        self.normalized = (data / safe[self.rows]).astype(np.float32)
+
+        # 열(퀘스트) 기준 사본: 퀘스트 j에 반응한 사용자 행과 정규화 값
+        order = np.argsort(indices, kind="stable")
+        self.col_indptr = np.zeros(len(quest_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(quest_ids)), out=self.col_indptr[1:])
+        self.col_rows = self.rows[order]
+        self.col_normalized = self.normalized[order]
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def n_quests(self) -> int:
+        return len(self.quest_ids)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.data.shape[0])
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.user_index
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, float]]) -> "InteractionMatrix":
+        """(user_id, quest_id, score) 튜플들로부터 행렬 구축"""
+        user_index: Dict[str, int] = {}
+        quest_index: Dict[str, int] = {}
+        r, c, v = [], [], []
+
+        for user_id, quest_id, score in rows:
+            score = float(score or 0)
+            if score <= 0:
+                # 노출만 되고 반응이 없는 기록은 유사도에 기여하지 않음
+                continue
+            r.append(user_index.setdefault(user_id, len(user_index)))
+            c.append(quest_index.setdefault(quest_id, len(quest_index)))
+            v.append(score)
+
+        user_ids = list(user_index)
+        quest_ids = list(quest_index)
+
+        if not v:
+            return cls(user_ids, quest_ids, np.zeros(len(user_ids) + 1, dtype=np.int64),
+                       np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32))
+
+        r = np.asarray(r, dtype=np.int32)
+        c = np.asarray(c, dtype=np.int32)
+        v = np.asarray(v, dtype=np.float32)
+
+        # (행, 열) 순으로 정렬 후 같은 칸의 중복 기록은 최댓값으로 병합
+        order = np.lexsort((c, r))
+        r, c, v = r[order], c[order], v[order]
+        starts = np.flatnonzero(np.r_[True, (r[1:] != r[:-1]) | (c[1:] != c[:-1])])
+        r, c, v = r[starts], c[starts], np.maximum.reduceat(v, starts)
+
+        indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(r, minlength=len(user_ids)), out=indptr[1:])
+
+        return cls(user_ids, quest_ids, indptr, c, v)
+
+    def user_vector(self, user_id: str, normalized: bool = True) -> np.ndarray:
+        """사용자 행을 퀘스트 차원의 dense 벡터로 반환"""
+        vector = np.zeros(self.n_quests, dtype=np.float32)
+        u = self.user_index.get(user_id)
+        if u is None:
+            return vector
+        start, end = self.indptr[u], self.indptr[u + 1]
+        values = self.normalized if normalized else self.data
+        vector[self.indices[start:end]] = values[start:end]
+        return vector
+
+    def similarities(self, user_id: str) -> np.ndarray:
+        """해당 사용자와 전체 사용자 간 코사인 유사도 (희소 mat-vec 1회)"""
+        u = self.user_index.get(user_id)
+        if u is None:
+            return np.zeros(self.n_users)
+        start, end = self.indptr[u], self.indptr[u + 1]
+        cols, weights = self.indices[start:end], self.normalized[start:end]
+        if len(cols) == 0:
+            return np.zeros(self.n_users)
+
+        segments = [slice(self.col_indptr[j], self.col_indptr[j + 1]) for j in cols]
+        rows = np.concatenate([self.col_rows[seg] for seg in segments])
+        values = np.concatenate([self.col_normalized[seg] * w for seg, w in zip(segments, weights)])
+        return np.bincount(rows, weights=values, minlength=self.n_users)
+
+    def aggregate(self, weighted_users: List[Tuple[str, float]]) -> np.ndarray:
+        """Σ(가중치 × 사용자 상호작용 점수) 를 퀘스트 차원 벡터로 반환"""
+        scores = np.zeros(self.n_quests, dtype=np.float64)
+        for user_id, weight in weighted_users:
+            u = self.user_index.get(user_id)
+            if u is None:
+                continue
+            start, end = self.indptr[u], self.indptr[u + 1]
+            scores[self.indices[start:end]] += weight * self.data[start:end]
+        return scores
+
+    def similar_users(self, user_id: str, k: int = 10,
+                      min_similarity: float = 0.1) -> List[Tuple[str, float]]:
+        """코사인 유사도 상위 k명의 (user_id, similarity) 목록"""
+        u = self.user_index.get(user_id)
+        if u is None:
+            return []
+
+        sims = self.similarities(user_id)
+        sims[u] = -1.0  # 자기 자신 제외
+
+        if k < self.n_users:
+            candidates = np.argpartition(-sims, k)[:k]
+        else:
+            candidates = np.arange(self.n_users)
+        candidates = candidates[sims[candidates] > min_similarity]
+        candidates = candidates[np.argsort(-sims[candidates], kind="stable")]
+
+        return [(self.user_ids[i], float(sims[i])) for i in candidates]
+
+
+class ItemSimilarityModel:
+    """
+    퀘스트×퀘스트 코사인 유사도 행렬 (아이템 기반 협업 필터링)
+
+    - "X를 클리어한 사용자는 Y도 클리어했다" 형태의 동시 발생을 기반으로 합니다.
+    - 퀘스트 수(수십~수백)만큼의 dense 행렬이라 워커 메모리에 상주시킵니다.
+    - 사용자 점수 = 사용자 상호작용 벡터(희소) × 유사도 행렬 이므로 사용자 수와 무관합니다.
+    """
+
+    def __init__(self, quest_ids: List[str], similarity: np.ndarray):
+        self.quest_ids = quest_ids
+        self.quest_index: Dict[str, int] = {qid: j for j, qid in enumerate(quest_ids)}
+        self.similarity = similarity
+
+    @property
+    def n_quests(self) -> int:
+        return len(self.quest_ids)
+
+    @classmethod
+    def from_matrix(cls, matrix: InteractionMatrix, chunk_size: int = 10000) -> "ItemSimilarityModel":
+        """상호작용 행렬로부터 동시 발생(XᵀX) 기반 코사인 유사도 계산"""
+        n_quests = matrix.n_quests
+        co_occurrence = np.zeros((n_quests, n_quests), dtype=np.float64)
+
+        # 사용자 구간별로 dense 블록을 만들어 누적 (메모리 사용량 제한)
+        for start in range(0, matrix.n_users, chunk_size):
+            end = min(start + chunk_size, matrix.n_users)
+            lo, hi = matrix.indptr[start], matrix.indptr[end]
+            block = np.zeros((end - start, n_quests), dtype=np.float32)
+            block[matrix.rows[lo:hi] - start, matrix.indices[lo:hi]] = matrix.data[lo:hi]
+            co_occurrence += block.T @ block
+
+        norms = np.sqrt(np.diag(co_occurrence))
+        safe = np.where(norms > 0, norms, 1.0)
+        similarity = co_occurrence / safe[:, None] / safe[None, :]
+        np.fill_diagonal(similarity, 0.0)  # 자기 자신은 추천 근거에서 제외
+
+        return cls(list(matrix.quest_ids), similarity.astype(np.float32))
+
+    def score(self, interactions: Dict[str, float]) -> np.ndarray:
+        """사용자 상호작용 {quest_id: score} 에 대한 퀘스트별 점수"""
+        cols, values = [], []
+        for quest_id, value in interactions.items():
+            j = self.quest_index.get(quest_id)
+            if j is not None:
+                cols.append(j)
+                values.append(value)
+        if not cols:
+            return np.zeros(self.n_quests, dtype=np.float32)
+        return np.asarray(values, dtype=np.float32) @ self.similarity[cols]
@@ -0,0 +1,142 @@
+# app/recommend/metrics.py
+"""
+추천 파이프라인 단계별 시간 측정
+
+- stage("cf") 같은 컨텍스트로 단계 시간을 time.perf_counter 로 측정해
+  워커 내 히스토그램(reco_stage_seconds{stage=...})에 누적합니다.
+  GET /recommendations/metrics 가 Prometheus 텍스트 형식으로 노출합니다. (워커별 값)
+- 요청에서 start_breakdown() 을 호출하면 같은 컨텍스트(스레드 풀 작업 포함)에서 측정된
+  단계 시간이 요청별로도 모여, X-Reco-Debug 헤더 요청 시 Server-Timing 으로 반환됩니다.
+- RECO_PROFILE_SAMPLE_RATE (0~1) 비율의 요청은 cProfile 로 전체 실행을 기록해
+  RECO_PROFILE_DIR 아래 .prof 파일로 저장합니다. (python -m pstats 로 확인)
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, TypeVar
+import cProfile
+import functools
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROFILE_SAMPLE_RATE = float(os.getenv("RECO_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("RECO_PROFILE_DIR", "var/profiles")
+
+# 초 단위 히스토그램 버킷
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+_breakdown: ContextVar[Optional[Dict[str, float]]] = ContextVar("reco_stage_breakdown", default=None)
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram 과 같은 의미)"""
+
+    def __init__(self, buckets: List[float] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(stage_name: str, seconds: float) -> None:
+    with _histograms_lock:
+        histogram = _histograms.get(stage_name)
+        if histogram is None:
+            histogram = _histograms[stage_name] = Histogram()
+        histogram.observe(seconds)
+
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown[stage_name] = breakdown.get(stage_name, 0.0) + seconds
+
+
+@contextmanager
+def stage(stage_name: str):
+    """단계 실행 시간 측정"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - started)
+
+
+def timed(stage_name: str):
+    """함수 전체를 한 단계로 측정하는 데코레이터"""
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_breakdown() -> Dict[str, float]:
+    """현재 요청의 단계별 시간 수집 시작 (반환된 dict 에 초 단위로 누적)"""
+    breakdown: Dict[str, float] = {}
+    _breakdown.set(breakdown)
+    return breakdown
+
+
+def server_timing(breakdown: Dict[str, float]) -> str:
+    """Server-Timing 헤더 값 (밀리초)"""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in breakdown.items())
+
+
+def render_prometheus() -> str:
+    """히스토그램을 Prometheus 텍스트 형식으로"""
+    lines = [
+        "# HELP reco_stage_seconds Recommendation pipeline stage duration in seconds.",
+        "# TYPE reco_stage_seconds histogram",
+    ]
+    with _histograms_lock:
+        for name in sorted(_histograms):
+            histogram = _histograms[name]
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'reco_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'reco_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'reco_stage_seconds_sum{{stage="{name}"}} {histogram.sum:.6f}')
+            lines.append(f'reco_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+    return "\n".join(lines) + "\n"
+
+
+def profiled(name: str):
+    """RECO_PROFILE_SAMPLE_RATE 비율로 cProfile 을 기록하는 데코레이터"""
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+                return func(*args, **kwargs)
+
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                try:
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    path = os.path.join(
+                        PROFILE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{name}-{os.getpid()}-{threading.get_ident()}.prof"
+                    )
+                    profiler.dump_stats(path)
+                except OSError:
+                    logger.exception("failed to write profile for %s", name)
+        return wrapper
+    return decorator
@@ -0,0 +1,201 @@
+# app/recommend/neighbors.py
+"""
+유사 사용자 인덱스 (user_neighbors) 갱신 배치
+
+- 사용자별 상위 k명의 유사 사용자와 유사도를 user_neighbors 테이블에 저장합니다.
+- 사용자별 상호작용 요약(fingerprint)을 user_neighbor_state에 보관해,
+  직전 실행 이후 quest_recommendations가 바뀐 사용자 행만 다시 계산합니다.
+- 변경된 사용자를 이웃으로 가진 사용자도 함께 재계산합니다.
+  (새로 이웃이 될 수 있는 사용자까지 반영하려면 주기적으로 --full 실행)
+
+실행:
+    python -m app.recommend.neighbors            # 증분 갱신 1회
+    python -m app.recommend.neighbors --full     # 전체 재구축
+    python -m app.recommend.neighbors --interval 600   # 10분마다 반복
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
+import argparse
+import logging
+import time
+
+from sqlalchemy import text, bindparam, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import UserNeighbor, UserNeighborState
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 90
+CHUNK_SIZE = 1000
+
+
+def _chunks(items: List[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _current_fingerprints(db: Session) -> Dict[str, str]:
+    """사용자별 상호작용 요약 (최근 90일, 클릭/완료 기록만)"""
+    query = text("""
+        SELECT user_id,
+               COUNT(*) as cnt,
+               SUM(is_click) as clicks,
+               SUM(is_cleared) as clears,
+               MIN(recommendation_date) as first_date,
+               MAX(recommendation_date) as last_date
+        FROM quest_recommendations
+        WHERE recommendation_date >= :cutoff_date
+        AND (is_click = 1 OR is_cleared = 1)
+        GROUP BY user_id
+    """)
+    cutoff_date = date.today() - timedelta(days=WINDOW_DAYS)
+    results = db.execute(query, {"cutoff_date": cutoff_date}).fetchall()
+    return {
+        r.user_id: f"{r.cnt}:{int(r.clicks or 0)}:{int(r.clears or 0)}:{r.first_date}:{r.last_date}"
+        for r in results
+    }
+
+
+def _stored_fingerprints(db: Session) -> Dict[str, str]:
+    rows = db.execute(select(UserNeighborState.user_id, UserNeighborState.fingerprint)).all()
+    return {user_id: fingerprint for user_id, fingerprint in rows}
+
+
+def _users_pointing_to(db: Session, neighbor_ids: List[str]) -> Set[str]:
+    """주어진 사용자들을 이웃으로 가지고 있는 사용자 목록"""
+    affected: Set[str] = set()
+    for chunk in _chunks(neighbor_ids, CHUNK_SIZE):
+        rows = db.execute(
+            select(UserNeighbor.user_id).where(UserNeighbor.neighbor_id.in_(chunk)).distinct()
+        ).all()
+        affected.update(r[0] for r in rows)
+    return affected
+
+
+def refresh_neighbor_index(db: Session, k: int = 10, min_similarity: float = 0.1,
+                           full: bool = False) -> Dict[str, int]:
+    """유사 사용자 인덱스 증분(또는 전체) 갱신"""
+    from .system import get_recommender
+
+    started = time.monotonic()
+    system = get_recommender()
+    matrix = system._build_interaction_matrix(db)
+
+    current = _current_fingerprints(db)
+    stored = _stored_fingerprints(db)
+
+    if full:
+        changed = set(current)
+    else:
+        changed = {u for u, fp in current.items() if stored.get(u) != fp}
+    removed = set(stored) - set(current)
+
+    # 변경/삭제된 사용자를 이웃으로 가진 사용자도 유사도가 달라지므로 재계산
+    affected = set() if full else _users_pointing_to(db, sorted(changed | removed))
+    targets = sorted((changed | affected) & set(current))
+
+    now = datetime.utcnow()
+    for chunk in _chunks(targets, CHUNK_SIZE):
+        neighbor_rows = []
+        for user_id in chunk:
+            for rank, (neighbor_id, similarity) in enumerate(
+                    matrix.similar_users(user_id, k=k, min_similarity=min_similarity), start=1):
+                neighbor_rows.append({
+                    "user_id": user_id,
+                    "neighbor_id": neighbor_id,
+                    "rank": rank,
+                    "similarity": similarity,
+                    "updated_at": now,
+                })
+        state_rows = [
+            {"user_id": user_id, "fingerprint": current[user_id], "refreshed_at": now}
+            for user_id in chunk
+        ]
+
+        db.execute(delete(UserNeighbor).where(UserNeighbor.user_id.in_(chunk)))
+        db.execute(delete(UserNeighborState).where(UserNeighborState.user_id.in_(chunk)))
+        if neighbor_rows:
+            db.execute(insert(UserNeighbor), neighbor_rows)
+        db.execute(insert(UserNeighborState), state_rows)
+        db.commit()
+
+    # 90일 윈도우를 벗어난 사용자는 인덱스에서 제거
+    for chunk in _chunks(sorted(removed), CHUNK_SIZE):
+        db.execute(delete(UserNeighbor).where(UserNeighbor.user_id.in_(chunk)))
+        db.execute(delete(UserNeighborState).where(UserNeighborState.user_id.in_(chunk)))
+        db.commit()
+
+    stats = {
+        "users": len(current),
+        "changed": len(changed),
+        "affected": len(affected),
+        "refreshed": len(targets),
+        "removed": len(removed),
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
+    logger.info("neighbor index refreshed: %s", stats)
+    return stats
+
+
+def get_indexed_neighbors(db: Session, user_id: str) -> Optional[List[Tuple[str, float]]]:
+    """
+    인덱스에 저장된 유사 사용자 조회
+    - 인덱싱된 적 없는 사용자는 None (호출 측에서 실시간 계산으로 폴백)
+    """
+    query = text("""
+        SELECT s.user_id, n.neighbor_id, n.similarity
+        FROM user_neighbor_state s
+        LEFT JOIN user_neighbors n ON n.user_id = s.user_id
+        WHERE s.user_id = :user_id
+        ORDER BY n.rank
+    """)
+    results = db.execute(query, {"user_id": user_id}).fetchall()
+    if not results:
+        return None
+    return [(r.neighbor_id, float(r.similarity)) for r in results if r.neighbor_id]
+
+
+def load_user_interactions(db: Session, user_ids: List[str]) -> List[Tuple[str, str, float]]:
+    """사용자들의 최근 90일 상호작용을 한 번의 IN 쿼리로 조회"""
+    if not user_ids:
+        return []
+    query = text("""
+        SELECT user_id, quest_id,
+               MAX(is_click * 0.3 + is_cleared * 0.7) as interaction_score
+        FROM quest_recommendations
+        WHERE user_id IN :user_ids
+        AND recommendation_date >= :cutoff_date
+        AND (is_click = 1 OR is_cleared = 1)
+        GROUP BY user_id, quest_id
+    """).bindparams(bindparam("user_ids", expanding=True))
+    cutoff_date = date.today() - timedelta(days=WINDOW_DAYS)
+    results = db.execute(query, {"user_ids": user_ids, "cutoff_date": cutoff_date}).fetchall()
+    return [(r.user_id, r.quest_id, r.interaction_score) for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사 사용자 인덱스 갱신")
+    parser.add_argument("--full", action="store_true", help="전체 재구축")
+    parser.add_argument("--k", type=int, default=10, help="사용자당 저장할 이웃 수")
+    parser.add_argument("--interval", type=int, default=0, help="반복 주기(초), 0이면 1회 실행")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.database import SessionLocal
+
+    while True:
+        db = SessionLocal()
+        try:
+            refresh_neighbor_index(db, k=args.k, full=args.full)
+        finally:
+            db.close()
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# app/recommend/persistence.py
+"""
+추천 결과 저장 (quest_recommendations)
+
+- (user_id, quest_id, recommendation_date) 유니크 키를 기준으로 여러 행을 INSERT 1회로 저장합니다.
+  이미 있는 행은 그대로 두므로(클릭/완료 기록 유지) 같은 날 여러 번 저장해도 안전합니다.
+- RECO_WRITE_BEHIND=1 이면 요청 경로에서는 큐에 넣기만 하고, 백그라운드 스레드가
+  RECO_WRITE_BEHIND_INTERVAL 초마다(또는 RECO_WRITE_BEHIND_BATCH 행이 쌓이면) 모아서 저장합니다.
+  - 오늘의 추천 캐시(cache.set_daily_details)는 when_saved 로 저장이 끝난 뒤에만 채웁니다.
+    저장이 실패하거나 프로세스가 비정상 종료되어 행이 유실되면 캐시도 채워지지 않으므로,
+    다음 요청이 추천을 다시 계산하고 다시 저장합니다.
+  - 큐에 넣을 때 Redis reco:pending:{날짜}:{user_id} 에 추천 퀘스트 ID를 잠시 남겨,
+    저장 전에 들어온 클릭/완료(stats.record_interaction)가 어느 워커에서든 행을 먼저 저장할 수 있게 합니다.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import date
+import json
+import atexit
+import logging
+import os
+import queue
+import secrets
+import string
+import threading
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import rds
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.getenv("RECO_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_INTERVAL = float(os.getenv("RECO_WRITE_BEHIND_INTERVAL", "1.0"))
+WRITE_BEHIND_BATCH = int(os.getenv("RECO_WRITE_BEHIND_BATCH", "500"))
+# INSERT 1회당 최대 행 수
+STATEMENT_ROWS = 500
+# 저장 대기 중인 추천 표시 유지 시간 (저장에 실패해도 이 시간 동안은 클릭/완료 시 행을 저장)
+PENDING_TTL_SECONDS = 600
+
+_ID_ALPHABET = string.ascii_uppercase + string.ascii_lowercase + string.digits
+
+
+def new_recommendation_id() -> str:
+    """ULID 형식의 ID 생성 (26자리)"""
+    # 실제 ULID는 시간 기반이지만, 여기서는 랜덤 문자열로 생성
+    # 형식: 01HJQXXX... (26자리)
+    prefix = "01HJQ"  # 고정 prefix
+    return prefix + "".join(secrets.choice(_ID_ALPHABET) for _ in range(26 - len(prefix)))
+
+
+def _upsert_sql(dialect: str, n_rows: int) -> str:
+    values = ", ".join(
+        f"(:id_{i}, :user_id_{i}, :quest_id_{i}, :recommendation_date_{i}, 0, 0)"
+        for i in range(n_rows)
+    )
+    if dialect == "mysql":
+        conflict = "ON DUPLICATE KEY UPDATE id = id"
+    else:
+        conflict = "ON CONFLICT (user_id, quest_id, recommendation_date) DO NOTHING"
+    return f"""
+        INSERT INTO quest_recommendations
+        (id, user_id, quest_id, recommendation_date, is_click, is_cleared)
+        VALUES {values}
+        {conflict}
+    """
+
+
+def upsert_recommendations(db: Session, recommendations: Dict[str, List[str]],
+                           day: Optional[date] = None, commit: bool = True) -> int:
+    """
+    여러 사용자의 추천 결과를 multi-row INSERT로 저장 (이미 있는 행은 유지)
+    - 반환값은 드라이버가 보고한 영향 행 수
+    """
+    day = day or date.today()
+    rows: List[Tuple[str, str]] = [
+        (user_id, quest_id)
+        for user_id, quest_ids in recommendations.items()
+        for quest_id in quest_ids
+    ]
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    written = 0
+    try:
+        for start in range(0, len(rows), STATEMENT_ROWS):
+            chunk = rows[start:start + STATEMENT_ROWS]
+            params = {}
+            for i, (user_id, quest_id) in enumerate(chunk):
+                params[f"id_{i}"] = new_recommendation_id()
+                params[f"user_id_{i}"] = user_id
+                params[f"quest_id_{i}"] = quest_id
+                params[f"recommendation_date_{i}"] = day
+            result = db.execute(text(_upsert_sql(dialect, len(chunk))), params)
+            written += max(result.rowcount or 0, 0)
+        if commit:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+class RecommendationWriter:
+    """추천 저장 write-behind 버퍼 (백그라운드 스레드에서 일괄 저장)"""
+
+    def __init__(self, interval: float = WRITE_BEHIND_INTERVAL, batch_size: int = WRITE_BEHIND_BATCH):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Tuple[str, List[str], date]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+        # (user_id, 날짜) → 아직 저장되지 않은 항목 수 / 저장 후 실행할 콜백
+        self._unsaved: Dict[Tuple[str, date], int] = {}
+        self._callbacks: Dict[Tuple[str, date], List[Callable[[], None]]] = {}
+        self._unsaved_lock = threading.Lock()
+
+    def submit(self, user_id: str, quest_ids: List[str], day: date) -> None:
+        self._ensure_started()
+        with self._unsaved_lock:
+            self._unsaved[(user_id, day)] = self._unsaved.get((user_id, day), 0) + 1
+        try:
+            rds.setex(pending_key(user_id, day), PENDING_TTL_SECONDS, json.dumps(quest_ids))
+        except redis.RedisError:
+            logger.warning("failed to mark pending recommendations for %s", user_id)
+        self._queue.put((user_id, quest_ids, day))
+
+    def when_saved(self, user_id: str, day: date, callback: Callable[[], None]) -> bool:
+        """저장 대기 중이면 저장 후 실행하도록 등록하고 True, 대기 중인 항목이 없으면 False"""
+        with self._unsaved_lock:
+            if not self._unsaved.get((user_id, day)):
+                return False
+            self._callbacks.setdefault((user_id, day), []).append(callback)
+            return True
+
+    def _finish(self, items: List[Tuple[str, List[str], date]], saved: bool) -> None:
+        """저장이 끝난 (user_id, 날짜)의 콜백 실행 (실패하면 버림 → 다음 요청이 다시 계산/저장)"""
+        ready: List[Callable[[], None]] = []
+        with self._unsaved_lock:
+            for user_id, _, day in items:
+                key = (user_id, day)
+                remaining = self._unsaved.get(key, 0) - 1
+                if remaining > 0:
+                    self._unsaved[key] = remaining
+                    continue
+                self._unsaved.pop(key, None)
+                callbacks = self._callbacks.pop(key, [])
+                if saved:
+                    ready.extend(callbacks)
+        for callback in ready:
+            try:
+                callback()
+            except Exception:
+                logger.exception("write-behind callback failed")
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="reco-writer", daemon=True)
+                self._thread.start()
+
+    def _drain(self, block: bool) -> List[Tuple[str, List[str], date]]:
+        items = []
+        try:
+            items.append(self._queue.get(timeout=self.interval) if block else self._queue.get_nowait())
+            while len(items) < self.batch_size:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return items
+
+    def _write(self, items: List[Tuple[str, List[str], date]]) -> None:
+        from app.database import SessionLocal
+
+        by_day: Dict[date, Dict[str, List[str]]] = {}
+        for user_id, quest_ids, day in items:
+            by_day.setdefault(day, {})[user_id] = quest_ids
+
+        saved = False
+        db = SessionLocal()
+        try:
+            for day, recommendations in by_day.items():
+                upsert_recommendations(db, recommendations, day)
+            saved = True
+        except Exception:
+            logger.exception("write-behind flush failed (%d users dropped)", len(items))
+        finally:
+            db.close()
+        self._finish(items, saved)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            items = self._drain(block=True)
+            if items:
+                self._write(items)
+
+    def flush(self) -> None:
+        """큐에 남은 행을 호출 스레드에서 즉시 저장"""
+        while True:
+            items = self._drain(block=False)
+            if not items:
+                break
+            self._write(items)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.flush()
+
+
+_writer = RecommendationWriter()
+atexit.register(_writer.stop)
+
+
+def save_recommendations(db: Session, user_id: str, quest_ids: List[str],
+                         day: Optional[date] = None) -> None:
+    """사용자 1명의 추천 저장 (write-behind 모드면 큐에 넣고 바로 반환)"""
+    day = day or date.today()
+    if WRITE_BEHIND:
+        _writer.submit(user_id, list(quest_ids), day)
+        return
+    upsert_recommendations(db, {user_id: quest_ids}, day)
+
+
+def when_saved(user_id: str, day: date, callback: Callable[[], None]) -> None:
+    """
+    사용자의 해당 날짜 추천이 DB에 저장된 뒤 callback 실행
+    - 이 워커의 write-behind 큐에 저장 대기 중인 추천이 없으면 바로 실행
+    - 저장이 실패하면 실행하지 않음
+    """
+    if not (WRITE_BEHIND and _writer.when_saved(user_id, day, callback)):
+        callback()
+
+
+def pending_key(user_id: str, day: date) -> str:
+    return f"reco:pending:{day.isoformat()}:{user_id}"
+
+
+def pending_quest_ids(user_id: str, day: date) -> List[str]:
+    """write-behind 큐에 들어가 아직 저장되지 않았을 수 있는 추천 퀘스트 ID (모든 워커)"""
+    if not WRITE_BEHIND:
+        return []
+    try:
+        raw = rds.get(pending_key(user_id, day))
+    except redis.RedisError:
+        return []
+    return json.loads(raw) if raw else []
+
+
+def flush_pending() -> None:
+    """서버 종료 시 write-behind 큐 비우기"""
+    _writer.stop()
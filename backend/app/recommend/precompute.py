@@ -0,0 +1,242 @@
+# app/recommend/precompute.py
+"""
+다음 날 추천 사전 계산 배치
+
+- 전체 사용자를 id 순으로 청크 단위 처리하며 사용자별 추천 3개를 계산합니다.
+  (하이브리드는 _hybrid_recommendation, Cold Start는 score_cohort 로 청크 전체를 한 번에 계산)
+- 퀘스트 카탈로그나 설문 매핑이 바뀌면 --date 오늘 --restart 로 전체 사용자를 재계산합니다.
+- 청크마다 quest_recommendations에 multi-row upsert 후 Redis(reco:daily:*)에 결과를 저장해,
+  아침 피크 시간의 GET /recommendations/quests 는 캐시 조회만 하게 됩니다.
+- 청크 완료 시점마다 Redis에 커서(마지막 user_id)를 기록하므로, 중단 후 다시 실행하면
+  이어서 처리합니다. 이미 저장된 (user_id, quest_id, 날짜) 행은 유니크 키로 건너뜁니다.
+- --restart 는 청크마다 대상 날짜의 기존 추천 행을 지우고 새 결과로 교체한 뒤(클릭/완료 기록이
+  있는 행은 유지) 해당 사용자의 일자별 ID/상세 캐시를 비웁니다. 교체 모드는 Redis에 기록되므로
+  --restart 실행이 중단된 뒤 이어서 실행해도 남은 사용자를 계속 교체합니다.
+
+실행:
+    python -m app.recommend.precompute                    # 내일 날짜 추천 계산
+    python -m app.recommend.precompute --date 2025-09-01  # 특정 날짜
+    python -m app.recommend.precompute --restart          # 커서 무시하고 처음부터 (기존 추천 교체)
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+from collections import defaultdict
+from datetime import date, timedelta
+import argparse
+import logging
+import time
+
+from sqlalchemy import text, bindparam
+from sqlalchemy.orm import Session
+
+from app.cache import rds
+from .cache import invalidate_daily_many, set_daily_ids_many
+from .persistence import upsert_recommendations
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+
+def _cursor_key(day: date) -> str:
+    return f"reco:precompute:{day.isoformat()}:cursor"
+
+
+def _done_key(day: date) -> str:
+    return f"reco:precompute:{day.isoformat()}:done"
+
+
+def _replace_key(day: date) -> str:
+    return f"reco:precompute:{day.isoformat()}:replace"
+
+
+def _delete_recommendations(db: Session, user_ids: List[str], day: date) -> None:
+    """대상 날짜의 기존 추천 행 삭제 (클릭/완료 기록이 있는 행은 유지)"""
+    query = text("""
+        DELETE FROM quest_recommendations
+        WHERE recommendation_date = :day
+        AND user_id IN :user_ids
+        AND is_click = 0 AND is_cleared = 0
+    """).bindparams(bindparam("user_ids", expanding=True))
+    db.execute(query, {"day": day, "user_ids": user_ids})
+
+
+def _next_user_ids(db: Session, cursor: str, limit: int) -> List[str]:
+    """커서 이후 사용자 id (keyset pagination)"""
+    query = text("""
+        SELECT id FROM users
+        WHERE id > :cursor
+        ORDER BY id
+        LIMIT :limit
+    """)
+    return [r.id for r in db.execute(query, {"cursor": cursor, "limit": limit}).fetchall()]
+
+
+def _load_user_infos(db: Session, user_ids: List[str]) -> Dict[str, Dict]:
+    query = text("""
+        SELECT id, gender, birth_year, school_id, department, grade
+        FROM users
+        WHERE id IN :user_ids
+    """).bindparams(bindparam("user_ids", expanding=True))
+    return {
+        r.id: {
+            "id": r.id,
+            "gender": r.gender,
+            "birth_year": r.birth_year,
+            "school_id": r.school_id,
+            "department": r.department,
+            "grade": r.grade,
+        }
+        for r in db.execute(query, {"user_ids": user_ids}).fetchall()
+    }
+
+
+def _load_survey_answers(db: Session, user_ids: List[str]) -> Dict[str, List[Dict]]:
+    query = text("""
+        SELECT user_id, question_id, question_type, option_order_no
+        FROM survey_answers
+        WHERE user_id IN :user_ids
+        ORDER BY user_id, question_id
+    """).bindparams(bindparam("user_ids", expanding=True))
+    answers: Dict[str, List[Dict]] = defaultdict(list)
+    for r in db.execute(query, {"user_ids": user_ids}).fetchall():
+        answers[r.user_id].append({
+            "question_id": r.question_id,
+            "question_type": r.question_type,
+            "option_order_no": r.option_order_no,
+        })
+    return answers
+
+
+def precompute_recommendations(db: Session, target_date: Optional[date] = None,
+                               chunk_size: int = CHUNK_SIZE, restart: bool = False) -> Dict[str, int]:
+    """전체 사용자의 target_date(기본: 내일) 추천 사전 계산"""
+    from .system import get_recommender
+
+    day = target_date or date.today() + timedelta(days=1)
+    system = get_recommender()
+
+    if restart:
+        pipe = rds.pipeline()
+        pipe.delete(_cursor_key(day), _done_key(day))
+        pipe.set(_replace_key(day), 1, ex=60 * 60 * 48)
+        pipe.execute()
+    replace = bool(rds.exists(_replace_key(day)))
+    cursor = rds.get(_cursor_key(day)) or ""
+    done = int(rds.get(_done_key(day)) or 0)
+
+    total = db.execute(text("SELECT COUNT(*) as count FROM users")).fetchone().count
+    if cursor:
+        logger.info("resuming %s from cursor=%s (%d/%d done)", day, cursor, done, total)
+
+    # 작업 전체에서 한 번만 조회하는 입력
+    is_data_sufficient, _ = system._check_data_sufficiency(db)
+    available_quests = system.get_available_quests(db)
+    default_ids = system._get_default_recommendations(db)
+
+    started = time.monotonic()
+    processed = written = failed = 0
+
+    while True:
+        user_ids = _next_user_ids(db, cursor, chunk_size)
+        if not user_ids:
+            break
+
+        user_infos = _load_user_infos(db, user_ids)
+        survey_answers = _load_survey_answers(db, user_ids)
+
+        recommendations: Dict[str, List[str]] = {}
+        cold_start_ids: List[str] = []
+
+        # 1. 하이브리드 대상이면 사용자별 하이브리드 추천 (3개 미만이면 Cold Start로)
+        for user_id in user_ids:
+            if not is_data_sufficient:
+                cold_start_ids.append(user_id)
+                continue
+            try:
+                quest_ids = system._hybrid_recommendation(db, user_id)
+            except Exception:
+                logger.exception("hybrid recommendation failed for user %s", user_id)
+                quest_ids = []
+                failed += 1
+            if len(quest_ids) >= 3:
+                recommendations[user_id] = quest_ids[:3]
+            else:
+                cold_start_ids.append(user_id)
+
+        # 2. Cold Start 사용자는 청크 단위 행렬 연산으로 한 번에 계산
+        surveyed = [uid for uid in cold_start_ids if survey_answers.get(uid)]
+        ranked = system.score_cohort(
+            [user_infos[uid] for uid in surveyed],
+            [survey_answers[uid] for uid in surveyed],
+            available_quests, k=3,
+        )
+        recommendations.update(zip(surveyed, ranked))
+
+        # 3. 설문이 없는 사용자는 기본 추천
+        for user_id in cold_start_ids:
+            recommendations.setdefault(user_id, default_ids)
+
+        if replace:
+            try:
+                _delete_recommendations(db, user_ids, day)
+                written += upsert_recommendations(db, recommendations, day, commit=False)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            invalidate_daily_many(user_ids, day)
+        else:
+            written += upsert_recommendations(db, recommendations, day)
+        set_daily_ids_many(recommendations, day)
+
+        # 청크가 DB와 캐시에 모두 반영된 뒤에 커서 이동
+        cursor = user_ids[-1]
+        processed += len(user_ids)
+        done += len(user_ids)
+        pipe = rds.pipeline()
+        pipe.set(_cursor_key(day), cursor, ex=60 * 60 * 48)
+        pipe.set(_done_key(day), done, ex=60 * 60 * 48)
+        pipe.execute()
+
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        logger.info("precompute %s: %d/%d users (%.1f%%), %.0f users/s, eta %.0fs",
+                    day, done, total, 100.0 * done / max(total, 1), rate, eta)
+
+    if replace:
+        rds.delete(_replace_key(day))
+
+    stats = {
+        "total": total,
+        "processed": processed,
+        "written": written,
+        "failed": failed,
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
+    logger.info("precompute %s finished: %s", day, stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="다음 날 추천 사전 계산")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="대상 날짜 (기본: 내일)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true", help="저장된 커서를 무시하고 처음부터 실행 (대상 날짜의 기존 추천 교체)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        precompute_recommendations(db, target_date=args.date, chunk_size=args.chunk_size,
+                                   restart=args.restart)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
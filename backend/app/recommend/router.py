@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from typing import List, Dict, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, date
 
-from .system import QuestRecommendationSystem
+from .system import get_recommender
+from .stats import record_interaction
+from .cache import get_daily_details, set_daily_details
+from .persistence import when_saved
+from .executor import run_with_session
+from .metrics import profiled, render_prometheus, stage, start_breakdown, server_timing
 from ..database import get_db
 from ..auth.deps import get_current_user
 from ..models import User
@@ -46,9 +51,79 @@ class QuestDetailResponse(BaseModel):
 # 라우터 생성
 recommendation_router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
+@profiled("quests")
+def _recommended_quests(db: Session, user_id: str) -> List[QuestInfo]:
+    """오늘의 추천 퀘스트 상세 (스레드 풀에서 실행)"""
+    # 같은 날 재요청은 일자별 캐시에서 바로 반환 (MySQL 조회 없음)
+    today = date.today()
+    with stage("daily_details_cache"):
+        cached = get_daily_details(user_id, today)
+    if cached is not None:
+        return [QuestInfo(**quest) for quest in cached]
+    
+    recommendation_system = get_recommender()
+    quest_ids = recommendation_system.recommend_quests(db, user_id)
+    
+    # 추천된 퀘스트들의 전체 정보를 조회 (카탈로그 + 누락분 IN 쿼리 1회)
+    quests_info = [
+        QuestInfo(**quest)
+        for quest in recommendation_system._get_quests_full_details(db, quest_ids)
+    ]
+    
+    if quests_info:
+        # write-behind 모드에서는 추천 행이 저장된 뒤에 캐시 (저장 실패 시 다음 요청에서 다시 계산·저장)
+        details = [quest.model_dump(mode="json") for quest in quests_info]
+        when_saved(user_id, today, lambda: set_daily_details(user_id, today, details))
+    
+    return quests_info
+
+
+@profiled("quests_detailed")
+def _recommended_quests_with_details(db: Session, user_id: str) -> List[QuestDetailResponse]:
+    """설문 기반 추천 퀘스트와 추천 점수 (스레드 풀에서 실행)"""
+    recommendation_system = get_recommender()
+    
+    # 사용자 정보 및 설문조사 답변 조회
+    user_info = recommendation_system.get_user_info(db, user_id)
+    survey_answers = recommendation_system.get_survey_answers(db, user_id)
+    available_quests = recommendation_system.get_available_quests(db)
+    
+    if survey_answers:
+        # 선호도 분석 및 퀘스트 점수 계산
+        category_scores = recommendation_system.analyze_user_preferences(user_info, survey_answers)
+        scored_quests = recommendation_system.score_quests(available_quests, category_scores)
+        recommended_quests = recommendation_system._select_diverse_quests(scored_quests, 3)
+        
+        # DB에 추천 기록 저장
+        quest_ids = [quest["id"] for quest in recommended_quests]
+        recommendation_system._save_recommendations_to_db(db, user_id, quest_ids)
+    else:
+        # 기본 추천
+        default_ids = recommendation_system._get_default_recommendations(db)
+        # DB에 기본 추천 저장
+        recommendation_system._save_recommendations_to_db(db, user_id, default_ids)
+        recommended_quests = [q for q in available_quests if q["id"] in default_ids][:3]
+    
+    return [
+        QuestDetailResponse(
+            id=quest["id"],
+            type=quest["type"],
+            title=quest["title"],
+            category=quest["category"],
+            verify_method=quest["verify_method"],
+            reward_exp=quest["reward_exp"],
+            target_count=quest["target_count"],
+            period_scope=quest["period_scope"],
+            recommendation_score=quest.get("recommendation_score", 0)
+        )
+        for quest in recommended_quests
+    ]
+
+
 @recommendation_router.get("/quests", response_model=QuestRecommendationResponse)
 async def get_recommended_quests(
-    db: Session = Depends(get_db),
+    response: Response,
+    x_reco_debug: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -57,57 +132,33 @@ async def get_recommended_quests(
     - 사용자의 개인정보와 설문조사 답변을 분석하여 맞춤형 퀘스트 3개를 추천합니다.
     - LIFE, GROWTH 타입의 퀘스트를 추천합니다. (SURPRISE 타입은 제외)
     - 추천된 퀘스트의 전체 정보를 반환합니다.
+    - 계산은 추천 전용 스레드 풀에서 실행됩니다 (대기열 초과 503, 시간 초과 504).
+    - X-Reco-Debug 헤더를 보내면 단계별 소요 시간을 Server-Timing 헤더로 반환합니다.
     """
-    try:
-        # current_user 객체에서 user_id 추출
-        user_id = current_user.id
-        
-        recommendation_system = QuestRecommendationSystem()
-        quest_ids = recommendation_system.recommend_quests(db, user_id)
-        
-        # 추천된 퀘스트들의 전체 정보를 조회
-        quests_info = []
-        for quest_id in quest_ids:
-            query = text("""
-                SELECT id, type, title, category, verify_method, verify_params,
-                       reward_exp, target_count, period_scope, active,
-                       lat, lng, quest_link_url, created_at
-                FROM quests
-                WHERE id = :quest_id
-                AND id != 'quest_daily_016'
-            """)
-            
-            result = db.execute(query, {"quest_id": quest_id}).fetchone()
-            
-            if result:
-                quests_info.append(QuestInfo(
-                    id=result.id,
-                    type=result.type,
-                    title=result.title,
-                    category=result.category,
-                    verify_method=result.verify_method,
-                    verify_params=result.verify_params,
-                    reward_exp=result.reward_exp,
-                    target_count=result.target_count,
-                    period_scope=result.period_scope,
-                    active=bool(result.active),
-                    lat=float(result.lat) if result.lat else None,
-                    lng=float(result.lng) if result.lng else None,
-                    quest_link_url=result.quest_link_url,
-                    created_at=result.created_at
-                ))
-        
-        return QuestRecommendationResponse(
-            quests=quests_info,
-            message=f"사용자 {user_id}를 위한 {len(quests_info)}개의 맞춤 퀘스트를 추천했습니다."
-        )
+    # current_user 객체에서 user_id 추출
+    user_id = current_user.id
     
+    breakdown = start_breakdown()
+    try:
+        with stage("total"):
+            quests_info = await run_with_session(_recommended_quests, user_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 시스템 오류: {str(e)}")
+    
+    if x_reco_debug:
+        response.headers["Server-Timing"] = server_timing(breakdown)
+    
+    return QuestRecommendationResponse(
+        quests=quests_info,
+        message=f"사용자 {user_id}를 위한 {len(quests_info)}개의 맞춤 퀘스트를 추천했습니다."
+    )
 
 @recommendation_router.get("/quests/detailed", response_model=List[QuestDetailResponse])
 async def get_recommended_quests_with_details(
-    db: Session = Depends(get_db),
+    response: Response,
+    x_reco_debug: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -117,50 +168,41 @@ async def get_recommended_quests_with_details(
     - quest_recommendations 테이블에 추천 기록을 저장합니다.
     - 프로덕션 환경에서 사용 예정인 API입니다.
     """
+    breakdown = start_breakdown()
     try:
-        # current_user 객체에서 user_id 추출
-        user_id = current_user.id
-        
-        recommendation_system = QuestRecommendationSystem()
-        
-        # 사용자 정보 및 설문조사 답변 조회
-        user_info = recommendation_system.get_user_info(db, user_id)
-        survey_answers = recommendation_system.get_survey_answers(db, user_id)
-        available_quests = recommendation_system.get_available_quests(db)
-        
-        if survey_answers:
-            # 선호도 분석 및 퀘스트 점수 계산
-            category_scores = recommendation_system.analyze_user_preferences(user_info, survey_answers)
-            scored_quests = recommendation_system.score_quests(available_quests, category_scores)
-            recommended_quests = recommendation_system._select_diverse_quests(scored_quests, 3)
-            
-            # DB에 추천 기록 저장
-            quest_ids = [quest["id"] for quest in recommended_quests]
-            recommendation_system._save_recommendations_to_db(db, user_id, quest_ids)
-        else:
-            # 기본 추천
-            default_ids = recommendation_system._get_default_recommendations(db)
-            # DB에 기본 추천 저장
-            recommendation_system._save_recommendations_to_db(db, user_id, default_ids)
-            recommended_quests = [q for q in available_quests if q["id"] in default_ids][:3]
-        
-        return [
-            QuestDetailResponse(
-                id=quest["id"],
-                type=quest["type"],
-                title=quest["title"],
-                category=quest["category"],
-                verify_method=quest["verify_method"],
-                reward_exp=quest["reward_exp"],
-                target_count=quest["target_count"],
-                period_scope=quest["period_scope"],
-                recommendation_score=quest.get("recommendation_score", 0)
-            )
-            for quest in recommended_quests
-        ]
-    
+        with stage("total_detailed"):
+            recommended = await run_with_session(_recommended_quests_with_details, current_user.id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 시스템 오류: {str(e)}")
+    
+    if x_reco_debug:
+        response.headers["Server-Timing"] = server_timing(breakdown)
+    return recommended
+
+@recommendation_router.get("/metrics", response_class=PlainTextResponse)
+def get_recommendation_metrics():
+    """
+    추천 파이프라인 단계별 소요 시간 히스토그램 (Prometheus 텍스트 형식, 워커별 값)
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@recommendation_router.post("/quests/{quest_id}/click")
+def record_recommendation_click(
+    quest_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    추천된 퀘스트 클릭(상세 조회) 기록
+    
+    - quest_recommendations.is_click 을 갱신하고 하이브리드 전환 통계에 반영합니다.
+    """
+    recorded = record_interaction(db, current_user.id, quest_id, clicked=True)
+    if not recorded:
+        raise HTTPException(status_code=404, detail="추천 이력이 없는 퀘스트입니다.")
+    return {"success": True}
 
 # 프로덕션 환경에서는 디버깅용 API 비활성화
 # @recommendation_router.get("/user/preferences")
@@ -177,7 +219,7 @@ async def get_recommended_quests_with_details(
 #         # current_user 객체에서 user_id 추출
 #         user_id = current_user.id
 #         
-#         recommendation_system = QuestRecommendationSystem()
+#         recommendation_system = get_recommender()
 #         user_info = recommendation_system.get_user_info(db, user_id)
 #         survey_answers = recommendation_system.get_survey_answers(db, user_id)
 #         
@@ -0,0 +1,275 @@
+# app/recommend/segments.py
+"""
+설문 세그먼트별 Cold Start 추천 사전 계산
+
+- Cold Start 추천은 사용자의 카테고리 선호도 벡터(_preference_vector: 연령대 + 학년 + 설문 답변)만으로
+  정해지므로, 같은 벡터를 가진 사용자는 항상 같은 추천을 받습니다.
+- 배치가 전체 설문 응답자의 선호도 벡터를 모아
+  1) 사용자가 RECO_SEGMENT_MIN_USERS 명 이상인 벡터는 정확히 일치하는 세그먼트(exact bucket)로,
+  2) 전체 벡터는 k-means 로 RECO_SEGMENT_CLUSTERS 개 군집으로 묶어
+  세그먼트별 추천 퀘스트 순위를 계산하고 Redis(reco:segments:*)에 저장합니다.
+- 요청 경로는 선호도 벡터를 세그먼트 키로 바꿔 워커에 상주하는 테이블에서 조회합니다.
+  정확한 세그먼트가 없으면 실시간 계산으로 폴백하며, RECO_SEGMENT_APPROXIMATE=1 이면 가장 가까운
+  군집 중심의 목록을 대신 사용합니다. (근사값이므로 실시간 계산과 다를 수 있음)
+  퀘스트 카탈로그 버전이 바뀌었거나 테이블이 없어도 실시간 계산으로 폴백합니다.
+
+실행:
+    python -m app.recommend.segments                 # 세그먼트 재계산
+    python -m app.recommend.segments --clusters 128 --min-users 3
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import redis
+from sqlalchemy.orm import Session
+
+from app.cache import rds
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_CLUSTERS = int(os.getenv("RECO_SEGMENT_CLUSTERS", "64"))
+SEGMENT_MIN_USERS = int(os.getenv("RECO_SEGMENT_MIN_USERS", "2"))
+SEGMENT_APPROXIMATE = os.getenv("RECO_SEGMENT_APPROXIMATE", "0") == "1"
+SEGMENT_CHECK_SECONDS = int(os.getenv("RECO_SEGMENT_CHECK_SECONDS", "60"))
+SEGMENT_TTL_SECONDS = 60 * 60 * 24 * 7
+# 세그먼트별로 저장하는 추천 순위 길이
+RANK_DEPTH = 5
+
+CURRENT_KEY = "reco:segments:current"
+
+_table: dict = {"table": None, "at": 0.0}
+_table_lock = threading.Lock()
+
+
+def table_key(version: str) -> str:
+    return f"reco:segments:{version}"
+
+
+def segment_key(preferences: np.ndarray) -> str:
+    """선호도 벡터 → 세그먼트 키 (정수 점수를 그대로 이어 붙임)"""
+    return ",".join(str(int(v)) for v in preferences)
+
+
+class SegmentTable:
+    """정확 일치 세그먼트 + 군집 중심별 추천 순위"""
+
+    def __init__(self, version: str, catalog_version: str, exact: Dict[str, List[str]],
+                 centroids: np.ndarray, centroid_ranks: List[List[str]]):
+        self.version = version
+        self.catalog_version = catalog_version
+        self.exact = exact
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.centroid_ranks = centroid_ranks
+
+    def lookup(self, preferences: np.ndarray, approximate: bool = True) -> Optional[List[str]]:
+        ranked = self.exact.get(segment_key(preferences))
+        if ranked is not None or not approximate or len(self.centroids) == 0:
+            return ranked
+        distances = ((self.centroids - np.asarray(preferences, dtype=np.float32)) ** 2).sum(axis=1)
+        return self.centroid_ranks[int(np.argmin(distances))]
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "version": self.version,
+            "catalog_version": self.catalog_version,
+            "exact": self.exact,
+            "centroids": self.centroids.tolist(),
+            "centroid_ranks": self.centroid_ranks,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "SegmentTable":
+        data = json.loads(raw)
+        return cls(data["version"], data["catalog_version"], data["exact"],
+                   np.asarray(data["centroids"], dtype=np.float32), data["centroid_ranks"])
+
+
+def kmeans(vectors: np.ndarray, weights: np.ndarray, k: int, iterations: int = 20,
+           seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    가중 k-means (k-means++ 초기화 + Lloyd 반복)
+    - vectors: 서로 다른 선호도 벡터 (U × C), weights: 벡터별 사용자 수
+    - 반환: (군집 중심 k × C, 벡터별 군집 번호)
+    """
+    rng = np.random.default_rng(seed)
+    vectors = vectors.astype(np.float64)
+    weights = weights.astype(np.float64)
+    k = min(k, len(vectors))
+
+    # k-means++ : 이미 고른 중심과의 거리² × 사용자 수에 비례해 다음 중심 선택
+    centers = [vectors[rng.choice(len(vectors), p=weights / weights.sum())]]
+    closest = ((vectors - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        p = closest * weights
+        if p.sum() <= 0:
+            break
+        centers.append(vectors[rng.choice(len(vectors), p=p / p.sum())])
+        closest = np.minimum(closest, ((vectors - centers[-1]) ** 2).sum(axis=1))
+    centroids = np.vstack(centers)
+
+    # 거리² = |x|² - 2x·c + |c|² (U × k 행렬만 만들도록)
+    squared_norms = (vectors ** 2).sum(axis=1, keepdims=True)
+    labels = np.zeros(len(vectors), dtype=np.int64)
+    for i in range(iterations):
+        distances = squared_norms - 2.0 * vectors @ centroids.T + (centroids ** 2).sum(axis=1)
+        new_labels = distances.argmin(axis=1)
+        if i > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(len(centroids)):
+            members = labels == c
+            if members.any():
+                centroids[c] = np.average(vectors[members], axis=0, weights=weights[members])
+    return centroids, labels
+
+
+def collect_preferences(db: Session, chunk_size: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """설문 응답자의 서로 다른 선호도 벡터와 벡터별 사용자 수"""
+    from .precompute import _load_survey_answers, _load_user_infos, _next_user_ids
+    from .system import get_recommender
+
+    system = get_recommender()
+    counts: Dict[tuple, int] = {}
+    cursor = ""
+    while True:
+        user_ids = _next_user_ids(db, cursor, chunk_size)
+        if not user_ids:
+            break
+        cursor = user_ids[-1]
+
+        survey_answers = _load_survey_answers(db, user_ids)
+        surveyed = [uid for uid in user_ids if survey_answers.get(uid)]
+        if not surveyed:
+            continue
+        user_infos = _load_user_infos(db, surveyed)
+        preferences = system._preference_matrix(
+            [user_infos[uid] for uid in surveyed],
+            [survey_answers[uid] for uid in surveyed],
+        ).astype(np.int64)
+        unique, unique_counts = np.unique(preferences, axis=0, return_counts=True)
+        for row, count in zip(map(tuple, unique.tolist()), unique_counts.tolist()):
+            counts[row] = counts.get(row, 0) + count
+
+    if not counts:
+        return np.zeros((0, 0), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.asarray(list(counts.keys()), dtype=np.int64), np.asarray(list(counts.values()), dtype=np.int64)
+
+
+def build_segments(db: Session, clusters: int = SEGMENT_CLUSTERS, min_users: int = SEGMENT_MIN_USERS,
+                   seed: int = 0) -> Dict:
+    """세그먼트 테이블을 계산해 Redis에 새 버전으로 저장하고 현재 버전으로 지정"""
+    from .system import get_recommender
+
+    started = time.monotonic()
+    system = get_recommender()
+    catalog = system._get_catalog(db)
+
+    vectors, counts = collect_preferences(db)
+    exact: Dict[str, List[str]] = {}
+    centroids = np.zeros((0, 0), dtype=np.float32)
+    centroid_ranks: List[List[str]] = []
+
+    if len(vectors):
+        bucketed = counts >= min_users
+        ranks = system.rank_preferences(vectors[bucketed], catalog.quests, k=RANK_DEPTH)
+        exact = {segment_key(vector): ranked for vector, ranked in zip(vectors[bucketed], ranks)}
+
+        centroids, _ = kmeans(vectors, counts, clusters, seed=seed)
+        centroid_ranks = system.rank_preferences(centroids, catalog.quests, k=RANK_DEPTH)
+
+    version = datetime.now().strftime("%Y%m%dT%H%M%S")
+    table = SegmentTable(version, catalog.version, exact, centroids, centroid_ranks)
+
+    previous = rds.get(CURRENT_KEY)
+    pipe = rds.pipeline()
+    pipe.setex(table_key(version), SEGMENT_TTL_SECONDS, table.to_json())
+    pipe.set(CURRENT_KEY, version)
+    if previous and previous != version:
+        # 다른 워커가 이전 버전을 읽는 중일 수 있으므로 바로 지우지 않고 만료만 앞당김
+        pipe.expire(table_key(previous), SEGMENT_CHECK_SECONDS * 2)
+    pipe.execute()
+
+    n_users = int(counts.sum()) if len(counts) else 0
+    stats = {
+        "version": version,
+        "surveyed_users": n_users,
+        "distinct_vectors": len(vectors),
+        "exact_segments": len(exact),
+        "exact_coverage": round(int(counts[counts >= min_users].sum()) / n_users, 4) if n_users else 0.0,
+        "clusters": len(centroid_ranks),
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
+    logger.info("segments built: %s", stats)
+    return stats
+
+
+def get_segment_table() -> Optional[SegmentTable]:
+    """
+    워커에 상주하는 세그먼트 테이블 조회
+    - SEGMENT_CHECK_SECONDS 마다 현재 버전을 확인해 바뀐 경우에만 다시 읽습니다.
+    - Redis 장애 시에는 마지막으로 읽은 테이블(없으면 None)을 사용합니다.
+    """
+    with _table_lock:
+        table = _table["table"]
+        if time.monotonic() - _table["at"] < SEGMENT_CHECK_SECONDS:
+            return table
+        _table["at"] = time.monotonic()
+        try:
+            version = rds.get(CURRENT_KEY)
+            if version is None:
+                table = None
+            elif table is None or table.version != version:
+                raw = rds.get(table_key(version))
+                table = SegmentTable.from_json(raw) if raw else None
+        except redis.RedisError:
+            logger.warning("segment table refresh failed; keeping version %s",
+                           table.version if table else None)
+        _table["table"] = table
+        return table
+
+
+def reset() -> None:
+    """워커에 상주하는 세그먼트 테이블 비우기 (다음 조회 시 Redis에서 다시 읽음)"""
+    with _table_lock:
+        _table["table"] = None
+        _table["at"] = 0.0
+
+
+def lookup_segment(preferences: np.ndarray, catalog_version: str,
+                   approximate: bool = SEGMENT_APPROXIMATE) -> Optional[List[str]]:
+    """선호도 벡터의 세그먼트 추천 순위 (현재 카탈로그로 계산된 테이블이 없으면 None)"""
+    table = get_segment_table()
+    if table is None or table.catalog_version != catalog_version:
+        return None
+    return table.lookup(preferences, approximate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="설문 세그먼트별 Cold Start 추천 사전 계산")
+    parser.add_argument("--clusters", type=int, default=SEGMENT_CLUSTERS, help="k-means 군집 수")
+    parser.add_argument("--min-users", type=int, default=SEGMENT_MIN_USERS,
+                        help="정확 일치 세그먼트로 저장할 최소 사용자 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(json.dumps(build_segments(db, args.clusters, args.min_users, args.seed), ensure_ascii=False))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
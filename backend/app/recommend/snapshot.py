@@ -0,0 +1,181 @@
+# app/recommend/snapshot.py
+"""
+학습된 추천 모델 스냅샷 (uvicorn 워커 간 공유)
+
+디렉터리 구조 (RECO_MODEL_DIR, 기본 var/recommend):
+
+    {name}/CURRENT                 → 현재 버전 이름 (한 줄)
+    {name}/{version}/meta.json     → 학습 파라미터 등 메타데이터
+    {name}/{version}/{array}.npy   → 배열별 .npy 파일
+
+- 학습 배치는 새 버전 디렉터리를 모두 쓴 뒤 CURRENT 를 os.replace 로 교체합니다.
+  (읽는 쪽은 항상 완성된 버전만 보게 됨)
+- 워커는 배열을 np.load(mmap_mode="r") 로 열어 페이지 캐시를 통해 메모리를 공유하고,
+  SNAPSHOT_CHECK_SECONDS 마다 CURRENT 를 확인해 새 버전이 생기면 재시작 없이 교체합니다.
+- 최근 KEEP_VERSIONS 개 버전만 남기고 이전 버전은 정리합니다.
+
+실행:
+    python -m app.recommend.snapshot --list
+    python -m app.recommend.snapshot --build item_similarity
+"""
+from __future__ import annotations
+from typing import Dict, Optional
+from datetime import datetime
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv("RECO_MODEL_DIR", "var/recommend")
+SNAPSHOT_CHECK_SECONDS = int(os.getenv("RECO_SNAPSHOT_CHECK_SECONDS", "10"))
+KEEP_VERSIONS = 2
+
+_current: Dict[str, tuple] = {}
+_current_lock = threading.Lock()
+
+
+class Snapshot:
+    """읽기 전용(mmap) 배열 묶음"""
+
+    def __init__(self, name: str, version: str, arrays: Dict[str, np.ndarray], meta: Dict):
+        self.name = name
+        self.version = version
+        self.arrays = arrays
+        self.meta = meta
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+
+def _snapshot_dir(name: str, root: str) -> str:
+    return os.path.join(root, name)
+
+
+def _read_current(name: str, root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(_snapshot_dir(name, root), "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(name: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None,
+                   root: str = MODEL_DIR) -> str:
+    """새 버전 스냅샷을 쓰고 CURRENT 를 원자적으로 교체한 뒤 버전 이름 반환"""
+    base = _snapshot_dir(name, root)
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    version_dir = os.path.join(base, version)
+    os.makedirs(version_dir)
+
+    for key, array in arrays.items():
+        np.save(os.path.join(version_dir, f"{key}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(version_dir, "meta.json"), "w") as f:
+        json.dump({**(meta or {}), "arrays": sorted(arrays)}, f, ensure_ascii=False)
+
+    pointer_tmp = os.path.join(base, f"CURRENT.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(base, "CURRENT"))
+
+    _prune(base, keep=KEEP_VERSIONS)
+    logger.info("snapshot %s written: %s", name, version)
+    return version
+
+
+def _prune(base: str, keep: int) -> None:
+    """오래된 버전 정리 (이미 mmap 으로 열린 파일은 닫힐 때까지 유효)"""
+    versions = sorted(
+        d for d in os.listdir(base) if os.path.isdir(os.path.join(base, d))
+    )
+    for version in versions[:-keep]:
+        shutil.rmtree(os.path.join(base, version), ignore_errors=True)
+
+
+def load_snapshot(name: str, root: str = MODEL_DIR) -> Optional[Snapshot]:
+    """CURRENT 가 가리키는 버전을 mmap 으로 로드 (없으면 None)"""
+    version = _read_current(name, root)
+    if version is None:
+        return None
+    version_dir = os.path.join(_snapshot_dir(name, root), version)
+    with open(os.path.join(version_dir, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {
+        key: np.load(os.path.join(version_dir, f"{key}.npy"), mmap_mode="r")
+        for key in meta["arrays"]
+    }
+    return Snapshot(name, version, arrays, meta)
+
+
+def get_snapshot(name: str, root: str = MODEL_DIR) -> Optional[Snapshot]:
+    """
+    워커에 상주하는 스냅샷 조회
+    - SNAPSHOT_CHECK_SECONDS 마다 CURRENT 를 확인해 버전이 바뀌었으면 새로 로드
+    """
+    key = (root, name)
+    now = time.monotonic()
+    with _current_lock:
+        entry = _current.get(key)
+        if entry is not None and now - entry[1] < SNAPSHOT_CHECK_SECONDS:
+            return entry[0]
+
+        snapshot = entry[0] if entry is not None else None
+        version = _read_current(name, root)
+        if version is None:
+            snapshot = None
+        elif snapshot is None or snapshot.version != version:
+            try:
+                snapshot = load_snapshot(name, root)
+            except (OSError, ValueError, KeyError):
+                # 쓰는 도중이거나 정리된 버전이면 기존 스냅샷을 유지하고 다음 확인 때 재시도
+                logger.exception("failed to load snapshot %s/%s", name, version)
+        _current[key] = (snapshot, now)
+        return snapshot
+
+
+def reset() -> None:
+    """워커에 상주하는 스냅샷 비우기 (다음 get_snapshot 에서 CURRENT 를 다시 확인)"""
+    with _current_lock:
+        _current.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 모델 스냅샷 관리")
+    parser.add_argument("--list", action="store_true", help="스냅샷별 현재 버전 출력")
+    parser.add_argument("--build", choices=["item_similarity"], help="DB에서 모델을 학습해 스냅샷 생성")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.build == "item_similarity":
+        from app.database import SessionLocal
+        from .matrix import ItemSimilarityModel
+        from .system import get_recommender
+
+        db = SessionLocal()
+        try:
+            matrix = get_recommender()._build_interaction_matrix(db)
+        finally:
+            db.close()
+        model = ItemSimilarityModel.from_matrix(matrix)
+        write_snapshot("item_similarity", {
+            "quest_ids": np.asarray(model.quest_ids, dtype=str),
+            "similarity": model.similarity,
+        }, meta={"users": matrix.n_users, "interactions": matrix.nnz})
+
+    if args.list or not args.build:
+        if os.path.isdir(MODEL_DIR):
+            for name in sorted(os.listdir(MODEL_DIR)):
+                print(name, _read_current(name, MODEL_DIR))
+
+
+if __name__ == "__main__":
+    main()
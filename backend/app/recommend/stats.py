@@ -0,0 +1,227 @@
+# app/recommend/stats.py
+"""
+하이브리드 전환 판단용 상호작용 통계
+
+- reco:stats:interactions : 클릭/완료가 있는 quest_recommendations 행 수 (카운터)
+- reco:stats:users        : 상호작용한 고유 사용자 (HyperLogLog)
+- reco:stats:quests       : 상호작용된 고유 퀘스트 (HyperLogLog)
+
+상호작용이 기록될 때(record_interaction) 증분 갱신되며, 요청 경로는 파이프라인 1회로
+O(1) 조회합니다. SQL 집계로 다시 채워 외부에서 직접 수정된 데이터와의 오차를 바로잡는
+재집계는 cron 으로 하루에 한 번 실행합니다.
+
+    python -m app.recommend.stats --reseed
+
+cron 이 돌지 않아 reco:stats:seeded 가 만료되면, 요청 경로는 기존 카운터를 그대로 반환하고
+reco:stats:reseeding 잠금(SET NX EX)을 얻은 워커 한 곳만 백그라운드 스레드에서 재집계합니다.
+(최초 배포처럼 카운터가 없으면 재집계가 끝날 때까지 0으로 보고 Cold Start 추천을 사용)
+"""
+from __future__ import annotations
+from typing import Tuple
+from datetime import date
+import argparse
+import logging
+import threading
+import time
+
+import redis
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import rds
+from .persistence import pending_quest_ids, upsert_recommendations
+
+logger = logging.getLogger(__name__)
+
+INTERACTIONS_KEY = "reco:stats:interactions"
+USERS_KEY = "reco:stats:users"
+QUESTS_KEY = "reco:stats:quests"
+SEEDED_KEY = "reco:stats:seeded"
+RESEED_LOCK_KEY = "reco:stats:reseeding"
+
+SEED_TTL_SECONDS = 60 * 60 * 24
+# 요청 경로에서 시작한 재집계 잠금 유지 시간 (재집계가 비정상 종료되어도 이후 풀림)
+RESEED_LOCK_SECONDS = 600
+# 워커 내 메모 (하이브리드 전환 여부는 자주 바뀌지 않음)
+LOCAL_TTL_SECONDS = 30
+
+_local: dict = {"value": None, "at": 0.0}
+_local_lock = threading.Lock()
+
+
+def _count_from_db(db: Session) -> Tuple[int, int, int]:
+    """SQL 집계 (기존 방식, 시드/폴백 용)"""
+    result = db.execute(text("""
+        SELECT COUNT(*) as total,
+               COUNT(DISTINCT user_id) as users,
+               COUNT(DISTINCT quest_id) as quests
+        FROM quest_recommendations
+        WHERE (is_click = 1 OR is_cleared = 1)
+    """)).fetchone()
+    if not result:
+        return 0, 0, 0
+    return int(result.total or 0), int(result.users or 0), int(result.quests or 0)
+
+
+def reseed_stats(db: Session) -> Tuple[int, int, int]:
+    """SQL 집계로 Redis 통계를 다시 채움"""
+    total, _, _ = _count_from_db(db)
+    users = [r.user_id for r in db.execute(text("""
+        SELECT DISTINCT user_id FROM quest_recommendations
+        WHERE (is_click = 1 OR is_cleared = 1)
+    """)).fetchall()]
+    quests = [r.quest_id for r in db.execute(text("""
+        SELECT DISTINCT quest_id FROM quest_recommendations
+        WHERE (is_click = 1 OR is_cleared = 1)
+    """)).fetchall()]
+
+    pipe = rds.pipeline()
+    pipe.delete(USERS_KEY, QUESTS_KEY)
+    pipe.set(INTERACTIONS_KEY, total)
+    for i in range(0, len(users), 1000):
+        pipe.pfadd(USERS_KEY, *users[i:i + 1000])
+    for i in range(0, len(quests), 1000):
+        pipe.pfadd(QUESTS_KEY, *quests[i:i + 1000])
+    pipe.set(SEEDED_KEY, 1, ex=SEED_TTL_SECONDS)
+    pipe.execute()
+
+    with _local_lock:
+        _local["value"] = None
+    return total, len(users), len(quests)
+
+
+def get_interaction_stats(db: Session) -> Tuple[int, int, int]:
+    """(전체 상호작용 수, 활성 사용자 수, 활성 퀘스트 수)"""
+    with _local_lock:
+        if _local["value"] is not None and time.monotonic() - _local["at"] < LOCAL_TTL_SECONDS:
+            return _local["value"]
+
+    try:
+        pipe = rds.pipeline(transaction=False)
+        pipe.exists(SEEDED_KEY)
+        pipe.get(INTERACTIONS_KEY)
+        pipe.pfcount(USERS_KEY)
+        pipe.pfcount(QUESTS_KEY)
+        seeded, total, users, quests = pipe.execute()
+        if not seeded:
+            _reseed_in_background(db)
+        value = (int(total or 0), int(users), int(quests))
+    except redis.RedisError:
+        # Redis 장애 시 SQL 집계로 폴백
+        value = _count_from_db(db)
+
+    with _local_lock:
+        _local["value"] = value
+        _local["at"] = time.monotonic()
+    return value
+
+
+def _reseed_in_background(db: Session) -> bool:
+    """
+    재집계 잠금을 얻은 경우에만 백그라운드 스레드에서 reseed_stats 실행
+    - 요청 세션은 요청이 끝나면 닫히므로 같은 엔진으로 새 세션을 엽니다.
+    """
+    if not rds.set(RESEED_LOCK_KEY, 1, nx=True, ex=RESEED_LOCK_SECONDS):
+        return False
+
+    bind = db.get_bind()
+
+    def run():
+        session = Session(bind=bind)
+        try:
+            reseed_stats(session)
+        except Exception:
+            logger.exception("interaction stats reseed failed")
+        finally:
+            session.close()
+            try:
+                rds.delete(RESEED_LOCK_KEY)
+            except redis.RedisError:
+                pass
+
+    threading.Thread(target=run, name="reco-stats-reseed", daemon=True).start()
+    return True
+
+
+def reset() -> None:
+    """워커 내 통계 메모 비우기 (Redis 카운터는 그대로 유지)"""
+    with _local_lock:
+        _local["value"] = None
+        _local["at"] = 0.0
+
+
+def _latest_recommendation(db: Session, user_id: str, quest_id: str, today: date):
+    """오늘까지의 가장 최근 추천 행 (precompute 가 미리 저장한 내일 행은 제외)"""
+    return db.execute(text("""
+        SELECT id, is_click, is_cleared
+        FROM quest_recommendations
+        WHERE user_id = :user_id
+        AND quest_id = :quest_id
+        AND recommendation_date <= :today
+        ORDER BY recommendation_date DESC
+        LIMIT 1
+    """), {"user_id": user_id, "quest_id": quest_id, "today": today}).fetchone()
+
+
+def record_interaction(db: Session, user_id: str, quest_id: str,
+                       clicked: bool = False, cleared: bool = False) -> bool:
+    """
+    추천된 퀘스트에 대한 클릭/완료 기록 (오늘까지의 가장 최근 추천 행 기준)
+    - 추천 이력이 없으면 False
+    - write-behind 로 아직 저장되지 않은 오늘의 추천이면 행을 먼저 저장 (이후 일괄 저장은 기존 행 유지)
+    - 처음 상호작용이 생긴 행이면 통계 카운터도 함께 갱신
+    """
+    today = date.today()
+    row = _latest_recommendation(db, user_id, quest_id, today)
+    if not row:
+        if quest_id not in pending_quest_ids(user_id, today):
+            return False
+        upsert_recommendations(db, {user_id: [quest_id]}, today)
+        row = _latest_recommendation(db, user_id, quest_id, today)
+        if not row:
+            return False
+
+    was_interacted = bool(row.is_click or row.is_cleared)
+    is_click = bool(row.is_click or clicked)
+    is_cleared = bool(row.is_cleared or cleared)
+    if (is_click, is_cleared) == (bool(row.is_click), bool(row.is_cleared)):
+        return True
+
+    db.execute(text("""
+        UPDATE quest_recommendations
+        SET is_click = :is_click, is_cleared = :is_cleared
+        WHERE id = :id
+    """), {"id": row.id, "is_click": is_click, "is_cleared": is_cleared})
+    db.commit()
+
+    if not was_interacted:
+        try:
+            pipe = rds.pipeline()
+            pipe.incr(INTERACTIONS_KEY)
+            pipe.pfadd(USERS_KEY, user_id)
+            pipe.pfadd(QUESTS_KEY, quest_id)
+            pipe.execute()
+        except redis.RedisError:
+            pass  # 다음 재집계(reseed)에서 보정
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 상호작용 통계")
+    parser.add_argument("--reseed", action="store_true", help="SQL 집계로 Redis 통계 재구축")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.reseed:
+            print(reseed_stats(db))
+        else:
+            print(get_interaction_stats(db))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
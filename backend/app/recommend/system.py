@@ -1,13 +1,323 @@
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Dict, Optional
 import random
 from datetime import datetime, date, timedelta
-import secrets
-import string
 import numpy as np
-from collections import defaultdict
+import os
+import threading
+import time
+from functools import lru_cache
+
+from .matrix import InteractionMatrix, ItemSimilarityModel
+from .neighbors import get_indexed_neighbors, load_user_interactions
+from .cache import get_daily_ids, get_daily_details, set_daily_details
+from .stats import get_interaction_stats
+from .snapshot import MODEL_DIR, get_snapshot
+from .catalog import QuestCatalog, get_catalog
+from .segments import lookup_segment
+from .persistence import new_recommendation_id, save_recommendations, when_saved
+from .executor import run_cpu_bound
+from .metrics import stage, timed
+from . import als
+
+# 상호작용 행렬은 프로세스 단위로 캐시 (요청마다 90일치 데이터를 다시 읽지 않도록)
+MATRIX_TTL_SECONDS = int(os.getenv("RECO_MATRIX_TTL_SECONDS", "300"))
+# 퀘스트×퀘스트 유사도 행렬은 작고 천천히 변하므로 더 길게 상주
+ITEM_MODEL_TTL_SECONDS = int(os.getenv("RECO_ITEM_MODEL_TTL_SECONDS", "3600"))
+# 협업 필터링 방식: "user" (사용자 기반) / "item" (아이템 기반)
+CF_MODE = os.getenv("RECO_CF_MODE", "user")
+# 하이브리드 가중치 (ALS 모델에 사용자가 있으면 3개 점수원을 결합)
+HYBRID_WEIGHTS = {"cf": 0.6, "cbf": 0.4}
+HYBRID_WEIGHTS_WITH_ALS = {"cf": 0.45, "cbf": 0.3, "als": 0.25}
+# 다양성 재정렬: 하이브리드 상위 후보 수와 MMR λ (1이면 점수 순, 0에 가까울수록 다양성 우선)
+DIVERSITY_POOL = int(os.getenv("RECO_DIVERSITY_POOL", "50"))
+MMR_LAMBDA = float(os.getenv("RECO_MMR_LAMBDA", "0.5"))
+
+_resident: Dict[str, tuple] = {}
+# _resident 조회/교체용 (짧게만 잡음). 재구축은 객체별 _build_locks 로 직렬화
+_resident_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+
+
+def _get_resident(name: str, ttl: int, builder):
+    """
+    프로세스 상주 객체 조회 (TTL 경과 시 builder로 재구축)
+    - builder(DB 조회, 프로세스 풀 계산)는 락 밖에서 실행하므로 다른 객체 조회는 기다리지 않습니다.
+    - 같은 객체는 한 스레드만 재구축하며, 그동안 다른 스레드는 만료된 값을 그대로 사용합니다.
+      (값이 아직 없을 때만 재구축이 끝나기를 기다림)
+    """
+    with _resident_lock:
+        entry = _resident.get(name)
+        if entry is not None and time.monotonic() - entry[1] <= ttl:
+            return entry[0]
+        build_lock = _build_locks.setdefault(name, threading.Lock())
+    
+    if not build_lock.acquire(blocking=entry is None):
+        return entry[0]
+    try:
+        with _resident_lock:
+            current = _resident.get(name)
+        if current is not None and time.monotonic() - current[1] <= ttl:
+            return current[0]  # 기다리는 동안 다른 스레드가 재구축함
+        value = builder()
+        with _resident_lock:
+            _resident[name] = (value, time.monotonic())
+        return value
+    finally:
+        build_lock.release()
+
+
+def reset() -> None:
+    """
+    워커에 상주하는 추천 상태 비우기
+    - 상호작용 행렬/아이템 모델과 전역 추천 인스턴스(스냅샷 기반 아이템 모델 포함)를 버립니다.
+    - 다른 모듈의 캐시는 각 모듈의 reset() 으로 비웁니다.
+    """
+    with _resident_lock:
+        _resident.clear()
+    get_recommender.cache_clear()
+
+# 퀘스트 상세 조회 컬럼 (추천 대상 카탈로그와 상세 응답이 같은 형태를 공유)
+QUEST_DETAIL_COLUMNS = """
+    id, type, title, category, verify_method, verify_params,
+    reward_exp, target_count, period_scope, active, lat, lng,
+    quest_link_url, created_at
+"""
+
+
+def _quest_details(result) -> Dict:
+    """quests 조회 결과 행 → 상세 응답 dict"""
+    return {
+        "id": result.id,
+        "type": result.type,
+        "title": result.title,
+        "category": result.category,
+        "verify_method": result.verify_method,
+        "verify_params": result.verify_params,
+        "reward_exp": result.reward_exp,
+        "target_count": result.target_count,
+        "period_scope": result.period_scope,
+        "active": result.active,
+        "lat": float(result.lat) if result.lat else None,
+        "lng": float(result.lng) if result.lng else None,
+        "quest_link_url": result.quest_link_url,
+        "created_at": result.created_at.isoformat() if result.created_at else None
+    }
+
+# 추천 카테고리 (벡터 인덱스 순서)
+CATEGORIES = ["STUDY", "SAVING", "ECON", "LIFE", "HEALTH", "ENT"]
+CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+
+# 설문조사 질문별 매핑 정의
+CATEGORY_MAPPING = {
+    # Q1: 평일 주 활동 패턴
+    "q1_campus": ["STUDY", "ENT"],  # 캠퍼스/강의 위주
+    "q1_certification": ["STUDY"],  # 자격·시험 준비 위주
+    "q1_work": ["ECON", "SAVING"],  # 직장/알바 위주
+    "q1_irregular": ["LIFE", "ENT"],  # 일정이 불규칙/그 외
+    
+    # Q2: 월 고정 수입/용돈 수준
+    "q2_low_income": ["SAVING", "ECON"],  # 낮은 수입 (20만원 이하)
+    "q2_mid_income": ["SAVING", "STUDY"],  # 중간 수입 (21-100만원)
+    "q2_high_income": ["STUDY", "HEALTH"],  # 높은 수입 (100만원 이상)
+    
+    # Q3: 소비 습관
+    "q3_planned": ["SAVING", "ECON"],  # 계획 소비 위주
+    "q3_discount": ["ECON", "LIFE"],  # 할인·쿠폰 활용
+    "q3_minimal": ["SAVING"],  # 필요 위주 최소 지출
+    "q3_spontaneous": ["LIFE", "ENT"],  # 즉흥적/경험 소비
+    "q3_tracking": ["SAVING", "ECON"],  # 지출 기록/가계부
+    
+    # Q4: 여유 시간대
+    "q4_weekday_day": ["STUDY", "HEALTH"],
+    "q4_weekday_evening": ["LIFE", "ENT"],
+    "q4_weekend_day": ["HEALTH", "LIFE"],
+    "q4_weekend_evening": ["ENT", "LIFE"],
+    
+    # Q5: 관심 정보 유형
+    "q5_benefits": ["LIFE", "ECON"],
+    "q5_convenience": ["ECON", "LIFE"],
+    "q5_finance": ["SAVING", "ECON"],
+    "q5_occasional": ["ENT", "LIFE"],
+    
+    # Q6: 목표 달성 방식
+    "q6_routine": ["HEALTH", "SAVING"],
+    "q6_deadline": ["STUDY"],
+    "q6_flexible": ["LIFE", "ENT"],
+    "q6_tracking": ["SAVING", "STUDY"],
+    
+    # Q7: 활동/탐색 취향
+    "q7_local": ["LIFE"],
+    "q7_events": ["ENT"],
+    "q7_travel": ["LIFE"],
+    "q7_health": ["HEALTH"],
+    
+    # Q8: 흥미로운 콘텐츠
+    "q8_challenge": ["STUDY", "HEALTH"],
+    "q8_community": ["ENT", "LIFE"],
+    "q8_fortune": ["ENT"],
+    "q8_insight": ["STUDY", "ECON"],
+    
+    # Q9: 저축 목표
+    "q9_emergency": ["SAVING"],
+    "q9_period_goal": ["SAVING", "STUDY"],
+    "q9_long_term": ["SAVING"],
+    "q9_habit": ["SAVING"],
+    
+    # Q10: 납입 방식
+    "q10_auto": ["SAVING"],
+    "q10_flexible": ["SAVING"],
+    "q10_payday": ["SAVING"],
+    "q10_roundup": ["SAVING"],
+    "q10_adjustable": ["SAVING"],
+    
+    # Q11: 현금 필요 가능성
+    "q11_low": ["SAVING"],
+    "q11_medium": ["SAVING", "ECON"],
+    "q11_high": ["ECON", "LIFE"],
+    
+    # Q12: 알림 선호도
+    "q12_benefits": ["LIFE", "ECON"],
+    "q12_ranking": ["STUDY", "HEALTH"],
+    "q12_coaching": ["SAVING", "ECON"],
+    "q12_minimal": ["LIFE"]
+}
+
+# 퀘스트 카테고리별 우선순위 매핑 (업데이트된 퀘스트 ID - LIFE와 GROWTH만 포함)
+QUEST_CATEGORY_PRIORITY = {
+    "STUDY": ["quest_growth_001", "quest_growth_002", "quest_growth_003", "quest_growth_004", "quest_growth_015", 
+              "quest_daily_035"],
+    "SAVING": ["quest_growth_005", "quest_growth_006", "quest_growth_007", "quest_growth_008", "quest_growth_009", 
+              "quest_growth_010", "quest_growth_011", "quest_growth_012", "quest_growth_013", "quest_growth_014", 
+              "quest_daily_025", "quest_daily_026", "quest_daily_027", "quest_daily_032"],
+    "ECON": ["quest_growth_015", "quest_daily_020", "quest_daily_021", "quest_daily_022", "quest_daily_033", 
+              "quest_daily_034"],
+    "LIFE": ["quest_daily_017", "quest_daily_018", "quest_daily_019", "quest_daily_028", "quest_daily_029", 
+              "quest_daily_030", "quest_daily_031"],
+    "HEALTH": ["quest_daily_023", "quest_daily_024"],
+    "ENT": []  # ENT 카테고리는 현재 LIFE/GROWTH 타입에 없음 (SURPRISE 제외)
+}
+
+# 설문 옵션 번호 → 매핑 키
+OPTION_KEYS = {
+    1: {  # Q1: 평일 주 활동 패턴
+        "1": "campus",
+        "2": "certification", 
+        "3": "work",
+        "4": "irregular"
+    },
+    2: {  # Q2: 월 고정 수입/용돈 수준
+        "1": "low_income", "2": "low_income",  # 없음, 20만원 이하
+        "3": "mid_income", "4": "mid_income",   # 21-50만원, 51-100만원
+        "5": "high_income", "6": "high_income"  # 101-200만원, 200만원 이상
+    },
+    3: {  # Q3: 소비 습관
+        "1": "planned",
+        "2": "discount",
+        "3": "minimal",
+        "4": "spontaneous",
+        "5": "tracking"
+    },
+    4: {  # Q4: 여유 시간대
+        "1": "weekday_day",
+        "2": "weekday_evening",
+        "3": "weekend_day",
+        "4": "weekend_evening"
+    },
+    5: {  # Q5: 관심 정보 유형
+        "1": "benefits",
+        "2": "convenience",
+        "3": "finance",
+        "4": "occasional"
+    },
+    6: {  # Q6: 목표 달성 방식
+        "1": "routine",
+        "2": "deadline",
+        "3": "flexible",
+        "4": "tracking"
+    },
+    7: {  # Q7: 활동/탐색 취향
+        "1": "local",
+        "2": "events",
+        "3": "travel",
+        "4": "health"
+    },
+    8: {  # Q8: 흥미로운 콘텐츠
+        "1": "challenge",
+        "2": "community",
+        "3": "fortune",
+        "4": "insight"
+    },
+    9: {  # Q9: 저축 목표
+        "1": "emergency",
+        "2": "period_goal",
+        "3": "long_term",
+        "4": "habit"
+    },
+    10: {  # Q10: 납입 방식
+        "1": "auto",
+        "2": "flexible",
+        "3": "payday",
+        "4": "roundup",
+        "5": "adjustable"
+    },
+    11: {  # Q11: 현금 필요 가능성
+        "1": "low",
+        "2": "medium",
+        "3": "high"
+    },
+    12: {  # Q12: 알림 선호도
+        "1": "benefits",
+        "2": "ranking",
+        "3": "coaching",
+        "4": "minimal"
+    }
+}
+
+# 설문 답변 1개당 카테고리 가중치
+SURVEY_ANSWER_WEIGHT = 3
+
+
+def _category_vector(weights: Dict[str, int]) -> np.ndarray:
+    vector = np.zeros(len(CATEGORIES), dtype=np.int32)
+    for category, weight in weights.items():
+        vector[CATEGORY_INDEX[category]] += weight
+    return vector
+
+
+def _compile_survey_weights() -> np.ndarray:
+    """
+    설문 매핑을 정수 인덱스 배열로 컴파일
+    - shape: (question_type, option_order_no, category)
+    - 매핑이 없는 (질문, 옵션) 조합은 0 벡터
+    """
+    max_question = max(OPTION_KEYS)
+    max_option = max(int(no) for options in OPTION_KEYS.values() for no in options)
+    weights = np.zeros((max_question + 1, max_option + 1, len(CATEGORIES)), dtype=np.int32)
+    
+    for question_type, options in OPTION_KEYS.items():
+        for option_no, option_key in options.items():
+            for category in CATEGORY_MAPPING.get(f"q{question_type}_{option_key}", []):
+                weights[question_type, int(option_no), CATEGORY_INDEX[category]] += SURVEY_ANSWER_WEIGHT
+    
+    return weights
+
+
+SURVEY_WEIGHTS = _compile_survey_weights()
+
+# 연령대/학년 기반 가중치 벡터
+AGE_WEIGHTS = {
+    "undergraduate": _category_vector({"STUDY": 2, "ENT": 1}),              # 22세 이하: 대학생
+    "graduate": _category_vector({"STUDY": 1, "SAVING": 2, "ECON": 1}),     # 26세 이하: 대학원생/취준생
+}
+GRADE_WEIGHTS = {
+    "lower": _category_vector({"LIFE": 1, "ENT": 1}),                       # 저학년
+    "upper": _category_vector({"STUDY": 1, "SAVING": 1, "ECON": 1}),        # 고학년
+}
+
 
 # 추천 시스템 클래스
 class QuestRecommendationSystem:
@@ -18,95 +328,29 @@ class QuestRecommendationSystem:
     LIFE와 GROWTH 타입의 퀘스트 중에서 개인화된 추천을 제공합니다.
     """
     def __init__(self):
-        # 설문조사 질문별 매핑 정의
-        self.category_mapping = {
-            # Q1: 평일 주 활동 패턴
-            "q1_campus": ["STUDY", "ENT"],  # 캠퍼스/강의 위주
-            "q1_certification": ["STUDY"],  # 자격·시험 준비 위주
-            "q1_work": ["ECON", "SAVING"],  # 직장/알바 위주
-            "q1_irregular": ["LIFE", "ENT"],  # 일정이 불규칙/그 외
-            
-            # Q2: 월 고정 수입/용돈 수준
-            "q2_low_income": ["SAVING", "ECON"],  # 낮은 수입 (20만원 이하)
-            "q2_mid_income": ["SAVING", "STUDY"],  # 중간 수입 (21-100만원)
-            "q2_high_income": ["STUDY", "HEALTH"],  # 높은 수입 (100만원 이상)
-            
-            # Q3: 소비 습관
-            "q3_planned": ["SAVING", "ECON"],  # 계획 소비 위주
-            "q3_discount": ["ECON", "LIFE"],  # 할인·쿠폰 활용
-            "q3_minimal": ["SAVING"],  # 필요 위주 최소 지출
-            "q3_spontaneous": ["LIFE", "ENT"],  # 즉흥적/경험 소비
-            "q3_tracking": ["SAVING", "ECON"],  # 지출 기록/가계부
-            
-            # Q4: 여유 시간대
-            "q4_weekday_day": ["STUDY", "HEALTH"],
-            "q4_weekday_evening": ["LIFE", "ENT"],
-            "q4_weekend_day": ["HEALTH", "LIFE"],
-            "q4_weekend_evening": ["ENT", "LIFE"],
-            
-            # Q5: 관심 정보 유형
-            "q5_benefits": ["LIFE", "ECON"],
-            "q5_convenience": ["ECON", "LIFE"],
-            "q5_finance": ["SAVING", "ECON"],
-            "q5_occasional": ["ENT", "LIFE"],
-            
-            # Q6: 목표 달성 방식
-            "q6_routine": ["HEALTH", "SAVING"],
-            "q6_deadline": ["STUDY"],
-            "q6_flexible": ["LIFE", "ENT"],
-            "q6_tracking": ["SAVING", "STUDY"],
-            
-            # Q7: 활동/탐색 취향
-            "q7_local": ["LIFE"],
-            "q7_events": ["ENT"],
-            "q7_travel": ["LIFE"],
-            "q7_health": ["HEALTH"],
-            
-            # Q8: 흥미로운 콘텐츠
-            "q8_challenge": ["STUDY", "HEALTH"],
-            "q8_community": ["ENT", "LIFE"],
-            "q8_fortune": ["ENT"],
-            "q8_insight": ["STUDY", "ECON"],
-            
-            # Q9: 저축 목표
-            "q9_emergency": ["SAVING"],
-            "q9_period_goal": ["SAVING", "STUDY"],
-            "q9_long_term": ["SAVING"],
-            "q9_habit": ["SAVING"],
-            
-            # Q10: 납입 방식
-            "q10_auto": ["SAVING"],
-            "q10_flexible": ["SAVING"],
-            "q10_payday": ["SAVING"],
-            "q10_roundup": ["SAVING"],
-            "q10_adjustable": ["SAVING"],
-            
-            # Q11: 현금 필요 가능성
-            "q11_low": ["SAVING"],
-            "q11_medium": ["SAVING", "ECON"],
-            "q11_high": ["ECON", "LIFE"],
-            
-            # Q12: 알림 선호도
-            "q12_benefits": ["LIFE", "ECON"],
-            "q12_ranking": ["STUDY", "HEALTH"],
-            "q12_coaching": ["SAVING", "ECON"],
-            "q12_minimal": ["LIFE"]
-        }
+        # 설문조사 질문별 매핑 정의 (모듈 상수 공유)
+        self.category_mapping = CATEGORY_MAPPING
         
-        # 퀘스트 카테고리별 우선순위 매핑 (업데이트된 퀘스트 ID - LIFE와 GROWTH만 포함)
-        self.quest_category_priority = {
-            "STUDY": ["quest_growth_001", "quest_growth_002", "quest_growth_003", "quest_growth_004", "quest_growth_015", 
-                      "quest_daily_035"],
-            "SAVING": ["quest_growth_005", "quest_growth_006", "quest_growth_007", "quest_growth_008", "quest_growth_009", 
-                      "quest_growth_010", "quest_growth_011", "quest_growth_012", "quest_growth_013", "quest_growth_014", 
-                      "quest_daily_025", "quest_daily_026", "quest_daily_027", "quest_daily_032"],
-            "ECON": ["quest_growth_015", "quest_daily_020", "quest_daily_021", "quest_daily_022", "quest_daily_033", 
-                      "quest_daily_034"],
-            "LIFE": ["quest_daily_017", "quest_daily_018", "quest_daily_019", "quest_daily_028", "quest_daily_029", 
-                      "quest_daily_030", "quest_daily_031"],
-            "HEALTH": ["quest_daily_023", "quest_daily_024"],
-            "ENT": []  # ENT 카테고리는 현재 LIFE/GROWTH 타입에 없음 (SURPRISE 제외)
-        }
+        # 퀘스트 카테고리별 우선순위 매핑
+        self.quest_category_priority = QUEST_CATEGORY_PRIORITY
+        
+        # 하이브리드 추천의 협업 필터링 방식 ("user" / "item")
+        self.cf_mode = CF_MODE
+        
+        # 하이브리드 결합 가중치와 유사 사용자 선택 기준 (evaluate.py 로 조정)
+        self.hybrid_weights = dict(HYBRID_WEIGHTS)
+        self.hybrid_weights_with_als = dict(HYBRID_WEIGHTS_WITH_ALS)
+        self.neighbor_k = 10
+        self.min_similarity = 0.1
+        self.diversity_pool = DIVERSITY_POOL
+        self.mmr_lambda = MMR_LAMBDA
+        
+        # 학습된 모델 스냅샷 디렉터리
+        self.model_dir = MODEL_DIR
+        
+        # 스냅샷에서 구성한 아이템 유사도 모델 (스냅샷 버전이 바뀌면 재구성)
+        self._item_model = None
+        self._item_model_version = None
 
     def get_user_info(self, db: Session, user_id: str) -> Dict:
         """사용자 정보 조회"""
@@ -150,9 +394,8 @@ class QuestRecommendationSystem:
 
     def get_available_quests(self, db: Session) -> List[Dict]:
         """LIFE, GROWTH 타입 퀘스트만 조회 (SURPRISE 제외, quest_daily_016 제외)"""
-        query = text("""
-            SELECT id, type, title, category, verify_method, reward_exp, 
-                   target_count, period_scope
+        query = text(f"""
+            SELECT {QUEST_DETAIL_COLUMNS}
             FROM quests 
             WHERE type IN ('LIFE', 'GROWTH') 
             AND active = TRUE
@@ -160,144 +403,128 @@ class QuestRecommendationSystem:
         """)
         results = db.execute(query).fetchall()
         
-        return [
-            {
-                "id": result.id,
-                "type": result.type,
-                "title": result.title,
-                "category": result.category,
-                "verify_method": result.verify_method,
-                "reward_exp": result.reward_exp,
-                "target_count": result.target_count,
-                "period_scope": result.period_scope
-            }
-            for result in results
-        ]
+        return [_quest_details(result) for result in results]
 
     def analyze_user_preferences(self, user_info: Dict, survey_answers: List[Dict]) -> Dict[str, int]:
-        """사용자 선호도 분석"""
-        category_scores = {
-            "STUDY": 0,
-            "SAVING": 0,
-            "ECON": 0,
-            "LIFE": 0,
-            "HEALTH": 0,
-            "ENT": 0
-        }
+        """사용자 선호도 분석 (컴파일된 가중치 배열의 벡터 합)"""
+        scores = self._preference_vector(user_info, survey_answers)
+        return {category: int(scores[i]) for i, category in enumerate(CATEGORIES)}
+
+    def _preference_vector(self, user_info: Dict, survey_answers: List[Dict]) -> np.ndarray:
+        """카테고리 순서(CATEGORIES)의 선호도 점수 벡터"""
+        scores = np.zeros(len(CATEGORIES), dtype=np.int32)
         
         # 연령대 기반 선호도
         if user_info["birth_year"]:
             age = datetime.now().year - user_info["birth_year"]
             if age <= 22:  # 대학생
-                category_scores["STUDY"] += 2
-                category_scores["ENT"] += 1
+                scores += AGE_WEIGHTS["undergraduate"]
             elif age <= 26:  # 대학원생/취준생
-                category_scores["STUDY"] += 1
-                category_scores["SAVING"] += 2
-                category_scores["ECON"] += 1
+                scores += AGE_WEIGHTS["graduate"]
         
         # 학년 기반 선호도
         if user_info["grade"]:
-            if user_info["grade"] <= 2:  # 저학년
-                category_scores["LIFE"] += 1
-                category_scores["ENT"] += 1
-            else:  # 고학년
-                category_scores["STUDY"] += 1
-                category_scores["SAVING"] += 1
-                category_scores["ECON"] += 1
-
-        # 설문조사 답변 기반 분석
-        for answer in survey_answers:
-            question_type = answer["question_type"]
-            option_order_no = answer["option_order_no"]
-            
-            # 질문별 매핑 적용
-            mapping_key = f"q{question_type}_{self._get_option_key(question_type, option_order_no)}"
-            
-            if mapping_key in self.category_mapping:
-                for category in self.category_mapping[mapping_key]:
-                    category_scores[category] += 3  # 설문 답변은 높은 가중치
+            scores += GRADE_WEIGHTS["lower"] if user_info["grade"] <= 2 else GRADE_WEIGHTS["upper"]
+        
+        # 설문조사 답변 기반 분석 (질문 × 옵션 인덱스로 가중치 조회)
+        n_questions, n_options, _ = SURVEY_WEIGHTS.shape
+        questions = [a["question_type"] for a in survey_answers]
+        options = [a["option_order_no"] for a in survey_answers]
+        valid = [
+            (q, o) for q, o in zip(questions, options)
+            if q is not None and o is not None and 0 <= q < n_questions and 0 <= o < n_options
+        ]
+        if valid:
+            q_idx, o_idx = zip(*valid)
+            scores += SURVEY_WEIGHTS[list(q_idx), list(o_idx)].sum(axis=0)
+        
+        return scores
+
+    def _preference_matrix(self, user_infos: List[Dict], survey_answers: List[List[Dict]]) -> np.ndarray:
+        """
+        N명의 사용자 선호도 점수 행렬 (N × 카테고리)
+        - 연령대/학년/설문 (질문, 옵션)을 one-hot 인코딩한 뒤 카테고리 가중치 행렬을 곱합니다.
+        """
+        n_questions, n_options, n_categories = SURVEY_WEIGHTS.shape
+        n_users = len(user_infos)
+        
+        # 특성 순서: [대학생, 대학원생/취준생, 저학년, 고학년, (질문, 옵션) 셀...]
+        weights = np.vstack([
+            AGE_WEIGHTS["undergraduate"], AGE_WEIGHTS["graduate"],
+            GRADE_WEIGHTS["lower"], GRADE_WEIGHTS["upper"],
+            SURVEY_WEIGHTS.reshape(-1, n_categories),
+        ]).astype(np.float32)
+        features = np.zeros((n_users, weights.shape[0]), dtype=np.float32)
+        
+        current_year = datetime.now().year
+        rows, cols = [], []
+        for i, (user_info, answers) in enumerate(zip(user_infos, survey_answers)):
+            if user_info["birth_year"]:
+                age = current_year - user_info["birth_year"]
+                if age <= 22:
+                    rows.append(i); cols.append(0)
+                elif age <= 26:
+                    rows.append(i); cols.append(1)
+            if user_info["grade"]:
+                rows.append(i); cols.append(2 if user_info["grade"] <= 2 else 3)
+            for answer in answers:
+                q, o = answer["question_type"], answer["option_order_no"]
+                if q is not None and o is not None and 0 <= q < n_questions and 0 <= o < n_options:
+                    rows.append(i); cols.append(4 + q * n_options + o)
+        
+        np.add.at(features, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+        return features @ weights
 
-        return category_scores
+    def score_cohort(self, user_infos: List[Dict], survey_answers: List[List[Dict]],
+                     quests: List[Dict], k: int = 3, diverse: bool = True) -> List[List[str]]:
+        """
+        여러 사용자의 Cold Start 추천을 한 번에 계산 (사용자별 상위 k개 퀘스트 ID)
+        
+        - analyze_user_preferences + score_quests + _select_diverse_quests 와 같은 결과를
+          (N × 카테고리) · (카테고리 × 퀘스트) 행렬 곱과 정렬 1회로 계산합니다.
+        - 퀘스트 카탈로그나 설문 매핑이 바뀌었을 때 전체 사용자 재계산에 사용합니다.
+        """
+        if not user_infos or not quests:
+            return [[] for _ in user_infos]
+        
+        return self.rank_preferences(self._preference_matrix(user_infos, survey_answers), quests, k, diverse)
+
+    def rank_preferences(self, preferences: np.ndarray, quests: List[Dict], k: int = 3,
+                         diverse: bool = True) -> List[List[str]]:
+        """
+        선호도 점수 행렬(N × 카테고리)의 행별 상위 k개 퀘스트 ID
+        - score_cohort 와 설문 세그먼트(segments.py) 사전 계산이 공유합니다.
+        """
+        if len(preferences) == 0 or not quests:
+            return [[] for _ in range(len(preferences))]
+        
+        # 카테고리 × 퀘스트 one-hot 행렬
+        n_quests = len(quests)
+        quest_categories = np.array([CATEGORY_INDEX.get(q["category"], -1) for q in quests])
+        category_quest = np.zeros((len(CATEGORIES), n_quests), dtype=np.float32)
+        known = quest_categories >= 0
+        category_quest[quest_categories[known], np.flatnonzero(known)] = 1.0
+        
+        scores = np.asarray(preferences, dtype=np.float32) @ category_quest  # N × Q
+        
+        if diverse:
+            # 카테고리별 첫 퀘스트(카탈로그 순)를 우선 그룹으로, 나머지는 점수 순으로 채움
+            first_of_category = np.zeros(n_quests, dtype=bool)
+            _, first_idx = np.unique(quest_categories, return_index=True)
+            first_of_category[first_idx] = True
+            offset = np.where(first_of_category, 0.0, scores.max() + 1.0)
+            keys = offset[None, :] - scores
+        else:
+            keys = -scores
+        
+        # 안정 정렬: 동점은 카탈로그 순서 유지 (score_quests의 sorted()와 동일)
+        order = np.argsort(keys, axis=1, kind="stable")[:, :k]
+        quest_ids = [q["id"] for q in quests]
+        return [[quest_ids[j] for j in row] for row in order]
 
     def _get_option_key(self, question_type: int, option_order_no: int) -> str:
         """설문 옵션을 키로 변환"""
-        option_mapping = {
-            1: {  # Q1: 평일 주 활동 패턴
-                "1": "campus",
-                "2": "certification", 
-                "3": "work",
-                "4": "irregular"
-            },
-            2: {  # Q2: 월 고정 수입/용돈 수준
-                "1": "low_income", "2": "low_income",  # 없음, 20만원 이하
-                "3": "mid_income", "4": "mid_income",   # 21-50만원, 51-100만원
-                "5": "high_income", "6": "high_income"  # 101-200만원, 200만원 이상
-            },
-            3: {  # Q3: 소비 습관
-                "1": "planned",
-                "2": "discount",
-                "3": "minimal",
-                "4": "spontaneous",
-                "5": "tracking"
-            },
-            4: {  # Q4: 여유 시간대
-                "1": "weekday_day",
-                "2": "weekday_evening",
-                "3": "weekend_day",
-                "4": "weekend_evening"
-            },
-            5: {  # Q5: 관심 정보 유형
-                "1": "benefits",
-                "2": "convenience",
-                "3": "finance",
-                "4": "occasional"
-            },
-            6: {  # Q6: 목표 달성 방식
-                "1": "routine",
-                "2": "deadline",
-                "3": "flexible",
-                "4": "tracking"
-            },
-            7: {  # Q7: 활동/탐색 취향
-                "1": "local",
-                "2": "events",
-                "3": "travel",
-                "4": "health"
-            },
-            8: {  # Q8: 흥미로운 콘텐츠
-                "1": "challenge",
-                "2": "community",
-                "3": "fortune",
-                "4": "insight"
-            },
-            9: {  # Q9: 저축 목표
-                "1": "emergency",
-                "2": "period_goal",
-                "3": "long_term",
-                "4": "habit"
-            },
-            10: {  # Q10: 납입 방식
-                "1": "auto",
-                "2": "flexible",
-                "3": "payday",
-                "4": "roundup",
-                "5": "adjustable"
-            },
-            11: {  # Q11: 현금 필요 가능성
-                "1": "low",
-                "2": "medium",
-                "3": "high"
-            },
-            12: {  # Q12: 알림 선호도
-                "1": "benefits",
-                "2": "ranking",
-                "3": "coaching",
-                "4": "minimal"
-            }
-        }
-        
-        return option_mapping.get(question_type, {}).get(str(option_order_no), "default")
+        return OPTION_KEYS.get(question_type, {}).get(str(option_order_no), "default")
 
     def score_quests(self, quests: List[Dict], category_scores: Dict[str, int]) -> List[Dict]:
         """퀘스트 점수 계산"""
@@ -320,155 +547,137 @@ class QuestRecommendationSystem:
 
     def _generate_ulid_like_id(self) -> str:
         """ULID 형식의 ID 생성 (26자리)"""
-        # 실제 ULID는 시간 기반이지만, 여기서는 랜덤 문자열로 생성
-        # 형식: 01HJQXXX... (26자리)
-        prefix = "01HJQ"  # 고정 prefix
-        remaining_length = 26 - len(prefix)
-        random_part = ''.join(secrets.choice(string.ascii_uppercase + string.ascii_lowercase + string.digits) 
-                            for _ in range(remaining_length))
-        return prefix + random_part
+        return new_recommendation_id()
 
+    @timed("save")
     def _save_recommendations_to_db(self, db: Session, user_id: str, quest_ids: List[str]) -> None:
-        """추천된 퀘스트를 quest_recommendations 테이블에 저장"""
-        try:
-            today = date.today()
-            
-            for quest_id in quest_ids:
-                # 이미 같은 날짜에 같은 퀘스트가 추천되었는지 확인
-                check_query = text("""
-                    SELECT id FROM quest_recommendations 
-                    WHERE user_id = :user_id 
-                    AND quest_id = :quest_id 
-                    AND recommendation_date = :recommendation_date
-                """)
-                
-                existing = db.execute(check_query, {
-                    "user_id": user_id,
-                    "quest_id": quest_id,
-                    "recommendation_date": today
-                }).fetchone()
-                
-                # 이미 존재하지 않는 경우에만 삽입
-                if not existing:
-                    insert_query = text("""
-                        INSERT INTO quest_recommendations 
-                        (id, user_id, quest_id, recommendation_date, is_click, is_cleared)
-                        VALUES (:id, :user_id, :quest_id, :recommendation_date, :is_click, :is_cleared)
-                    """)
-                    
-                    db.execute(insert_query, {
-                        "id": self._generate_ulid_like_id(),
-                        "user_id": user_id,
-                        "quest_id": quest_id,
-                        "recommendation_date": today,
-                        "is_click": False,  # TINYINT(1)에서 False = 0
-                        "is_cleared": False  # TINYINT(1)에서 False = 0
-                    })
-            
-            db.commit()
-            
-        except Exception as e:
-            db.rollback()
-            raise
+        """
+        추천된 퀘스트를 quest_recommendations 테이블에 저장
+        - (user_id, quest_id, recommendation_date) 유니크 키 기준 multi-row upsert 1회
+        - RECO_WRITE_BEHIND=1 이면 백그라운드 스레드가 모아서 저장
+        """
+        save_recommendations(db, user_id, quest_ids, date.today())
 
     def recommend_quests_with_full_details(self, db: Session, user_id: str) -> List[Dict]:
         """추천 퀸스트의 전체 정보를 반환하는 메인 추천 함수"""
+        # 같은 날 재요청은 일자별 캐시(워커 LRU → Redis)에서 바로 반환
+        today = date.today()
+        cached = get_daily_details(user_id, today)
+        if cached is not None:
+            return cached
+        
         try:
             # 추천 시스템을 통해 quest ID 얻기
             quest_ids = self.recommend_quests(db, user_id)
             
             # 추천된 퀸스트의 전체 정보 조회
-            return self._get_quests_full_details(db, quest_ids)
+            quests = self._get_quests_full_details(db, quest_ids)
             
         except Exception as e:
-            # 오류 발생 시 기본 추천
+            # 오류 발생 시 기본 추천 (캐시하지 않음)
             default_ids = self._get_default_recommendations(db)
             return self._get_quests_full_details(db, default_ids)
+        
+        if quests:
+            # write-behind 모드에서는 추천 행이 저장된 뒤에 캐시 (저장 실패 시 다음 요청에서 다시 계산·저장)
+            when_saved(user_id, today, lambda: set_daily_details(user_id, today, quests))
+        return quests
     
+    @timed("hydrate")
     def _get_quests_full_details(self, db: Session, quest_ids: List[str]) -> List[Dict]:
-        """퀸스트 ID 목록을 받아 전체 정보를 조회"""
+        """
+        퀸스트 ID 목록을 받아 전체 정보를 조회 (입력 순서 유지)
+        - 추천 대상 퀘스트는 워커에 상주하는 카탈로그에서 바로 채우고,
+          카탈로그에 없는 ID만 IN 쿼리 1회로 조회합니다.
+        """
         if not quest_ids:
             return []
         
-        # IN 절에 사용할 placeholder 생성
-        placeholders = ",".join(f"'{qid}'" for qid in quest_ids)
+        catalog = self._get_catalog(db)
+        found = {qid: catalog.get(qid) for qid in dict.fromkeys(quest_ids)}
+        
+        missing = [qid for qid, quest in found.items() if quest is None]
+        if missing:
+            query = text(f"""
+                SELECT {QUEST_DETAIL_COLUMNS}
+                FROM quests 
+                WHERE id IN :quest_ids
+                AND active = TRUE
+                AND id != 'quest_daily_016'
+            """).bindparams(bindparam("quest_ids", expanding=True))
+            for result in db.execute(query, {"quest_ids": missing}).fetchall():
+                found[result.id] = _quest_details(result)
+        
+        return [dict(quest) for quest in found.values() if quest is not None]
+
+    def compute_recommendations(self, db: Session, user_id: str,
+                                is_data_sufficient: Optional[bool] = None,
+                                user_info: Optional[Dict] = None,
+                                survey_answers: Optional[List[Dict]] = None,
+                                available_quests: Optional[List[Dict]] = None) -> List[str]:
+        """
+        추천 퀘스트 ID 계산 (DB 저장 없음)
+        
+        - 배치 작업에서는 미리 조회한 입력(데이터 충분성, 사용자 정보, 설문, 퀘스트 목록)을
+          넘겨 사용자별 조회를 생략합니다.
+        """
+        # 충분한 데이터가 있는지 종합적으로 체크
+        if is_data_sufficient is None:
+            is_data_sufficient, _ = self._check_data_sufficiency(db)
+        
+        if is_data_sufficient:  # 모든 조건 충족 시
+            # 하이브리드 추천 사용 (CF + CBF)
+            quest_ids = self._hybrid_recommendation(db, user_id)
+            
+            if quest_ids and len(quest_ids) >= 3:
+                return quest_ids[:3]
         
-        query = text(f"""
-            SELECT id, type, title, category, verify_method, verify_params,
-                   reward_exp, target_count, period_scope, active, lat, lng,
-                   quest_link_url, created_at
-            FROM quests 
-            WHERE id IN ({placeholders}) 
-            AND active = TRUE
-            AND id != 'quest_daily_016'
-            ORDER BY FIELD(id, {placeholders})
-        """)
+        # 1. 사용자 정보 조회 (Cold Start 추천)
+        if user_info is None:
+            user_info = self.get_user_info(db, user_id)
         
-        results = db.execute(query).fetchall()
+        # 2. 설문조사 답변 조회
+        if survey_answers is None:
+            survey_answers = self.get_survey_answers(db, user_id)
         
-        return [
-            {
-                "id": result.id,
-                "type": result.type,
-                "title": result.title,
-                "category": result.category,
-                "verify_method": result.verify_method,
-                "verify_params": result.verify_params,
-                "reward_exp": result.reward_exp,
-                "target_count": result.target_count,
-                "period_scope": result.period_scope,
-                "active": result.active,
-                "lat": float(result.lat) if result.lat else None,
-                "lng": float(result.lng) if result.lng else None,
-                "quest_link_url": result.quest_link_url,
-                "created_at": result.created_at.isoformat() if result.created_at else None
-            }
-            for result in results
-        ]
+        if not survey_answers:
+            # 설문조사 답변이 없는 경우 기본 추천
+            return self._get_default_recommendations(db)
+        
+        # 3. 설문 세그먼트별로 미리 계산된 추천이 있으면 사용 (카탈로그 크기와 무관)
+        if available_quests is None:
+            with stage("segment_lookup"):
+                preferences = self._preference_vector(user_info, survey_answers)
+                ranked = lookup_segment(preferences, self._get_catalog(db).version)
+            if ranked:
+                return ranked[:3]
+        
+        # 4. 사용 가능한 퀘스트 조회
+        if available_quests is None:
+            available_quests = self.get_available_quests(db)
+        
+        with stage("cold_start"):
+            # 5. 사용자 선호도 분석
+            category_scores = self.analyze_user_preferences(user_info, survey_answers)
+            
+            # 6. 퀘스트 점수 계산 및 정렬
+            scored_quests = self.score_quests(available_quests, category_scores)
+            
+            # 7. 다양성을 위한 최종 선택 (카테고리별로 분산)
+            recommended_quests = self._select_diverse_quests(scored_quests, 3)
+        
+        return [quest["id"] for quest in recommended_quests]
 
     def recommend_quests(self, db: Session, user_id: str) -> List[str]:
         """메인 추천 함수 - 3개의 퀘스트 ID 반환 및 DB 저장"""
         try:
-            # 충분한 데이터가 있는지 종합적으로 체크
-            is_data_sufficient, data_stats = self._check_data_sufficiency(db)
-            
-
+            # 배치(precompute)로 미리 계산·저장된 오늘의 추천이 있으면 그대로 사용
+            with stage("daily_cache"):
+                precomputed = get_daily_ids(user_id, date.today())
+            if precomputed:
+                return precomputed
             
-            if is_data_sufficient:  # 모든 조건 충족 시
-                # 하이브리드 추천 사용 (CF + CBF)
-                quest_ids = self._hybrid_recommendation(db, user_id)
-                
-                if quest_ids and len(quest_ids) >= 3:
-                    # DB에 추천 기록 저장
-                    self._save_recommendations_to_db(db, user_id, quest_ids[:3])
-                    return quest_ids[:3]
-           
-            # 1. 사용자 정보 조회 (Cold Start 추천)
-            user_info = self.get_user_info(db, user_id)
-            
-            # 2. 설문조사 답변 조회
-            survey_answers = self.get_survey_answers(db, user_id)
-            
-            if not survey_answers:
-                # 설문조사 답변이 없는 경우 기본 추천
-                quest_ids = self._get_default_recommendations(db)
-                # DB에 추천 기록 저장
-                self._save_recommendations_to_db(db, user_id, quest_ids)
-                return quest_ids
-            else:
-                # 3. 사용 가능한 퀘스트 조회
-                available_quests = self.get_available_quests(db)
-                
-                # 4. 사용자 선호도 분석
-                category_scores = self.analyze_user_preferences(user_info, survey_answers)
-                
-                # 5. 퀘스트 점수 계산 및 정렬
-                scored_quests = self.score_quests(available_quests, category_scores)
-                
-                # 6. 다양성을 위한 최종 선택 (카테고리별로 분산)
-                recommended_quests = self._select_diverse_quests(scored_quests, 3)
-                
-                quest_ids = [quest["id"] for quest in recommended_quests]
+            quest_ids = self.compute_recommendations(db, user_id)
             
             # 7. DB에 추천 기록 저장
             self._save_recommendations_to_db(db, user_id, quest_ids)
@@ -486,8 +695,9 @@ class QuestRecommendationSystem:
             return default_ids
 
     def _select_diverse_quests(self, scored_quests: List[Dict], count: int) -> List[Dict]:
-        """다양한 카테고리에서 퀘스트 선택"""
+        """다양한 카테고리에서 퀘스트 선택 (score_cohort 의 diverse 선택과 같은 규칙)"""
         selected = []
+        selected_ids = set()
         used_categories = set()
         
         # 1차: 각기 다른 카테고리에서 선택
@@ -497,6 +707,7 @@ class QuestRecommendationSystem:
             
             if quest["category"] not in used_categories:
                 selected.append(quest)
+                selected_ids.add(quest["id"])
                 used_categories.add(quest["category"])
         
         # 2차: 부족한 경우 점수 순으로 추가
@@ -504,45 +715,20 @@ class QuestRecommendationSystem:
             if len(selected) >= count:
                 break
             
-            if quest not in selected:
+            if quest["id"] not in selected_ids:
                 selected.append(quest)
+                selected_ids.add(quest["id"])
         
-        return selected[:count]
+        return selected
 
     # ==================== 하이브리드 추천 시스템 메소드들 ====================
    
-    def _get_total_interactions(self, db: Session) -> int:
-        """전체 상호작용 데이터 개수 조회"""
-        query = text("""
-            SELECT COUNT(*) as count
-            FROM quest_recommendations
-            WHERE (is_click = 1 OR is_cleared = 1)
-        """)
-        result = db.execute(query).fetchone()
-        return result.count if result else 0
-    
+    @timed("sufficiency")
     def _check_data_sufficiency(self, db: Session) -> tuple[bool, dict]:
         """하이브리드 추천을 위한 데이터 충분성 체크"""
-        # 1. 전체 상호작용 수
-        total_interactions = self._get_total_interactions(db)
-        
-        # 2. 활성 사용자 수 (상호작용 1개 이상)
-        active_users_query = text("""
-            SELECT COUNT(DISTINCT user_id) as count
-            FROM quest_recommendations
-            WHERE (is_click = 1 OR is_cleared = 1)
-        """)
-        active_users_result = db.execute(active_users_query).fetchone()
-        active_users = active_users_result.count if active_users_result else 0
-        
-        # 3. 활성 퀘스트 수 (상호작용 1개 이상)
-        active_quests_query = text("""
-            SELECT COUNT(DISTINCT quest_id) as count
-            FROM quest_recommendations
-            WHERE (is_click = 1 OR is_cleared = 1)
-        """)
-        active_quests_result = db.execute(active_quests_query).fetchone()
-        active_quests = active_quests_result.count if active_quests_result else 0
+        # 1~3. 전체 상호작용 수 / 활성 사용자 수 / 활성 퀘스트 수
+        #      (상호작용 기록 시 갱신되는 Redis 카운터·HyperLogLog를 O(1) 조회)
+        total_interactions, active_users, active_quests = get_interaction_stats(db)
         
         # 4. 사용자당 평균 상호작용 수
         avg_interactions = total_interactions / active_users if active_users > 0 else 0
@@ -574,30 +760,41 @@ class QuestRecommendationSystem:
         
         return is_sufficient, stats
     
+    @timed("hybrid")
     def _hybrid_recommendation(self, db: Session, user_id: str) -> List[str]:
         """하이브리드 추천 (협업 필터링 + 콘텐츠 기반 필터링)"""
         try:
-            # 1. 협업 필터링 점수 계산
-            cf_scores = self._collaborative_filtering(db, user_id)
+            # 1. 협업 필터링 점수 계산 (사용자 기반 / 아이템 기반)
+            if self.cf_mode == "item":
+                cf_scores = self._item_based_filtering(db, user_id)
+            else:
+                cf_scores = self._collaborative_filtering(db, user_id)
             
             # 2. 콘텐츠 기반 필터링 점수 계산
             cbf_scores = self._content_based_filtering(db, user_id)
             
-            # 3. 점수 결합 (가중치: CF 60%, CBF 40%)
+            # 3. 행렬 분해(ALS) 점수 계산 (모델에 없는 사용자는 빈 결과)
+            als_scores = self._als_scores(user_id)
+            
+            # 4. 점수 결합 (가중치: CF 60%, CBF 40% / ALS 사용 시 CF 45%, CBF 30%, ALS 25%)
+            weights = self.hybrid_weights_with_als if als_scores else self.hybrid_weights
             hybrid_scores = {}
-            all_quest_ids = set(cf_scores.keys()) | set(cbf_scores.keys())
+            all_quest_ids = set(cf_scores.keys()) | set(cbf_scores.keys()) | set(als_scores.keys())
             
             for quest_id in all_quest_ids:
                 cf_score = cf_scores.get(quest_id, 0)
                 cbf_score = cbf_scores.get(quest_id, 0)
+                als_score = als_scores.get(quest_id, 0)
                 
                 # 정규화된 점수 결합
-                hybrid_scores[quest_id] = 0.6 * cf_score + 0.4 * cbf_score
+                hybrid_scores[quest_id] = (weights["cf"] * cf_score
+                                           + weights["cbf"] * cbf_score
+                                           + weights.get("als", 0) * als_score)
             
-            # 4. 이미 완료했거나 최근 추천된 퀘스트 제외
+            # 5. 이미 완료했거나 최근 추천된 퀘스트 제외
             excluded_quests = self._get_excluded_quests(db, user_id)
             
-            # 5. 최종 추천 퀘스트 선택
+            # 6. 최종 추천 퀘스트 선택
             sorted_quests = sorted(
                 [(qid, score) for qid, score in hybrid_scores.items() 
                  if qid not in excluded_quests],
@@ -605,128 +802,156 @@ class QuestRecommendationSystem:
                 reverse=True
             )
             
-            # 상위 5개 중에서 다양성을 고려하여 3개 선택
-            return self._apply_diversity(db, [qid for qid, _ in sorted_quests[:5]])[:3]
+            # 상위 후보 중에서 다양성을 고려하여 3개 선택
+            return self._apply_diversity(db, sorted_quests[:self.diversity_pool])
             
         except Exception as e:
             # 오류 발생시 콜드 스타트 추천으로 폴백
             return []
     
+    @timed("cf_user")
     def _collaborative_filtering(self, db: Session, user_id: str) -> Dict[str, float]:
         """협업 필터링 - 유사한 사용자들의 선호도 기반 추천"""
-        # 1. 사용자-퀘스트 상호작용 매트릭스 생성
-        interaction_matrix = self._build_interaction_matrix(db)
+        # 1. 사전 계산된 유사 사용자 인덱스 우선 사용 (이웃 상호작용은 IN 쿼리 1회)
+        similar_users = self._get_indexed_neighbors(db, user_id)
         
-        # 2. 현재 사용자와 유사한 사용자 찾기
-        similar_users = self._find_similar_users(db, user_id, interaction_matrix)
+        if similar_users is not None:
+            interaction_matrix = InteractionMatrix.from_rows(
+                load_user_interactions(db, [uid for uid, _ in similar_users])
+            )
+        else:
+            # 2. 인덱스에 없는 사용자는 상호작용 매트릭스에서 실시간 계산
+            interaction_matrix = self._get_interaction_matrix(db)
+            similar_users = self._find_similar_users(db, user_id, interaction_matrix)
         
         # 3. 유사한 사용자들이 완료한/클릭한 퀘스트 점수 계산
-        cf_scores = defaultdict(float)
-        
-        for similar_user_id, similarity in similar_users:
-            # 유사한 사용자의 퀘스트 상호작용 조회
-            query = text("""
-                SELECT quest_id, 
-                       is_click * 0.3 + is_cleared * 0.7 as interaction_score
-                FROM quest_recommendations
-                WHERE user_id = :user_id
-                AND (is_click = 1 OR is_cleared = 1)
-            """)
-            
-            results = db.execute(query, {"user_id": similar_user_id}).fetchall()
-            
-            for result in results:
-                # 유사도 * 상호작용 점수로 가중치 적용
-                cf_scores[result.quest_id] += similarity * result.interaction_score
+        #    (유사도 * 상호작용 점수, 이미 구축한 매트릭스에서 메모리 내 집계)
+        scores = interaction_matrix.aggregate(similar_users)
         
         # 점수 정규화 (0-1 범위)
-        if cf_scores:
-            max_score = max(cf_scores.values())
-            if max_score > 0:
-                cf_scores = {qid: score/max_score for qid, score in cf_scores.items()}
+        max_score = scores.max() if len(scores) else 0.0
+        if max_score <= 0:
+            return {}
         
-        return dict(cf_scores)
+        return {
+            interaction_matrix.quest_ids[j]: float(scores[j] / max_score)
+            for j in np.flatnonzero(scores)
+        }
     
+    @timed("cf_item")
+    def _item_based_filtering(self, db: Session, user_id: str) -> Dict[str, float]:
+        """아이템 기반 협업 필터링 - 사용자가 반응한 퀘스트와 함께 클리어된 퀘스트 추천"""
+        # 1. 현재 사용자의 상호작용 (최근 90일)
+        interactions = {
+            quest_id: score for _, quest_id, score in load_user_interactions(db, [user_id])
+        }
+        if not interactions:
+            return {}
+        
+        # 2. 사용자 벡터 × 퀘스트 유사도 행렬
+        item_model = self._get_item_model(db)
+        scores = item_model.score(interactions)
+        
+        # 점수 정규화 (0-1 범위)
+        max_score = scores.max() if len(scores) else 0.0
+        if max_score <= 0:
+            return {}
+        
+        return {
+            item_model.quest_ids[j]: float(scores[j] / max_score)
+            for j in np.flatnonzero(scores)
+        }
+    
+    @timed("als")
+    def _als_scores(self, user_id: str) -> Dict[str, float]:
+        """ALS 잠재 벡터 내적 점수 (모델 파일이 없거나 학습에 없던 사용자는 빈 결과)"""
+        model = als.get_model(self.model_dir)
+        if model is None:
+            return {}
+        scores = model.score(user_id)
+        if scores is None:
+            return {}
+        
+        # 점수 정규화 (0-1 범위, 음수는 0으로)
+        max_score = scores.max() if len(scores) else 0.0
+        if max_score <= 0:
+            return {}
+        
+        return {
+            model.quest_ids[j]: float(scores[j] / max_score)
+            for j in np.flatnonzero(scores > 0)
+        }
+    
+    @timed("cbf")
     def _content_based_filtering(self, db: Session, user_id: str) -> Dict[str, float]:
         """콘텐츠 기반 필터링 - 사용자의 과거 선호도와 퀘스트 특성 기반 추천"""
         # 1. 사용자가 과거에 상호작용한 퀘스트들의 특성 분석
         user_preferences = self._analyze_user_quest_history(db, user_id)
         
-        # 2. 모든 퀘스트의 특성 벡터 생성
-        all_quests = self.get_available_quests(db)
-        
-        # 3. 각 퀘스트에 대한 점수 계산
-        cbf_scores = {}
+        # 2. 퀘스트 특성 행렬 (카탈로그 버전별로 한 번만 구축)
+        catalog = self._get_catalog(db)
         
-        for quest in all_quests:
-            # 퀘스트 특성 벡터 생성
-            quest_vector = self._create_quest_vector(quest)
-            
-            # 사용자 선호도와의 유사도 계산
-            similarity = self._calculate_similarity(user_preferences, quest_vector)
-            
-            cbf_scores[quest['id']] = similarity
+        # 3. 특성 행렬 × 사용자 선호 벡터로 모든 퀘스트 점수 계산
+        scores = catalog.content_scores(user_preferences)
         
-        return cbf_scores
+        return dict(zip(catalog.quest_ids, scores.tolist()))
+    
+    def _get_catalog(self, db: Session) -> QuestCatalog:
+        """워커에 상주하는 추천 대상 퀘스트 카탈로그 조회"""
+        return get_catalog(lambda: self.get_available_quests(db))
     
-    def _build_interaction_matrix(self, db: Session) -> Dict[str, Dict[str, float]]:
-        """사용자-퀘스트 상호작용 매트릭스 구축"""
+    @timed("matrix_build")
+    def _build_interaction_matrix(self, db: Session) -> InteractionMatrix:
+        """사용자-퀘스트 상호작용 매트릭스 구축 (CSR)"""
         query = text("""
             SELECT user_id, quest_id,
                    is_click * 0.3 + is_cleared * 0.7 as interaction_score
             FROM quest_recommendations
             WHERE recommendation_date >= :cutoff_date
+            AND (is_click = 1 OR is_cleared = 1)
         """)
         
         # 최근 3개월 데이터만 사용
         cutoff_date = date.today() - timedelta(days=90)
         results = db.execute(query, {"cutoff_date": cutoff_date}).fetchall()
         
-        matrix = defaultdict(dict)
-        for result in results:
-            matrix[result.user_id][result.quest_id] = result.interaction_score
-        
-        return dict(matrix)
+        return InteractionMatrix.from_rows(
+            (result.user_id, result.quest_id, result.interaction_score) for result in results
+        )
     
-    def _find_similar_users(self, db: Session, user_id: str, 
-                           interaction_matrix: Dict) -> List[tuple]:
-        """코사인 유사도 기반 유사 사용자 찾기"""
-        if user_id not in interaction_matrix:
-            return []
-        
-        user_vector = interaction_matrix[user_id]
-        similarities = []
-        
-        for other_user_id, other_vector in interaction_matrix.items():
-            if other_user_id == user_id:
-                continue
-            
-            # 코사인 유사도 계산
-            similarity = self._cosine_similarity(user_vector, other_vector)
-            if similarity > 0.1:  # 최소 유사도 임계값
-                similarities.append((other_user_id, similarity))
-        
-        # 상위 10명의 유사한 사용자 반환
-        return sorted(similarities, key=lambda x: x[1], reverse=True)[:10]
+    def _get_interaction_matrix(self, db: Session) -> InteractionMatrix:
+        """TTL 동안 재사용되는 상호작용 매트릭스 조회"""
+        return _get_resident("interaction_matrix", MATRIX_TTL_SECONDS,
+                             lambda: self._build_interaction_matrix(db))
     
-    def _cosine_similarity(self, vector1: Dict, vector2: Dict) -> float:
-        """두 벡터 간의 코사인 유사도 계산"""
-        common_items = set(vector1.keys()) & set(vector2.keys())
-        
-        if not common_items:
-            return 0.0
-        
-        numerator = sum(vector1[item] * vector2[item] for item in common_items)
-        
-        sum1 = sum(vector1[item] ** 2 for item in common_items)
-        sum2 = sum(vector2[item] ** 2 for item in common_items)
-        
-        denominator = (sum1 ** 0.5) * (sum2 ** 0.5)
-        
-        if denominator == 0:
-            return 0.0
-        
-        return numerator / denominator
+    def _get_item_model(self, db: Session) -> ItemSimilarityModel:
+        """워커에 상주하는 퀘스트×퀘스트 유사도 모델 조회 (스냅샷이 있으면 mmap 공유본 사용)"""
+        snapshot = get_snapshot("item_similarity", self.model_dir)
+        if snapshot is not None:
+            if self._item_model_version != snapshot.version:
+                self._item_model = ItemSimilarityModel(snapshot["quest_ids"].tolist(),
+                                                       snapshot["similarity"])
+                self._item_model_version = snapshot.version
+            return self._item_model
+        return _get_resident("item_similarity", ITEM_MODEL_TTL_SECONDS,
+                             lambda: run_cpu_bound(ItemSimilarityModel.from_matrix,
+                                                   self._build_interaction_matrix(db)))
+    
+    @timed("neighbors")
+    def _get_indexed_neighbors(self, db: Session, user_id: str) -> Optional[List[tuple]]:
+        """user_neighbors 인덱스 조회 (인덱스가 없거나 조회 실패 시 None)"""
+        try:
+            return get_indexed_neighbors(db, user_id)
+        except SQLAlchemyError:
+            db.rollback()
+            return None
+    
+    @timed("similarity")
+    def _find_similar_users(self, db: Session, user_id: str, 
+                           interaction_matrix: InteractionMatrix) -> List[tuple]:
+        """코사인 유사도 기반 유사 사용자 찾기 (상위 10명, 최소 유사도 0.1)"""
+        return interaction_matrix.similar_users(user_id, k=self.neighbor_k,
+                                                min_similarity=self.min_similarity)
     
     def _analyze_user_quest_history(self, db: Session, user_id: str) -> Dict[str, float]:
         """사용자의 퀘스트 상호작용 이력 분석"""
@@ -764,51 +989,7 @@ class QuestRecommendationSystem:
         
         return preferences
     
-    def _create_quest_vector(self, quest: Dict) -> Dict[str, float]:
-        """퀘스트 특성 벡터 생성"""
-        vector = {
-            f'category_{quest["category"]}': 1.0,
-            f'type_{quest["type"]}': 1.0,
-            f'verify_{quest["verify_method"]}': 1.0,
-            f'period_{quest["period_scope"]}': 1.0,
-            'reward_exp': min(quest['reward_exp'] / 100.0, 1.0)  # 정규화
-        }
-        
-        # target_count가 있는 경우 난이도 지표로 활용
-        if quest.get('target_count'):
-            vector['difficulty'] = min(quest['target_count'] / 30.0, 1.0)
-        
-        return vector
-    
-    def _calculate_similarity(self, user_prefs: Dict, quest_vector: Dict) -> float:
-        """사용자 선호도와 퀘스트 벡터 간 유사도 계산"""
-        score = 0.0
-        
-        # 카테고리 매칭
-        for category, pref_score in user_prefs.get('category_scores', {}).items():
-            if f'category_{category}' in quest_vector:
-                score += pref_score * quest_vector[f'category_{category}']
-        
-        # 타입 매칭
-        for type_, pref_score in user_prefs.get('type_scores', {}).items():
-            if f'type_{type_}' in quest_vector:
-                score += pref_score * quest_vector[f'type_{type_}']
-        
-        # 검증 방법 매칭
-        for method, pref_score in user_prefs.get('verify_method_scores', {}).items():
-            if f'verify_{method}' in quest_vector:
-                score += pref_score * quest_vector[f'verify_{method}']
-        
-        # 점수 정규화
-        max_possible = sum(user_prefs.get('category_scores', {}).values()) + \
-                      sum(user_prefs.get('type_scores', {}).values()) + \
-                      sum(user_prefs.get('verify_method_scores', {}).values())
-        
-        if max_possible > 0:
-            score = score / max_possible
-        
-        return min(score, 1.0)
-    
+    @timed("exclusions")
     def _get_excluded_quests(self, db: Session, user_id: str) -> set:
         query = text("""
             SELECT DISTINCT quest_id
@@ -828,59 +1009,16 @@ class QuestRecommendationSystem:
         
         return {result.quest_id for result in results}
     
-    def _apply_diversity(self, db: Session, quest_ids: List[str]) -> List[str]:
-        """추천 다양성 적용 - 같은 카테고리 중복 최소화"""
-        if len(quest_ids) <= 3:
-            return quest_ids
-        
-        # 퀘스트 정보 조회
-        if not quest_ids:
+    @timed("diversity")
+    def _apply_diversity(self, db: Session, scored_quests: List[tuple], count: int = 3) -> List[str]:
+        """
+        추천 다양성 적용 - (퀘스트 ID, 점수) 후보를 MMR로 재정렬해 count 개 선택
+        - 워커에 상주하는 카탈로그의 카테고리/타입 벡터를 사용하므로 추가 쿼리가 없습니다.
+        """
+        if not scored_quests:
             return []
-            
-        placeholders = ",".join(f"'{qid}'" for qid in quest_ids)
-        query = text(f"""
-            SELECT id, category, type
-            FROM quests
-            WHERE id IN ({placeholders})
-        """)
-        
-        results = db.execute(query).fetchall()
-        
-        # 카테고리별로 그룹화
-        category_groups = defaultdict(list)
-        quest_info = {}
         
-        for result in results:
-            category_groups[result.category].append(result.id)
-            quest_info[result.id] = {
-                'category': result.category,
-                'type': result.type
-            }
-        
-        # 다양한 카테고리에서 선택
-        diverse_quests = []
-        used_categories = set()
-        
-        # 원래 순서대로 순회하면서 다른 카테고리 우선 선택
-        for quest_id in quest_ids:
-            if quest_id in quest_info:
-                category = quest_info[quest_id]['category']
-                if category not in used_categories or len(diverse_quests) < 3:
-                    diverse_quests.append(quest_id)
-                    used_categories.add(category)
-                    
-                    if len(diverse_quests) >= 3:
-                        break
-        
-        # 부족한 경우 나머지에서 채우기
-        if len(diverse_quests) < 3:
-            for quest_id in quest_ids:
-                if quest_id not in diverse_quests:
-                    diverse_quests.append(quest_id)
-                    if len(diverse_quests) >= 3:
-                        break
-        
-        return diverse_quests[:3]
+        return self._get_catalog(db).mmr(scored_quests, count, self.mmr_lambda)
     
     # ==================== 하이브리드 추천 시스템 메소드들 끝 ====================
     
@@ -892,19 +1030,17 @@ class QuestRecommendationSystem:
             "quest_daily_017"    # 쏠쏠한 적금 일일 출석 (습관 형성)
         ]
         
-        # DB에서 실제 존재하는 퀘스트만 반환 (SURPRISE 제외, quest_daily_016 제외)
-        placeholders = ",".join(f"'{qid}'" for qid in default_quest_ids)
-        query = text(f"""
-            SELECT id FROM quests 
-            WHERE id IN ({placeholders}) 
-            AND type IN ('LIFE', 'GROWTH') 
-            AND active = TRUE
-            AND id != 'quest_daily_016'
-            LIMIT 3
-        """)
-        results = db.execute(query).fetchall()
+        # 추천 대상 카탈로그에 실제 존재하는 퀘스트만 반환 (SURPRISE 제외, quest_daily_016 제외)
+        catalog = self._get_catalog(db)
+        available_ids = [qid for qid in default_quest_ids if qid in catalog.quest_index][:3]
         
-        return [result.id for result in results] if results else default_quest_ids
+        return available_ids if available_ids else default_quest_ids
+
+
+@lru_cache(maxsize=1)
+def get_recommender() -> QuestRecommendationSystem:
+    """프로세스 전역 추천 시스템 인스턴스"""
+    return QuestRecommendationSystem()
 
 
 # 이 클래스는 router.py에서 import하여 사용됩니다.
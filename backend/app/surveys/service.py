@@ -5,6 +5,7 @@ from datetime import datetime, timezone, timedelta
 from sqlalchemy.orm import Session
 
 from app.models import SurveyQuestion, SurveyQuestionOption, SurveyAnswer
+from app.recommend.cache import invalidate_daily
 
 # ---- ID 생성기(26자) ----
 # 프로젝트에서 ULID/기존 규약이 있으면 교체하세요.
@@ -84,6 +85,9 @@ def upsert_answers(db: Session, user_id: str, items: List["SurveyAnswerIn"]) ->
             upserted += 1
 
     db.commit()
+
+    # 설문이 바뀌면 오늘의 추천을 다시 계산하도록 캐시 삭제
+    invalidate_daily(user_id)
     return upserted
 
 
@@ -4,8 +4,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.auth.deps import get_current_user
+from app.auth.cache import invalidate_user
 from app.database import get_db
-from app.auth.utils import hash_password
+from app.auth.hashing import hash_password_blocking
 
 from app.models import (
     User, School, UserStats, TierNameEnum
@@ -96,9 +97,9 @@ def update_me(
     # if "birth_year" in data:
     #     current_user.birth_year = data["birth_year"]
 
-    # 비밀번호 변경
+    # 비밀번호 변경 (전용 해시 풀에서 계산, 포화 시 503)
     if "password" in data and data["password"]:
-        current_user.password_hash = hash_password(data["password"])
+        current_user.password = hash_password_blocking(data["password"])
 
     try:
         db.add(current_user)
@@ -108,6 +109,9 @@ def update_me(
         db.rollback()
         raise HTTPException(status_code=400, detail="중복되는 정보가 있습니다.(이메일 등)")
 
+    # 인증 사용자 캐시 갱신 (다음 요청에서 DB 값으로 다시 채움)
+    invalidate_user(current_user.id)
+
     return {
         "success": True,
         "data": {
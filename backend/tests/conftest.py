@@ -0,0 +1,50 @@
+# tests/conftest.py
+import os
+import sys
+from collections import OrderedDict
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.mysql import TINYINT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# backend/ 를 import 경로에 추가 (app 패키지)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@compiles(TINYINT, "sqlite")
+def _tinyint_sqlite(type_, compiler, **kw):
+    return "INTEGER"
+
+
+@pytest.fixture
+def fake_rds(monkeypatch):
+    """Redis 를 쓰는 모듈의 rds 를 fakeredis 로 교체"""
+    from app.auth import cache, revocation
+    from app.recommend import cache as reco_cache, persistence, precompute, stats
+
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(revocation, "rds", client)
+    monkeypatch.setattr(cache, "rds", client)
+    for module in (reco_cache, persistence, precompute, stats):
+        monkeypatch.setattr(module, "rds", client)
+        module_reset = getattr(module, "reset", None)
+        if module_reset is not None:
+            module_reset()
+    monkeypatch.setattr(cache, "_local", OrderedDict())
+    return client
+
+
+@pytest.fixture
+def user_db():
+    """schools / users / user_stats 만 만든 메모리 SQLite 세션 팩토리 (스레드 간 공유)"""
+    from app.models import School, User, UserStats
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for model in (School, User, UserStats):
+        model.__table__.create(engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
@@ -0,0 +1,40 @@
+# tests/test_auth_cache.py
+import json
+
+from app.auth import cache
+from app.models import User, UserRoleEnum
+
+
+def _user(name: str) -> User:
+    return User(id="U1", login_id="u1", email="u1@example.com", real_name=name,
+                password="hash", user_key="key", role=UserRoleEnum.GUEST)
+
+
+def test_cache_user_stores_when_generation_unchanged(fake_rds):
+    generation = cache.user_generation("U1")
+    cache.cache_user("jti-1", _user("old"), generation)
+
+    assert cache.lookup_user("jti-1", "U1").real_name == "old"
+    assert fake_rds.exists(cache.user_key("U1"))
+
+
+def test_invalidate_during_miss_does_not_cache_stale_row(fake_rds):
+    # 요청 A: 캐시 미스 → 세대 읽기 → DB에서 이전 값 조회
+    generation = cache.user_generation("U1")
+    stale = _user("old")
+
+    # 그 사이 프로필 수정 커밋 후 invalidate_user
+    cache.invalidate_user("U1")
+
+    # 요청 A 가 뒤늦게 이전 값을 저장하려 함
+    cache.cache_user("jti-1", stale, generation)
+
+    assert not fake_rds.exists(cache.user_key("U1"))
+    assert cache.lookup_user("jti-1", "U1") is None
+
+
+def test_sensitive_columns_are_not_cached(fake_rds):
+    cache.cache_user(None, _user("name"), cache.user_generation("U1"))
+
+    cached = json.loads(fake_rds.get(cache.user_key("U1")))
+    assert "password" not in cached and "user_key" not in cached
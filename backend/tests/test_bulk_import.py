@@ -0,0 +1,216 @@
+# tests/test_bulk_import.py
+import asyncio
+import csv
+import os
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.auth import bulk_import, members
+from app.auth.deps import require_admin
+from app.auth.router import router
+from app.models import School, User, UserRoleEnum
+
+
+@pytest.fixture
+def import_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def client(import_dir, monkeypatch):
+    launched = []
+    monkeypatch.setattr(bulk_import, "launch", lambda import_id, rounds: launched.append(import_id))
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[require_admin] = lambda: None
+    test_client = TestClient(app)
+    test_client.launched = launched
+    return test_client
+
+
+def test_read_rows_streams_jsonl_and_rejects_json_arrays(tmp_path):
+    source = tmp_path / "users.jsonl"
+    source.write_text('{"login_id": "a"}\n\n{"login_id": "b"}\n', encoding="utf-8")
+    assert list(bulk_import.read_rows(str(source))) == [(0, {"login_id": "a"}), (1, {"login_id": "b"})]
+
+    array = tmp_path / "users.json"
+    array.write_text('[{"login_id": "a"}]', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(bulk_import.read_rows(str(array)))
+
+
+def test_upload_is_saved_and_launched(client, import_dir):
+    body = b"login_id,email\nu1,u1@example.com\n"
+    response = client.post("/auth/bulk-import?format=csv", content=body)
+
+    assert response.status_code == 200
+    import_id = response.json()["data"]["import_id"]
+    assert client.launched == [import_id]
+    assert (import_dir / f"{import_id}.csv").read_bytes() == body
+
+
+def test_upload_over_limit_is_rejected_and_removed(client, import_dir, monkeypatch):
+    monkeypatch.setattr(bulk_import, "MAX_UPLOAD_BYTES", 16)
+
+    # Content-Length 로 바로 거절
+    response = client.post("/auth/bulk-import?format=csv", content=b"x" * 17)
+    assert response.status_code == 413
+
+    # Content-Length 없이 스트리밍된 경우에도 중단하고 저장하던 파일 삭제
+    def chunks():
+        for _ in range(4):
+            yield b"x" * 8
+
+    response = client.post("/auth/bulk-import?format=jsonl", content=chunks())
+    assert response.status_code == 413
+    assert os.listdir(import_dir) == []
+    assert client.launched == []
+
+
+def test_json_format_is_not_accepted(client):
+    assert client.post("/auth/bulk-import?format=json", content=b"[]").status_code == 422
+
+
+# ---- 청크 처리 / 이어서 실행 ----
+FIELDS = ["login_id", "email", "password", "real_name", "university_code"]
+
+
+def _write_csv(path, n_rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(n_rows):
+            writer.writerow({"login_id": f"student{i}", "email": f"s{i}@example.com",
+                             "password": "Passw0rd!", "real_name": "학생", "university_code": "SSAFY"})
+    return str(path)
+
+
+@pytest.fixture
+def importer(user_db, monkeypatch):
+    db = user_db()
+    db.add(School(id="S1", code="SSAFY", name="싸피대학교"))
+    db.commit()
+    db.close()
+
+    calls, errors = [], {}
+
+    async def ensure(email):
+        calls.append(email)
+        if email in errors:
+            raise errors[email]
+        return f"key-{email}"
+
+    async def fast_hash(pool, passwords, rounds):
+        return [f"hashed-{p}" for p in passwords]
+
+    monkeypatch.setattr(members, "ensure_ssafy_member", ensure)
+    monkeypatch.setattr(bulk_import, "_hash_all", fast_hash)
+    monkeypatch.setattr(bulk_import, "HASH_PROCESSES", 1)
+
+    def run(source, progress, chunk_size=2):
+        return asyncio.run(bulk_import.import_users(source, progress, user_db, chunk_size=chunk_size))
+
+    run.calls, run.errors = calls, errors
+    return run
+
+
+def _user_keys(user_db):
+    db = user_db()
+    try:
+        return {r.login_id: r.user_key for r in db.execute(text("SELECT login_id, user_key FROM users")).fetchall()}
+    finally:
+        db.close()
+
+
+def test_conflicting_rows_do_not_create_ssafy_members(importer, user_db, tmp_path):
+    db = user_db()
+    db.add(User(id="U0", login_id="someone", email="s1@example.com", password="x",
+                real_name="기존", role=UserRoleEnum.GUEST, user_key="old-key"))
+    db.commit()
+    db.close()
+    importer.errors["s2@example.com"] = HTTPException(status_code=400, detail="invalid userId")
+
+    summary = importer(_write_csv(tmp_path / "u.csv", 3), str(tmp_path / "u.progress.jsonl"))
+
+    assert summary["status"] == "done"
+    assert summary["created"] == 1
+    assert [f["row"] for f in summary["failures"]] == [1, 2]
+    # 충돌 행(s1)은 SSAFY 호출 없음, 거절된 행(s2)의 임시 사용자는 삭제
+    assert "s1@example.com" not in importer.calls
+    assert _user_keys(user_db) == {"someone": "old-key", "student0": "key-s0@example.com"}
+
+
+def test_resume_from_progress_after_ssafy_outage(importer, user_db, tmp_path):
+    source = _write_csv(tmp_path / "u.csv", 4)
+    progress = str(tmp_path / "u.progress.jsonl")
+    importer.errors["s3@example.com"] = HTTPException(status_code=502, detail="SSAFY 서버 오류")
+
+    summary = importer(source, progress)
+
+    assert summary["status"] == "stopped"
+    assert summary["next_row"] == 2  # 두 번째 청크는 기록되지 않음
+    # 서버 오류 행의 임시 사용자는 남지 않음
+    assert not any(members.is_pending_user_key(key) for key in _user_keys(user_db).values())
+
+    importer.errors.clear()
+    importer.calls.clear()
+    summary = importer(source, progress)
+
+    assert summary["status"] == "done"
+    assert summary["next_row"] == 4
+    # 첫 실행의 첫 청크 2명 + 이번 s3, 두 번째 청크에서 먼저 저장된 s2 는 건너뜀
+    assert (summary["created"], summary["skipped"]) == (3, 1)
+    # 첫 청크는 다시 처리하지 않음
+    assert importer.calls == ["s3@example.com"]
+    assert _user_keys(user_db) == {f"student{i}": f"key-s{i}@example.com" for i in range(4)}
+
+
+def test_resume_completes_users_left_with_pending_key(importer, user_db, tmp_path):
+    # INSERT 후 계정 생성 전에 프로세스가 종료된 경우
+    db = user_db()
+    db.add(User(id="U1", login_id="student0", email="s0@example.com", password="hashed", real_name="학생",
+                role=UserRoleEnum.GUEST, user_key=members.pending_user_key("U1")))
+    db.commit()
+    db.close()
+
+    summary = importer(_write_csv(tmp_path / "u.csv", 1), str(tmp_path / "u.progress.jsonl"))
+
+    assert summary["created"] == 1 and summary["skipped"] == 0
+    assert _user_keys(user_db) == {"student0": "key-s0@example.com"}
+
+
+def test_progress_lock_is_exclusive(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_DIR", str(tmp_path))
+    import_id = "a" * 32
+    progress = bulk_import.progress_path(import_id)
+    assert not bulk_import.is_running(import_id)
+
+    lock = bulk_import.acquire_lock(progress)
+    try:
+        assert lock is not None
+        assert bulk_import.acquire_lock(progress) is None
+        assert bulk_import.is_running(import_id)
+    finally:
+        lock.close()
+    assert not bulk_import.is_running(import_id)
+
+
+def test_read_progress_skips_torn_last_line(tmp_path):
+    progress = tmp_path / "p.jsonl"
+    progress.write_text(
+        '{"event": "start"}\n'
+        '{"event": "failed", "row": 1, "login_id": "x", "reason": "r"}\n'
+        '{"event": "chunk", "next_row": 2, "created": 1, "skipped": 0, "failed": 1}\n'
+        '{"event": "failed", "row": 3, "login_id": "y", "reason": "r"}\n'
+        '{"event": "chu', encoding="utf-8")
+
+    summary = bulk_import.read_progress(str(progress))
+
+    assert summary["next_row"] == 2
+    assert summary["status"] == "running"
+    # 기록되지 않은 청크의 실패 행은 제외
+    assert [f["row"] for f in summary["failures"]] == [1]
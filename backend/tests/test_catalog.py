@@ -0,0 +1,72 @@
+# tests/test_catalog.py
+import pytest
+
+from app.recommend import catalog
+
+
+def _quest(quest_id, category="HEALTH", reward_exp=50, **fields):
+    return {
+        "id": quest_id, "type": "LIFE", "category": category, "verify_method": "PHOTO",
+        "period_scope": "DAILY", "reward_exp": reward_exp, "target_count": None, **fields,
+    }
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """호출 횟수를 세는 퀘스트 목록 로더 (TTL 0 → 매번 다시 읽음)"""
+    monkeypatch.setattr(catalog, "CATALOG_TTL_SECONDS", 0)
+    catalog.reset()
+
+    class Loader:
+        def __init__(self):
+            self.quests = [_quest("q1"), _quest("q2", category="STUDY")]
+            self.calls = 0
+
+        def __call__(self):
+            self.calls += 1
+            return [dict(quest) for quest in self.quests]
+
+    yield Loader()
+    catalog.reset()
+
+
+def test_version_ignores_order_and_tracks_content():
+    quests = [_quest("q1"), _quest("q2")]
+    assert catalog.catalog_version(quests) == catalog.catalog_version(list(reversed(quests)))
+    assert catalog.catalog_version(quests) != catalog.catalog_version([_quest("q1"), _quest("q2", reward_exp=60)])
+
+
+def test_same_version_reuses_feature_matrix(loader):
+    first = catalog.get_catalog(loader)
+    second = catalog.get_catalog(loader)
+
+    # TTL 이 지나 다시 읽었지만 내용이 같으면 기존 카탈로그 유지
+    assert loader.calls == 2
+    assert second is first
+
+
+def test_changed_quests_build_new_catalog(loader):
+    first = catalog.get_catalog(loader)
+    loader.quests[0]["reward_exp"] = 100
+    loader.quests.append(_quest("q3", category="CULTURE"))
+
+    second = catalog.get_catalog(loader)
+
+    assert second is not first
+    assert second.version != first.version
+    assert second.quest_ids == ["q1", "q2", "q3"]
+    assert second.features[0, second.column_index["reward_exp"]] == 1.0
+    assert "category_CULTURE" in second.column_index
+    assert second.get("q3")["category"] == "CULTURE"
+
+
+def test_ttl_serves_resident_catalog_without_reloading(loader, monkeypatch):
+    monkeypatch.setattr(catalog, "CATALOG_TTL_SECONDS", 3600)
+    first = catalog.get_catalog(loader)
+    loader.quests.append(_quest("q3"))
+
+    assert catalog.get_catalog(loader) is first
+    assert loader.calls == 1
+
+    catalog.reset()
+    assert catalog.get_catalog(loader).quest_ids == ["q1", "q2", "q3"]
@@ -0,0 +1,65 @@
+# tests/test_cohort.py
+import random
+
+import pytest
+
+from app.recommend.system import CATEGORIES, OPTION_KEYS, QuestRecommendationSystem
+
+
+def _quests(rng: random.Random, n: int):
+    # 알 수 없는 카테고리도 섞어 score_quests 의 0점 처리와 비교
+    categories = CATEGORIES + ["UNKNOWN"]
+    return [{"id": f"quest_{i:03d}", "category": rng.choice(categories)} for i in range(n)]
+
+
+def _user(rng: random.Random, i: int):
+    info = {
+        "id": f"user_{i}",
+        "birth_year": rng.choice([None, 1995, 2000, 2003, 2005]),
+        "grade": rng.choice([None, 1, 2, 3, 4]),
+    }
+    answers = [
+        {"question_type": q, "option_order_no": int(rng.choice(list(options)))}
+        for q, options in OPTION_KEYS.items()
+        if rng.random() < 0.8
+    ]
+    # 매핑 밖의 답변은 무시되어야 함
+    answers.append({"question_type": 99, "option_order_no": 1})
+    return info, answers
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("k", [1, 3, 8])
+def test_score_cohort_matches_per_user_selection(seed, k):
+    rng = random.Random(seed)
+    system = QuestRecommendationSystem()
+    quests = _quests(rng, 40)
+    users = [_user(rng, i) for i in range(50)]
+    infos = [info for info, _ in users]
+    answers = [a for _, a in users]
+
+    cohort = system.score_cohort(infos, answers, quests, k=k)
+
+    for (info, a), ranked in zip(users, cohort):
+        scored = system.score_quests(quests, system.analyze_user_preferences(info, a))
+        expected = [q["id"] for q in system._select_diverse_quests(scored, k)]
+        assert ranked == expected
+
+
+def test_rank_preferences_without_diversity_is_score_order():
+    rng = random.Random(7)
+    system = QuestRecommendationSystem()
+    quests = _quests(rng, 30)
+    info, answers = _user(rng, 0)
+
+    preferences = system._preference_matrix([info], [answers])
+    ranked = system.rank_preferences(preferences, quests, k=5, diverse=False)[0]
+
+    scored = system.score_quests(quests, system.analyze_user_preferences(info, answers))
+    assert ranked == [q["id"] for q in scored[:5]]
+
+
+def test_score_cohort_empty_inputs():
+    system = QuestRecommendationSystem()
+    assert system.score_cohort([], [], [{"id": "q", "category": "LIFE"}]) == []
+    assert system.score_cohort([{"birth_year": None, "grade": None}], [[]], []) == [[]]
@@ -0,0 +1,121 @@
+# tests/test_executor.py
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.recommend import executor, system
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(executor, "PROCESS_WORKERS", 1)
+    monkeypatch.setattr(executor, "_process_pool", None)
+    yield
+    pool = executor._process_pool
+    if pool is not None:
+        executor._discard_process_pool(pool)
+
+
+def test_process_pool_timeout_returns_504_and_terminates_worker(process_pool):
+    assert executor.run_cpu_bound(sum, [1, 2, 3]) == 6
+    pool = executor._process_pool
+    workers = list(pool._processes.values())
+
+    with pytest.raises(HTTPException) as exc:
+        executor.run_cpu_bound(time.sleep, 30, timeout=0.5)
+
+    assert exc.value.status_code == 504
+    assert executor._process_pool is None
+    assert workers and not any(p.is_alive() for p in workers)
+    # 다음 호출은 새 풀로 실행
+    assert executor.run_cpu_bound(sum, [4, 5]) == 9
+    assert executor._process_pool is not pool
+
+
+def test_saturated_executor_returns_503(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(executor, "MAX_PENDING", 1)
+    monkeypatch.setattr(executor, "_with_session", lambda func, *args, **kwargs: func(None, *args, **kwargs))
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run_with_session(lambda db: release.wait(5), timeout=5))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(HTTPException) as exc:
+                await executor.run_with_session(lambda db: None)
+            assert exc.value.status_code == 503
+        finally:
+            release.set()
+        await first
+
+    asyncio.run(scenario())
+    assert executor.pending_count() == 0
+
+
+def test_slow_task_returns_504(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(executor, "_with_session", lambda func, *args, **kwargs: func(None, *args, **kwargs))
+
+    async def scenario():
+        with pytest.raises(HTTPException) as exc:
+            await executor.run_with_session(lambda db: release.wait(5), timeout=0.1)
+        assert exc.value.status_code == 504
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+
+
+def test_resident_rebuild_does_not_block_other_objects():
+    system.reset()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_builder():
+        started.set()
+        release.wait(5)
+        return "matrix"
+
+    builder = threading.Thread(target=system._get_resident, args=("slow", 60, slow_builder))
+    builder.start()
+    try:
+        assert started.wait(5)
+        begin = time.monotonic()
+        assert system._get_resident("fast", 60, lambda: "model") == "model"
+        assert time.monotonic() - begin < 1
+    finally:
+        release.set()
+        builder.join(5)
+    assert system._get_resident("slow", 60, lambda: "unused") == "matrix"
+    system.reset()
+
+
+def test_expired_resident_is_served_while_rebuilding():
+    system.reset()
+    assert system._get_resident("matrix", 60, lambda: "old") == "old"
+    with system._resident_lock:
+        value, _ = system._resident["matrix"]
+        system._resident["matrix"] = (value, time.monotonic() - 120)
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_builder():
+        started.set()
+        release.wait(5)
+        return "new"
+
+    results = []
+    rebuild = threading.Thread(target=lambda: results.append(system._get_resident("matrix", 60, slow_builder)))
+    rebuild.start()
+    try:
+        assert started.wait(5)
+        assert system._get_resident("matrix", 60, lambda: "unused") == "old"
+    finally:
+        release.set()
+        rebuild.join(5)
+    assert results == ["new"]
+    assert system._get_resident("matrix", 60, lambda: "unused") == "new"
+    system.reset()
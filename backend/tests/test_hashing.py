@@ -0,0 +1,68 @@
+# tests/test_hashing.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import hashing
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """작업 1개만 실행하는 해시 풀과 짧은 한도"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(hashing, "_pool", executor)
+    monkeypatch.setattr(hashing, "_pending", 0)
+    monkeypatch.setattr(hashing, "_stats", dict(hashing._stats, rejected=0, timed_out=0))
+    monkeypatch.setattr(hashing, "MAX_PENDING", 1)
+    monkeypatch.setattr(hashing, "TIMEOUT_SECONDS", 0.05)
+    release = threading.Event()
+    yield release
+    release.set()
+    executor.shutdown(wait=True)
+
+
+def _wait_for(release: threading.Event) -> str:
+    release.wait(5)
+    return "done"
+
+
+def test_pending_cap_rejects_with_503(pool):
+    busy = hashing._submit(_wait_for, pool)
+    assert hashing.pending_count() == 1
+
+    with pytest.raises(HTTPException) as exc:
+        hashing._run_blocking(str.upper, "x")
+    assert exc.value.status_code == 503
+    assert 'auth_hash_jobs_total{outcome="rejected"} 1' in hashing.render_prometheus()
+
+    # 작업이 끝나면 슬롯이 반환되어 다시 받음
+    pool.set()
+    assert busy.result(timeout=5) == "done"
+    assert hashing.pending_count() == 0
+    assert hashing._run_blocking(str.upper, "x") == "X"
+
+
+def test_blocking_timeout_returns_504(pool):
+    with pytest.raises(HTTPException) as exc:
+        hashing._run_blocking(_wait_for, pool)
+    assert exc.value.status_code == 504
+    assert 'auth_hash_jobs_total{outcome="timed_out"} 1' in hashing.render_prometheus()
+
+    # 시간 초과된 작업도 끝나면 대기 수에서 빠짐
+    pool.set()
+    hashing._pool.shutdown(wait=True)
+    assert hashing.pending_count() == 0
+
+
+def test_async_timeout_returns_504(pool):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(hashing._run(_wait_for, pool))
+    assert exc.value.status_code == 504
+
+
+def test_async_runs_in_pool(pool, monkeypatch):
+    monkeypatch.setattr(hashing, "TIMEOUT_SECONDS", 5)
+    assert asyncio.run(hashing._run(threading.current_thread)) is not threading.current_thread()
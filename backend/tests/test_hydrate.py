@@ -0,0 +1,76 @@
+# tests/test_hydrate.py
+from types import SimpleNamespace
+
+import pytest
+
+from app.recommend import catalog
+from app.recommend.system import QuestRecommendationSystem
+
+
+def _quest(quest_id, quest_type="LIFE", title=None):
+    return {
+        "id": quest_id, "type": quest_type, "title": title or f"title {quest_id}", "category": "HEALTH",
+        "verify_method": "PHOTO", "verify_params": None, "reward_exp": 50, "target_count": 1,
+        "period_scope": "DAILY", "active": True, "lat": None, "lng": None,
+        "quest_link_url": None, "created_at": None,
+    }
+
+
+class FakeDB:
+    """카탈로그 밖 퀘스트(IN 쿼리) 조회만 흉내 내는 세션"""
+
+    def __init__(self, quests):
+        self.quests = {quest["id"]: quest for quest in quests}
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append((str(query), params))
+        rows = [SimpleNamespace(**self.quests[qid]) for qid in params["quest_ids"] if qid in self.quests]
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+@pytest.fixture
+def system(monkeypatch):
+    """추천 대상 퀘스트 q1, q2 를 카탈로그로 쓰는 추천 시스템"""
+    monkeypatch.setattr(catalog, "CATALOG_TTL_SECONDS", 3600)
+    catalog.reset()
+    system = QuestRecommendationSystem()
+    system.available = [_quest("q1"), _quest("q2", "GROWTH")]
+    monkeypatch.setattr(system, "get_available_quests", lambda db: [dict(q) for q in system.available])
+    yield system
+    catalog.reset()
+
+
+def test_hydrate_keeps_order_and_queries_only_missing(system):
+    # s1 은 SURPRISE 라 카탈로그 밖, q3 는 비활성이라 조회되지 않음
+    db = FakeDB([_quest("s1", "SURPRISE")])
+
+    quests = system._get_quests_full_details(db, ["q2", "s1", "q1", "q2", "q3"])
+
+    # 중복 제거, 입력 순서 유지, 없는 퀘스트 제외
+    assert [quest["id"] for quest in quests] == ["q2", "s1", "q1"]
+    assert len(db.queries) == 1
+    assert "IN" in db.queries[0][0] and db.queries[0][1] == {"quest_ids": ["s1", "q3"]}
+
+
+def test_hydrate_skips_db_when_all_in_catalog(system):
+    db = FakeDB([])
+
+    quests = system._get_quests_full_details(db, ["q1", "q2"])
+
+    assert [quest["title"] for quest in quests] == ["title q1", "title q2"]
+    assert db.queries == []
+
+
+def test_hydrate_sees_catalog_changes_after_ttl(system, monkeypatch):
+    db = FakeDB([])
+    first = system._get_quests_full_details(db, ["q1"])
+    first[0]["title"] = "mutated by caller"
+    system.available[0] = _quest("q1", title="renamed")
+
+    # TTL 안에서는 상주 카탈로그 (호출한 쪽이 바꾼 dict 는 카탈로그에 반영되지 않음)
+    assert system._get_quests_full_details(db, ["q1"])[0]["title"] == "title q1"
+
+    monkeypatch.setattr(catalog, "CATALOG_TTL_SECONDS", 0)
+    assert system._get_quests_full_details(db, ["q1"])[0]["title"] == "renamed"
+    assert db.queries == []
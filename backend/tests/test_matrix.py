@@ -0,0 +1,77 @@
+# tests/test_matrix.py
+import numpy as np
+import pytest
+
+from app.recommend.matrix import InteractionMatrix
+
+
+def _random_rows(seed: int, n_users: int = 60, n_quests: int = 25, density: float = 0.15):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for u in range(n_users):
+        for q in range(n_quests):
+            if rng.random() < density:
+                rows.append((f"u{u}", f"q{q}", float(rng.uniform(0.05, 1.0))))
+    # 반응 없는 노출 기록과 같은 칸의 중복 기록 (최댓값으로 병합)
+    rows.append(("u0", "q_only_exposed", 0.0))
+    rows.extend((u, q, s / 2) for u, q, s in rows[:10])
+    return rows
+
+
+def _dense(matrix: InteractionMatrix, rows):
+    dense = np.zeros((matrix.n_users, matrix.n_quests))
+    for user_id, quest_id, score in rows:
+        if score > 0:
+            u, q = matrix.user_index[user_id], matrix.quest_index[quest_id]
+            dense[u, q] = max(dense[u, q], np.float32(score))
+    return dense
+
+
+def _brute_force_cosine(dense: np.ndarray, u: int) -> np.ndarray:
+    norms = np.linalg.norm(dense, axis=1)
+    safe = np.where(norms > 0, norms, 1.0)
+    normalized = dense / safe[:, None]
+    return normalized @ normalized[u]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_similarities_match_brute_force(seed):
+    rows = _random_rows(seed)
+    matrix = InteractionMatrix.from_rows(rows)
+    dense = _dense(matrix, rows)
+
+    assert "q_only_exposed" not in matrix.quest_index
+    assert matrix.nnz == np.count_nonzero(dense)
+    for user_id in matrix.user_ids[:20]:
+        u = matrix.user_index[user_id]
+        np.testing.assert_allclose(matrix.similarities(user_id), _brute_force_cosine(dense, u), atol=1e-5)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("k", [1, 5, 100])
+def test_similar_users_match_brute_force_top_k(seed, k):
+    rows = _random_rows(seed)
+    matrix = InteractionMatrix.from_rows(rows)
+    dense = _dense(matrix, rows)
+    min_similarity = 0.1
+
+    for user_id in matrix.user_ids[:20]:
+        u = matrix.user_index[user_id]
+        sims = _brute_force_cosine(dense, u)
+        sims[u] = -1.0
+        expected = np.sort(sims[sims > min_similarity])[::-1][:k]
+
+        result = matrix.similar_users(user_id, k=k, min_similarity=min_similarity)
+        # 경계의 동점은 어느 사용자를 골라도 되므로 유사도 값과 각 사용자의 실제 유사도를 비교
+        np.testing.assert_allclose([s for _, s in result], expected, atol=1e-5)
+        assert len({uid for uid, _ in result}) == len(result) and user_id not in dict(result)
+        for uid, similarity in result:
+            assert similarity == pytest.approx(sims[matrix.user_index[uid]], abs=1e-5)
+
+
+def test_unknown_user_and_empty_matrix():
+    matrix = InteractionMatrix.from_rows([("u1", "q1", 0.0)])
+    assert matrix.nnz == 0
+    assert matrix.similar_users("u1") == []
+    assert matrix.similar_users("missing") == []
+    assert not matrix.similarities("missing").any()
@@ -0,0 +1,131 @@
+# tests/test_persistence.py
+from datetime import date
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import QuestRecommendation
+from app.recommend import cache, persistence
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    QuestRecommendation.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _rows(db):
+    return db.execute(text("""
+        SELECT id, user_id, quest_id, recommendation_date, is_click, is_cleared
+        FROM quest_recommendations
+        ORDER BY user_id, quest_id
+    """)).fetchall()
+
+
+def test_upsert_recommendations_is_idempotent(db):
+    day = date(2025, 9, 1)
+    recommendations = {"U1": ["q1", "q2", "q3"], "U2": ["q1"]}
+
+    assert persistence.upsert_recommendations(db, recommendations, day) == 4
+    first = _rows(db)
+
+    # 같은 날 다시 저장해도 행이 늘거나 ID가 바뀌지 않음
+    persistence.upsert_recommendations(db, recommendations, day)
+    assert _rows(db) == first
+    assert len(first) == 4
+
+
+def test_upsert_keeps_existing_interactions(db):
+    day = date(2025, 9, 1)
+    persistence.upsert_recommendations(db, {"U1": ["q1", "q2"]}, day)
+    db.execute(text("UPDATE quest_recommendations SET is_click = 1, is_cleared = 1 WHERE quest_id = 'q1'"))
+    db.commit()
+
+    persistence.upsert_recommendations(db, {"U1": ["q1", "q2", "q3"]}, day)
+
+    rows = {row.quest_id: row for row in _rows(db)}
+    assert set(rows) == {"q1", "q2", "q3"}
+    assert (rows["q1"].is_click, rows["q1"].is_cleared) == (1, 1)
+    assert (rows["q3"].is_click, rows["q3"].is_cleared) == (0, 0)
+
+
+def test_upsert_splits_large_batches(db, monkeypatch):
+    monkeypatch.setattr(persistence, "STATEMENT_ROWS", 7)
+    day = date(2025, 9, 1)
+    recommendations = {f"U{i}": [f"q{j}" for j in range(3)] for i in range(10)}
+
+    persistence.upsert_recommendations(db, recommendations, day)
+    persistence.upsert_recommendations(db, recommendations, day)
+
+    assert len(_rows(db)) == 30
+    # 다른 날짜는 별도 행
+    persistence.upsert_recommendations(db, {"U0": ["q0"]}, date(2025, 9, 2))
+    assert len(_rows(db)) == 31
+
+
+@pytest.fixture
+def writer(db, fake_rds, monkeypatch):
+    """백그라운드 스레드 없이 flush() 로만 저장하는 write-behind 버퍼"""
+    session_factory = sessionmaker(bind=db.get_bind())
+    monkeypatch.setattr("app.database.SessionLocal", session_factory)
+    writer = persistence.RecommendationWriter()
+    writer._thread = threading.current_thread()
+    monkeypatch.setattr(persistence, "WRITE_BEHIND", True)
+    monkeypatch.setattr(persistence, "_writer", writer)
+    return writer
+
+
+def test_details_cached_only_after_write_behind_flush(db, writer):
+    day = date(2025, 9, 1)
+    details = [{"id": "q1"}, {"id": "q2"}]
+    persistence.save_recommendations(db, "U1", ["q1", "q2"], day)
+    persistence.when_saved("U1", day, lambda: cache.set_daily_details("U1", day, details))
+
+    # 저장 전에는 캐시가 비어 있고, 클릭/완료용 대기 표시만 남음
+    assert cache.get_daily_details("U1", day) is None
+    assert persistence.pending_quest_ids("U1", day) == ["q1", "q2"]
+    assert _rows(db) == []
+
+    writer.flush()
+
+    assert [row.quest_id for row in _rows(db)] == ["q1", "q2"]
+    assert cache.get_daily_details("U1", day) == details
+    # 대기 중인 항목이 없으면 바로 실행
+    ran = []
+    persistence.when_saved("U1", day, lambda: ran.append(True))
+    assert ran == [True]
+
+
+def test_details_not_cached_when_write_behind_flush_fails(db, writer):
+    day = date(2025, 9, 1)
+    persistence.save_recommendations(db, "U1", ["q1"], day)
+    persistence.when_saved("U1", day, lambda: cache.set_daily_details("U1", day, [{"id": "q1"}]))
+    db.execute(text("DROP TABLE quest_recommendations"))
+    db.commit()
+
+    writer.flush()
+
+    assert cache.get_daily_details("U1", day) is None
+    assert cache.get_daily_ids("U1", day) is None
+    # 실패한 항목의 콜백은 버려지고 대기 상태도 풀림 → 다음 요청이 다시 계산/저장
+    assert writer._unsaved == {} and writer._callbacks == {}
+
+
+def test_callback_waits_for_every_pending_submit(db, writer):
+    day = date(2025, 9, 1)
+    ran = []
+    persistence.save_recommendations(db, "U1", ["q1"], day)
+    persistence.save_recommendations(db, "U1", ["q1", "q2"], day)
+    persistence.when_saved("U1", day, lambda: ran.append(True))
+
+    writer._finish([("U1", ["q1"], day)], saved=True)
+    assert ran == []
+
+    writer._finish([("U1", ["q1", "q2"], day)], saved=True)
+    assert ran == [True]
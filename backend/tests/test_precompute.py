@@ -0,0 +1,115 @@
+# tests/test_precompute.py
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app.models import QuestRecommendation
+from app.recommend import cache, precompute, system
+
+DAY = date(2025, 9, 1)
+
+
+class FakeRecommender:
+    def __init__(self):
+        self.default_ids = ["q1", "q2", "q3"]
+
+    def _check_data_sufficiency(self, db):
+        return False, {}
+
+    def get_available_quests(self, db):
+        return []
+
+    def _get_default_recommendations(self, db):
+        return list(self.default_ids)
+
+    def score_cohort(self, user_infos, survey_answers, quests, k=3):
+        return [[] for _ in user_infos]
+
+
+@pytest.fixture
+def setup(user_db, fake_rds, monkeypatch):
+    engine = user_db.kw["bind"]
+    QuestRecommendation.__table__.create(engine)
+    db = user_db()
+    db.execute(text("""
+        CREATE TABLE survey_answers (
+            user_id VARCHAR(26), question_id VARCHAR(26), question_type INTEGER, option_order_no INTEGER
+        )
+    """))
+    for user_id in ("U1", "U2", "U3"):
+        db.execute(text("""
+            INSERT INTO users (id, login_id, password, email, real_name, role, user_key, created_at, updated_at)
+            VALUES (:id, :id, 'x', :email, 'n', 'GUEST', :id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """), {"id": user_id, "email": f"{user_id}@example.com"})
+    db.commit()
+
+    recommender = FakeRecommender()
+    monkeypatch.setattr(system, "get_recommender", lambda: recommender)
+    yield db, recommender
+    db.close()
+
+
+def _rows(db):
+    return sorted(
+        (r.user_id, r.quest_id, bool(r.is_click))
+        for r in db.execute(text("""
+            SELECT user_id, quest_id, is_click FROM quest_recommendations WHERE recommendation_date = :day
+        """), {"day": DAY}).fetchall()
+    )
+
+
+def test_rerun_without_restart_keeps_existing_rows(setup):
+    db, recommender = setup
+    precompute.precompute_recommendations(db, DAY, chunk_size=2)
+    recommender.default_ids = ["q4", "q5", "q6"]
+
+    precompute.precompute_recommendations(db, DAY, chunk_size=2)
+
+    # 커서가 끝까지 진행되어 있으므로 아무것도 바뀌지 않음
+    assert {quest for _, quest, _ in _rows(db)} == {"q1", "q2", "q3"}
+
+
+def test_restart_replaces_rows_and_invalidates_details(setup, fake_rds):
+    db, recommender = setup
+    precompute.precompute_recommendations(db, DAY, chunk_size=2)
+    db.execute(text("UPDATE quest_recommendations SET is_click = 1 WHERE user_id = 'U1' AND quest_id = 'q1'"))
+    db.commit()
+    fake_rds.set(cache.details_key("U2", DAY), json.dumps([{"id": "q1"}]))
+
+    recommender.default_ids = ["q4", "q5", "q6"]
+    precompute.precompute_recommendations(db, DAY, chunk_size=2, restart=True)
+
+    expected = [(user, quest, False) for user in ("U1", "U2", "U3") for quest in ("q4", "q5", "q6")]
+    # 클릭 기록이 있는 행은 유지
+    assert _rows(db) == sorted(expected + [("U1", "q1", True)])
+    assert not fake_rds.exists(cache.details_key("U2", DAY))
+    assert json.loads(fake_rds.get(cache.daily_key("U2", DAY))) == ["q4", "q5", "q6"]
+    assert not fake_rds.exists(precompute._replace_key(DAY))
+
+
+def test_resumed_restart_keeps_replacing(setup, fake_rds, monkeypatch):
+    db, recommender = setup
+    precompute.precompute_recommendations(db, DAY, chunk_size=2)
+    recommender.default_ids = ["q4", "q5", "q6"]
+
+    # 첫 청크(U1, U2) 교체 후 중단
+    upsert = precompute.upsert_recommendations
+    calls = []
+
+    def fail_second_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(precompute, "upsert_recommendations", fail_second_chunk)
+    with pytest.raises(RuntimeError):
+        precompute.precompute_recommendations(db, DAY, chunk_size=2, restart=True)
+    monkeypatch.setattr(precompute, "upsert_recommendations", upsert)
+
+    # --restart 없이 이어서 실행해도 남은 U3 를 교체
+    precompute.precompute_recommendations(db, DAY, chunk_size=2)
+
+    assert {quest for _, quest, _ in _rows(db)} == {"q4", "q5", "q6"}
@@ -0,0 +1,116 @@
+# tests/test_register.py
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.auth import router as auth_router
+from app.database import get_db
+from app.models import School, User, UserRoleEnum
+
+PAYLOAD = {
+    "login_id": "newuser1",
+    "email": "new@example.com",
+    "password": "Passw0rd!",
+    "password_confirm": "Passw0rd!",
+    "real_name": "홍길동",
+    "university_code": "SSAFY",
+    "university_name": "싸피대학교",
+}
+
+
+@pytest.fixture
+def members(monkeypatch):
+    calls = []
+
+    async def ensure(email):
+        calls.append(email)
+        if members.error is not None:
+            raise members.error
+        return f"key-{email}"
+
+    async def fast_hash(password):
+        return f"hashed-{password}"
+
+    members.calls = calls
+    members.error = None
+    monkeypatch.setattr(auth_router, "ensure_ssafy_member", ensure)
+    monkeypatch.setattr(auth_router, "hash_password_async", fast_hash)
+    return members
+
+
+@pytest.fixture
+def client(user_db, members):
+    db = user_db()
+    db.add(School(id="S1", code="SSAFY", name="싸피대학교"))
+    db.commit()
+    db.close()
+
+    def override_db():
+        session = user_db()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(auth_router.router)
+    app.dependency_overrides[get_db] = override_db
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _users(user_db):
+    db = user_db()
+    try:
+        return db.execute(text("SELECT login_id, email, user_key FROM users")).fetchall()
+    finally:
+        db.close()
+
+
+def test_register_saves_ssafy_user_key(client, user_db, members):
+    response = client.post("/auth/register", json=PAYLOAD)
+
+    assert response.status_code == 200
+    assert members.calls == ["new@example.com"]
+    assert [tuple(row) for row in _users(user_db)] == [("newuser1", "new@example.com", "key-new@example.com")]
+
+
+def test_duplicate_does_not_create_ssafy_member(client, user_db, members):
+    db = user_db()
+    db.add(User(id="U0", login_id="newuser1", email="old@example.com", password="x",
+                real_name="기존", role=UserRoleEnum.GUEST, user_key="old-key"))
+    db.commit()
+    db.close()
+
+    assert client.post("/auth/register", json=PAYLOAD).status_code == 400
+    assert members.calls == []
+
+
+def test_race_after_checks_does_not_create_ssafy_member(client, user_db, members, monkeypatch):
+    check = auth_router._check_registration
+
+    def check_then_lose_race(db, req):
+        school = check(db, req)
+        other = user_db()
+        other.add(User(id="U9", login_id="someone", email=req.email, password="x",
+                       real_name="동시 가입", role=UserRoleEnum.GUEST, user_key="other-key"))
+        other.commit()
+        other.close()
+        return school
+
+    monkeypatch.setattr(auth_router, "_check_registration", check_then_lose_race)
+
+    assert client.post("/auth/register", json=PAYLOAD).status_code == 400
+    assert members.calls == []
+
+
+def test_failed_member_creation_removes_pending_user(client, user_db, members):
+    members.error = HTTPException(status_code=502, detail="SSAFY 회원 생성 서버 오류가 발생했습니다.")
+
+    assert client.post("/auth/register", json=PAYLOAD).status_code == 502
+    assert _users(user_db) == []
+
+    # 같은 아이디/이메일로 다시 가입 가능
+    members.error = None
+    assert client.post("/auth/register", json=PAYLOAD).status_code == 200
+    assert _users(user_db)[0].user_key == "key-new@example.com"
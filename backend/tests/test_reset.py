@@ -0,0 +1,45 @@
+# tests/test_reset.py
+import numpy as np
+
+from app.recommend import als, cache, catalog, evaluate, segments, snapshot, stats, system
+
+
+def test_catalog_reset_reloads_quests():
+    calls = []
+
+    def load_quests():
+        calls.append(1)
+        return []
+
+    catalog.reset()
+    first = catalog.get_catalog(load_quests)
+    assert catalog.get_catalog(load_quests) is first
+    assert len(calls) == 1
+
+    catalog.reset()
+    catalog.get_catalog(load_quests)
+    assert len(calls) == 2
+
+
+def test_snapshot_reset_drops_resident_snapshot(tmp_path):
+    root = str(tmp_path)
+    snapshot.write_snapshot("test", {"values": np.arange(3)}, root=root)
+    first = snapshot.get_snapshot("test", root)
+    assert snapshot.get_snapshot("test", root) is first
+
+    snapshot.reset()
+
+    reloaded = snapshot.get_snapshot("test", root)
+    assert reloaded is not first
+    assert reloaded.version == first.version
+
+
+def test_evaluate_resets_every_module_cache(monkeypatch):
+    called = []
+    modules = [system, catalog, stats, cache, segments, snapshot, als]
+    for module in modules:
+        monkeypatch.setattr(module, "reset", lambda name=module.__name__: called.append(name))
+
+    evaluate._reset_resident_state()
+
+    assert sorted(called) == sorted(module.__name__ for module in modules)
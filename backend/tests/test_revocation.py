@@ -0,0 +1,144 @@
+# tests/test_revocation.py
+import time
+
+import pytest
+import redis
+
+from app.auth import revocation
+
+
+def _wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def revocation_filter(fake_rds, monkeypatch):
+    monkeypatch.setattr(revocation, "RECONNECT_SECONDS", 0.05)
+    rf = revocation.RevocationFilter(heartbeat_seconds=0.1, resync_seconds=60)
+    monkeypatch.setattr(revocation, "_filter", rf)
+    rf.ensure_started()
+    assert _wait_until(lambda: rf.synced)
+    yield rf
+    rf.stop()
+
+
+def _revoke_elsewhere(rds, jti: str, exp: int) -> None:
+    """다른 워커의 로그아웃 중 알림만 유실된 경우 (키만 저장)"""
+    rds.setex(revocation.revoked_key(jti), 600, exp)
+
+
+def _pubsub_class(rds):
+    return type(rds.pubsub())
+
+
+def test_silent_subscription_falls_back_to_redis(fake_rds, revocation_filter, monkeypatch):
+    exp = int(time.time()) + 600
+    _revoke_elsewhere(fake_rds, "other-worker", exp)
+    # 구독이 살아 있는 동안은 필터만 확인
+    assert revocation.is_revoked("other-worker", exp) is False
+
+    # half-open: 읽기는 막히지 않지만 PONG 도 메시지도 오지 않음
+    def silent(self, *args, **kwargs):
+        time.sleep(0.01)
+        return None
+
+    monkeypatch.setattr(_pubsub_class(fake_rds), "get_message", silent)
+    assert _wait_until(lambda: not revocation_filter.synced, timeout=1.0)
+    assert revocation.is_revoked("other-worker", exp) is True
+
+
+def test_broken_subscription_falls_back_and_resyncs(fake_rds, revocation_filter, monkeypatch):
+    exp = int(time.time()) + 600
+    pubsub_class = _pubsub_class(fake_rds)
+    original = pubsub_class.get_message
+
+    def broken(self, *args, **kwargs):
+        raise redis.ConnectionError("connection reset")
+
+    monkeypatch.setattr(pubsub_class, "get_message", broken)
+    assert _wait_until(lambda: not revocation_filter.synced, timeout=1.0)
+    _revoke_elsewhere(fake_rds, "while-down", exp)
+    assert revocation.is_revoked("while-down", exp) is True
+
+    # 재연결 후 전체 다시 읽기로 누락분 반영
+    monkeypatch.setattr(pubsub_class, "get_message", original)
+    assert _wait_until(lambda: revocation_filter.synced)
+    assert revocation_filter.might_contain("while-down", exp)
+
+
+def test_periodic_resync_picks_up_lost_messages(fake_rds, monkeypatch):
+    rf = revocation.RevocationFilter(heartbeat_seconds=0.1, resync_seconds=0.2)
+    monkeypatch.setattr(revocation, "_filter", rf)
+    rf.ensure_started()
+    try:
+        assert _wait_until(lambda: rf.synced)
+        exp = int(time.time()) + 600
+        _revoke_elsewhere(fake_rds, "lost-message", exp)
+        assert _wait_until(lambda: rf.might_contain("lost-message", exp), timeout=2.0)
+        assert revocation.is_revoked("lost-message", exp) is True
+    finally:
+        rf.stop()
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = revocation.BloomFilter(capacity=5000, false_positive_rate=0.01)
+    added = [f"jti-{i}" for i in range(5000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(f"other-{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_revoke_then_is_revoked(fake_rds, revocation_filter):
+    exp = int(time.time()) + 600
+    revocation.revoke("logged-out", exp)
+
+    assert fake_rds.ttl(revocation.revoked_key("logged-out")) > 0
+    assert revocation.is_revoked("logged-out", exp) is True
+    assert revocation.is_revoked("still-valid", exp) is False
+
+
+def test_is_revoked_skips_redis_for_tokens_not_in_filter(fake_rds, revocation_filter, monkeypatch):
+    calls = []
+    monkeypatch.setattr(fake_rds, "exists", lambda *keys: calls.append(keys) or 0)
+
+    assert revocation.is_revoked("never-revoked", int(time.time()) + 600) is False
+    assert calls == []
+
+
+def test_revocation_from_other_worker_reaches_filter(fake_rds, revocation_filter):
+    exp = int(time.time()) + 600
+    # 다른 워커의 revoke: 키 저장 + 채널 발행
+    fake_rds.setex(revocation.revoked_key("remote"), 600, exp)
+    fake_rds.publish(revocation.CHANNEL, f"remote:{exp}")
+
+    assert _wait_until(lambda: revocation_filter.might_contain("remote", exp))
+    assert revocation.is_revoked("remote", exp) is True
+
+
+def test_revoke_ignores_expired_tokens(fake_rds, revocation_filter):
+    revocation.revoke("expired", int(time.time()) - 1)
+
+    assert not fake_rds.exists(revocation.revoked_key("expired"))
+
+
+def test_expired_generations_are_pruned():
+    rf = revocation.RevocationFilter(bucket_seconds=60)
+    now = time.time()
+    rf.add("soon", int(now) + 60)
+    rf.add("later", int(now) + 600)
+    assert rf.generation_count == 2
+
+    # "soon" 의 만료 구간이 지난 시점
+    rf.prune(now + 180)
+
+    assert rf.generation_count == 1
+    assert not rf.might_contain("soon", int(now) + 60)
+    assert rf.might_contain("later", int(now) + 600)
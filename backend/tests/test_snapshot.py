@@ -0,0 +1,77 @@
+# tests/test_snapshot.py
+import os
+
+import numpy as np
+import pytest
+
+from app.recommend import snapshot
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshots():
+    snapshot.reset()
+    yield
+    snapshot.reset()
+
+
+def _versions(root, name):
+    base = os.path.join(root, name)
+    return sorted(d for d in os.listdir(base) if os.path.isdir(os.path.join(base, d)))
+
+
+def test_write_swaps_current_and_loads_mmap(tmp_path):
+    root = str(tmp_path)
+    version = snapshot.write_snapshot("model", {"w": np.arange(4.0)}, meta={"users": 3}, root=root)
+
+    assert snapshot._read_current("model", root) == version
+    loaded = snapshot.load_snapshot("model", root)
+    assert loaded.version == version
+    assert loaded.meta["users"] == 3
+    assert isinstance(loaded["w"], np.memmap)
+    np.testing.assert_array_equal(loaded["w"], np.arange(4.0))
+    # 임시 포인터 파일은 남지 않음
+    assert sorted(os.listdir(os.path.join(root, "model"))) == sorted(["CURRENT", version])
+
+
+def test_write_prunes_to_keep_versions(tmp_path):
+    root = str(tmp_path)
+    written = [snapshot.write_snapshot("model", {"w": np.full(2, i)}, root=root) for i in range(4)]
+
+    assert _versions(root, "model") == written[-snapshot.KEEP_VERSIONS:]
+    assert snapshot._read_current("model", root) == written[-1]
+    np.testing.assert_array_equal(snapshot.load_snapshot("model", root)["w"], np.full(2, 3))
+
+
+def test_get_snapshot_picks_up_new_version_after_check_interval(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    assert snapshot.get_snapshot("model", root) is None
+
+    first = snapshot.write_snapshot("model", {"w": np.zeros(2)}, root=root)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CHECK_SECONDS", 3600)
+    snapshot.reset()
+    current = snapshot.get_snapshot("model", root)
+    assert current.version == first
+
+    second = snapshot.write_snapshot("model", {"w": np.ones(2)}, root=root)
+    # 확인 주기 안에서는 상주 스냅샷을 그대로 사용
+    assert snapshot.get_snapshot("model", root) is current
+
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CHECK_SECONDS", 0)
+    swapped = snapshot.get_snapshot("model", root)
+    assert swapped.version == second
+    np.testing.assert_array_equal(swapped["w"], np.ones(2))
+    # 교체 전 스냅샷은 정리된 뒤에도 열린 mmap 으로 계속 읽을 수 있음
+    np.testing.assert_array_equal(current["w"], np.zeros(2))
+
+
+def test_get_snapshot_keeps_current_when_new_version_is_unreadable(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    first = snapshot.write_snapshot("model", {"w": np.zeros(2)}, root=root)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CHECK_SECONDS", 0)
+    assert snapshot.get_snapshot("model", root).version == first
+
+    # CURRENT 가 아직 쓰이지 않은(또는 정리된) 버전을 가리키는 경우
+    with open(os.path.join(root, "model", "CURRENT"), "w") as f:
+        f.write("missing")
+
+    assert snapshot.get_snapshot("model", root).version == first
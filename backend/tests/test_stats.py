@@ -0,0 +1,97 @@
+# tests/test_stats.py
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import QuestRecommendation
+from app.recommend import persistence, stats
+
+
+def _wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    QuestRecommendation.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _flags(db, day):
+    row = db.execute(text("""
+        SELECT is_click, is_cleared FROM quest_recommendations
+        WHERE user_id = 'U1' AND quest_id = 'q1' AND recommendation_date = :day
+    """), {"day": day}).fetchone()
+    return int(row.is_click), int(row.is_cleared)
+
+
+def test_interaction_is_recorded_on_todays_row_not_precomputed_tomorrow(db, fake_rds):
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    # Cold Start 사용자는 같은 퀘스트를 매일 추천받고, precompute 가 내일 행을 미리 저장함
+    persistence.upsert_recommendations(db, {"U1": ["q1"]}, today)
+    persistence.upsert_recommendations(db, {"U1": ["q1"]}, tomorrow)
+
+    assert stats.record_interaction(db, "U1", "q1", clicked=True, cleared=True)
+
+    assert _flags(db, today) == (1, 1)
+    assert _flags(db, tomorrow) == (0, 0)
+    assert int(fake_rds.get(stats.INTERACTIONS_KEY)) == 1
+
+
+def test_only_future_row_is_not_an_interaction_target(db, fake_rds):
+    persistence.upsert_recommendations(db, {"U1": ["q1"]}, date.today() + timedelta(days=1))
+
+    assert stats.record_interaction(db, "U1", "q1", clicked=True) is False
+
+
+def test_unseeded_stats_serve_existing_counters_and_reseed_once(db, fake_rds, monkeypatch):
+    fake_rds.set(stats.INTERACTIONS_KEY, 42)
+    fake_rds.pfadd(stats.USERS_KEY, "U1", "U2")
+    fake_rds.pfadd(stats.QUESTS_KEY, "q1")
+
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def slow_reseed(session):
+        calls.append(session)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(stats, "reseed_stats", slow_reseed)
+
+    # 여러 워커가 동시에 만료를 발견해도 재집계는 한 번만, 요청은 기존 카운터로 응답
+    for _ in range(3):
+        stats.reset()
+        assert stats.get_interaction_stats(db) == (42, 2, 1)
+    assert started.wait(5)
+    assert len(calls) == 1
+    assert fake_rds.exists(stats.RESEED_LOCK_KEY)
+
+    release.set()
+    assert _wait_until(lambda: not fake_rds.exists(stats.RESEED_LOCK_KEY))
+
+
+def test_background_reseed_rebuilds_counters(db, fake_rds):
+    persistence.upsert_recommendations(db, {"U1": ["q1", "q2"], "U2": ["q1"]}, date.today())
+    db.execute(text("UPDATE quest_recommendations SET is_click = 1 WHERE quest_id = 'q1'"))
+    db.commit()
+
+    assert stats.get_interaction_stats(db) == (0, 0, 0)
+
+    assert _wait_until(lambda: fake_rds.exists(stats.SEEDED_KEY) and not fake_rds.exists(stats.RESEED_LOCK_KEY))
+    stats.reset()
+    assert stats.get_interaction_stats(db) == (2, 2, 1)